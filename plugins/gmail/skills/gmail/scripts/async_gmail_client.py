@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""
+Async Gmail API Client
+
+asyncio 이벤트 루프 하나에서 여러 계정/수천 개의 메시지 작업을 동시에
+실행하기 위한 GmailClient의 비동기 버전 (asyncio 기반 MCP 서버 등).
+
+- 전송: keep-alive 연결 풀 (core.async_http, httpx 필요)
+- 할당량: QuotaManager.wait_for_quota_async (동기 클라이언트/다른 프로세스와 같은 버킷)
+- 재시도: async_exponential_backoff (같은 재시도 예산/회로 차단기)
+- 캐시/로컬 인덱스/자격 증명: 내부 GmailClient와 공유
+  (잠금/SQLite를 쓰는 캐시 조회/쓰기와 할당량 기록은 asyncio.to_thread로 실행)
+
+지원 범위: 목록, 조회, 일괄 조회, 라벨 수정, 발송, 라벨. 그 밖의 기능은
+sync_client(GmailClient)를 사용합니다.
+
+Usage:
+    async with AsyncGmailClient("work") as client:
+        messages = await client.list_messages(query="is:unread", max_results=500)
+        result = await client.batch_get_messages([m["id"] for m in messages])
+
+Install:
+    pip install "gmail-skill[async]"
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from googleapiclient.errors import HttpError
+
+try:
+    from .gmail_client import (
+        DEFAULT_TIMEOUT,
+        ENABLE_CACHE,
+        ENABLE_QUOTA,
+        ENABLE_SYNC,
+        GmailClient,
+    )
+    from .core import (
+        AsyncGmailHttp,
+        BatchProcessor,
+        BatchResult,
+        CircuitOpenError,
+        DeadlineExceeded,
+        QuotaPriority,
+        QuotaUnit,
+        async_exponential_backoff,
+        get_circuit_breaker,
+        get_retry_budget,
+        is_rate_limit_error,
+    )
+except ImportError:
+    # Fallback for direct script execution
+    from gmail_client import (
+        DEFAULT_TIMEOUT,
+        ENABLE_CACHE,
+        ENABLE_QUOTA,
+        ENABLE_SYNC,
+        GmailClient,
+    )
+    from core import (
+        AsyncGmailHttp,
+        BatchProcessor,
+        BatchResult,
+        CircuitOpenError,
+        DeadlineExceeded,
+        QuotaPriority,
+        QuotaUnit,
+        async_exponential_backoff,
+        get_circuit_breaker,
+        get_retry_budget,
+        is_rate_limit_error,
+    )
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGmailClient:
+    """단일 Google 계정의 비동기 Gmail 클라이언트.
+
+    모든 API 메서드는 코루틴입니다. 이벤트 루프 하나에서 사용하고,
+    끝나면 aclose()(또는 async with)로 연결 풀을 닫습니다.
+
+    응답 형식은 GmailClient와 같습니다 (get_message는 파싱된 메시지,
+    batch_*는 BatchResult).
+    """
+
+    def __init__(
+        self,
+        account_name: str,
+        base_path: Optional[Path] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        enable_cache: bool = ENABLE_CACHE,
+        enable_quota: bool = ENABLE_QUOTA,
+        enable_sync: bool = ENABLE_SYNC,
+        max_connections: int = AsyncGmailHttp.DEFAULT_MAX_CONNECTIONS,
+    ):
+        """
+        Args:
+            account_name: 계정 식별자 (예: 'work', 'personal')
+            base_path: skill 루트 경로
+            timeout: API 요청별 타임아웃 (초) - 호출 전체의 상한은 deadline()
+            enable_cache: 캐시 활성화 여부
+            enable_quota: 할당량 관리 활성화 여부
+            enable_sync: History API 증분 동기화 활성화 여부 (캐시 필요)
+            max_connections: 동시에 보낼 최대 요청 수 (연결 풀 크기)
+        """
+        self.sync_client = GmailClient(
+            account_name,
+            base_path=base_path,
+            timeout=timeout,
+            enable_cache=enable_cache,
+            enable_quota=enable_quota,
+            enable_sync=enable_sync,
+        )
+        self.account_name = account_name
+        self.max_connections = max_connections
+        self.http = AsyncGmailHttp(
+            self.sync_client.creds, timeout=timeout, max_connections=max_connections
+        )
+        self._sync_lock = asyncio.Lock()
+        self._next_sync = 0.0
+
+    async def __aenter__(self) -> "AsyncGmailClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """연결 풀 종료."""
+        await self.http.aclose()
+
+    def deadline(self, seconds: Optional[float]):
+        """블록 안의 모든 호출에 전체 시간 상한 적용 (GmailClient.deadline과 동일).
+
+        Usage:
+            with client.deadline(10.0):
+                await client.get_message(message_id)
+        """
+        return self.sync_client.deadline(seconds)
+
+    # =========================================================================
+    # Internals
+    # =========================================================================
+
+    async def _call(
+        self,
+        units: int,
+        method: str,
+        http_method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+        priority: QuotaPriority = QuotaPriority.INTERACTIVE,
+    ) -> dict:
+        """할당량 대기 → 재시도를 포함한 요청 → 사용량 기록."""
+        quota = self.sync_client.quota_manager
+        if quota:
+            await quota.wait_for_quota_async(self.account_name, units, priority=priority)
+
+        @async_exponential_backoff(
+            on_rate_limited=self._on_rate_limited,
+            budget=get_retry_budget(self.account_name),
+            breaker=get_circuit_breaker(self.account_name),
+        )
+        async def _request():
+            return await self.http.request(http_method, path, params=params, body=body)
+
+        result = await _request()
+        # 공유 할당량 모드는 SQLite에 기록하므로 이벤트 루프를 막지 않도록 스레드에서
+        await asyncio.to_thread(self.sync_client._record_quota, units, method)
+        return result
+
+    def _on_rate_limited(self, error: Exception, retry_after: Optional[float]) -> None:
+        """속도 제한 응답마다 호출: 보고(AIMD, 공유 모드는 SQLite)를 스레드에서 실행.
+
+        보고는 재시도 대기와 겹쳐 진행되므로 기다리지 않습니다.
+        """
+        asyncio.get_running_loop().run_in_executor(
+            None, self.sync_client._on_rate_limited, error, retry_after
+        )
+
+    async def _sync_if_due(self) -> None:
+        """캐시 조회 전 필요 시 증분 동기화.
+
+        동기 HTTP 호출이므로 스레드에서 실행하고, 동시에 들어온 호출들은
+        한 번의 동기화를 기다립니다.
+        """
+        if not self.sync_client.enable_sync:
+            return
+
+        async with self._sync_lock:
+            if time.monotonic() < self._next_sync:
+                return
+            await asyncio.to_thread(self.sync_client._sync_if_due)
+            self._next_sync = time.monotonic() + self.sync_client.history_sync.min_interval
+
+    # =========================================================================
+    # Messages
+    # =========================================================================
+
+    async def list_messages(
+        self,
+        query: str = "",
+        max_results: int = 20,
+        label_ids: Optional[list[str]] = None,
+        include_spam_trash: bool = False,
+        use_cache: bool = True,
+    ) -> list[dict]:
+        """메시지 목록 조회 (GmailClient.list_messages와 같은 캐시 규칙).
+
+        Args:
+            query: Gmail 검색 쿼리 (예: "from:user@example.com", "is:unread")
+            max_results: 최대 결과 수
+            label_ids: 필터할 라벨 ID 목록
+            include_spam_trash: 스팸/휴지통 포함 여부
+            use_cache: 캐시 사용 여부 (기본값: True)
+
+        Returns:
+            메시지 목록 (id, threadId 포함)
+        """
+        cache = self.sync_client.cache if use_cache else None
+        messages = []
+        page_token = None
+
+        if cache:
+            await self._sync_if_due()
+
+            local = await asyncio.to_thread(
+                self.sync_client._list_local, query, max_results, label_ids, include_spam_trash
+            )
+            if local is not None:
+                logger.debug(f"Local index answered list query: {query}")
+                return local
+
+            cached = await asyncio.to_thread(
+                cache.get_list_page, self.account_name, query, label_ids
+            )
+            if cached is not None:
+                if len(cached["messages"]) >= max_results or not cached["next_page_token"]:
+                    logger.debug(f"Cache hit for list query: {query}")
+                    return cached["messages"][:max_results]
+
+                # 캐시된 페이지 이후부터 부족한 만큼만 조회
+                messages = list(cached["messages"])
+                page_token = cached["next_page_token"]
+
+        cached_count = len(messages)
+        seen = {m["id"] for m in messages}
+
+        while len(messages) < max_results:
+            params = {
+                "maxResults": min(max_results - len(messages), 100),
+                "includeSpamTrash": include_spam_trash,
+            }
+            if query:
+                params["q"] = query
+            if label_ids:
+                params["labelIds"] = label_ids
+            if page_token:
+                params["pageToken"] = page_token
+
+            try:
+                result = await self._call(
+                    QuotaUnit.MESSAGES_LIST, "messages.list", "GET", "messages", params
+                )
+            except HttpError as e:
+                if not (cached_count and e.resp.status == 400):
+                    raise
+                # 저장된 페이지 토큰이 만료됨 - 처음부터 다시 조회
+                messages, page_token, cached_count, seen = [], None, 0, set()
+                continue
+
+            for msg in result.get("messages", []):
+                if msg["id"] not in seen:
+                    seen.add(msg["id"])
+                    messages.append(msg)
+
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+        if cache and messages:
+            if cached_count:
+                await asyncio.to_thread(
+                    cache.extend_list,
+                    self.account_name,
+                    query,
+                    messages[cached_count:],
+                    label_ids,
+                    next_page_token=page_token,
+                )
+            else:
+                await asyncio.to_thread(
+                    cache.set_list,
+                    self.account_name,
+                    query,
+                    messages,
+                    label_ids,
+                    next_page_token=page_token,
+                )
+
+        return messages[:max_results]
+
+    async def get_message(
+        self,
+        message_id: str,
+        format: str = "full",
+        use_cache: bool = True,
+    ) -> dict:
+        """메시지 상세 조회.
+
+        Args:
+            message_id: 메시지 ID
+            format: 응답 형식 (minimal, full, raw, metadata)
+            use_cache: 캐시 사용 여부 (기본값: True)
+
+        Returns:
+            메시지 상세 정보
+        """
+        cacheable = format in ("full", "metadata")
+        cache = self.sync_client.cache if use_cache and cacheable else None
+
+        if cache:
+            await self._sync_if_due()
+            metadata_only = format == "metadata"
+            cached = await asyncio.to_thread(
+                cache.get_message, self.account_name, message_id, metadata_only=metadata_only
+            )
+            if cached is not None:
+                logger.debug(f"Cache hit for message: {message_id}")
+                return cached
+
+            # 본문은 유효하고 라벨만 만료된 경우 라벨만 다시 조회
+            body = await asyncio.to_thread(
+                cache.get_message_body, self.account_name, message_id, metadata_only=metadata_only
+            )
+            if body is not None:
+                refreshed = await self._refresh_message_labels(message_id)
+                if refreshed is not None:
+                    return refreshed
+
+        return await self._fetch_message(message_id, format, use_cache)
+
+    async def _fetch_message(
+        self,
+        message_id: str,
+        format: str,
+        use_cache: bool = True,
+    ) -> dict:
+        """API로 메시지를 조회해 파싱하고 캐시/로컬 인덱스에 반영."""
+        result = await self._call(
+            QuotaUnit.MESSAGES_GET,
+            "messages.get",
+            "GET",
+            f"messages/{message_id}",
+            {"format": format},
+        )
+        parsed = self.sync_client._parse_message(result)
+        if format in ("full", "metadata"):
+
+            def _store() -> None:
+                if use_cache and self.sync_client.cache:
+                    self.sync_client.cache.set_message(
+                        self.account_name, message_id, parsed, format=format
+                    )
+                self.sync_client._index_messages([parsed], format)
+
+            await asyncio.to_thread(_store)
+        return parsed
+
+    async def _refresh_message_labels(self, message_id: str) -> Optional[dict]:
+        """minimal 형식으로 라벨만 다시 받아 캐시된 메시지 갱신."""
+        result = await self._call(
+            QuotaUnit.MESSAGES_GET,
+            "messages.get",
+            "GET",
+            f"messages/{message_id}",
+            {"format": "minimal"},
+        )
+        label_ids = result.get("labelIds", [])
+
+        def _store() -> Optional[dict]:
+            if self.sync_client.search_index:
+                self.sync_client.search_index.update_labels(
+                    self.account_name, {message_id: label_ids}
+                )
+            return self.sync_client.cache.update_message_labels(
+                self.account_name, message_id, label_ids
+            )
+
+        return await asyncio.to_thread(_store)
+
+    async def send_message(
+        self,
+        to: str,
+        subject: str,
+        body: str,
+        cc: Optional[str] = None,
+        bcc: Optional[str] = None,
+        html: bool = False,
+        attachments: Optional[list[str]] = None,
+        reply_to_message_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+    ) -> dict:
+        """메일 발송 (인자와 반환값은 GmailClient.send_message와 동일)."""
+        body_data = self.sync_client._build_send_body(
+            to, subject, body, cc, bcc, html, attachments, reply_to_message_id, thread_id
+        )
+        result = await self._call(
+            QuotaUnit.MESSAGES_SEND, "messages.send", "POST", "messages/send", body=body_data
+        )
+
+        if self.sync_client.cache:
+            await asyncio.to_thread(self.sync_client.cache.invalidate_lists, self.account_name)
+
+        return {
+            "id": result["id"],
+            "thread_id": result["threadId"],
+            "label_ids": result.get("labelIds", []),
+            "status": "sent",
+        }
+
+    async def modify_message(
+        self,
+        message_id: str,
+        add_label_ids: Optional[list[str]] = None,
+        remove_label_ids: Optional[list[str]] = None,
+    ) -> dict:
+        """메시지 라벨 수정.
+
+        Args:
+            message_id: 메시지 ID
+            add_label_ids: 추가할 라벨 ID
+            remove_label_ids: 제거할 라벨 ID
+
+        Returns:
+            수정된 메시지 정보
+        """
+        body = {}
+        if add_label_ids:
+            body["addLabelIds"] = add_label_ids
+        if remove_label_ids:
+            body["removeLabelIds"] = remove_label_ids
+
+        result = await self._call(
+            QuotaUnit.MESSAGES_MODIFY,
+            "messages.modify",
+            "POST",
+            f"messages/{message_id}/modify",
+            body=body,
+        )
+
+        await asyncio.to_thread(
+            self.sync_client._apply_label_delta,
+            [message_id],
+            add_label_ids,
+            remove_label_ids,
+            responses=[result],
+        )
+
+        return {
+            "id": result["id"],
+            "thread_id": result["threadId"],
+            "label_ids": result.get("labelIds", []),
+            "status": "modified",
+        }
+
+    # =========================================================================
+    # Labels
+    # =========================================================================
+
+    async def list_labels(self, use_cache: bool = True) -> list[dict]:
+        """라벨 목록 조회.
+
+        Args:
+            use_cache: 캐시 사용 여부 (기본값: True)
+
+        Returns:
+            라벨 목록
+        """
+        cache = self.sync_client.cache if use_cache else None
+        if cache:
+            cached = await asyncio.to_thread(cache.get_labels, self.account_name)
+            if cached is not None:
+                return cached
+
+        result = await self._call(QuotaUnit.LABELS_LIST, "labels.list", "GET", "labels")
+        labels = [
+            {
+                "id": label["id"],
+                "name": label["name"],
+                "type": label.get("type", "user"),
+                "message_list_visibility": label.get("messageListVisibility"),
+                "label_list_visibility": label.get("labelListVisibility"),
+            }
+            for label in result.get("labels", [])
+        ]
+
+        if cache:
+            await asyncio.to_thread(cache.set_labels, self.account_name, labels)
+        return labels
+
+    async def create_label(
+        self,
+        name: str,
+        message_list_visibility: str = "show",
+        label_list_visibility: str = "labelShow",
+    ) -> dict:
+        """라벨 생성.
+
+        Args:
+            name: 라벨 이름
+            message_list_visibility: 메시지 목록에서 표시 여부 (show, hide)
+            label_list_visibility: 라벨 목록에서 표시 여부 (labelShow, labelHide)
+
+        Returns:
+            생성된 라벨 정보
+        """
+        body = {
+            "name": name,
+            "messageListVisibility": message_list_visibility,
+            "labelListVisibility": label_list_visibility,
+        }
+        result = await self._call(
+            QuotaUnit.LABELS_CREATE, "labels.create", "POST", "labels", body=body
+        )
+        return {"id": result["id"], "name": result["name"], "status": "created"}
+
+    async def delete_label(self, label_id: str) -> dict:
+        """라벨 삭제."""
+        await self._call(
+            QuotaUnit.LABELS_DELETE, "labels.delete", "DELETE", f"labels/{label_id}"
+        )
+        return {"id": label_id, "status": "deleted"}
+
+    # =========================================================================
+    # Batch Operations
+    # =========================================================================
+
+    async def batch_get_messages(
+        self,
+        message_ids: list[str],
+        format: str = "metadata",
+        concurrency: Optional[int] = None,
+    ) -> BatchResult:
+        """메시지 일괄 조회 (개별 요청을 동시에 실행).
+
+        HTTP 배치 대신 연결 풀에서 messages.get을 동시에 보냅니다. 할당량은
+        BULK 우선순위로 대기하므로 같은 계정의 대화형 요청이 먼저 처리됩니다.
+        일시적 오류는 요청마다 재시도하고, deadline 초과, 회로 차단, 할당량
+        일시 중지(Retry-After)로 보내지 못한 ID는 result.deferred에 남깁니다.
+
+        GmailClient.batch_get_messages와 같이 results에는 API 응답 원본을
+        담고, full/metadata 형식이면 파싱한 메시지를 캐시와 로컬 인덱스에 반영합니다.
+
+        Args:
+            message_ids: 조회할 메시지 ID 목록
+            format: 응답 형식 (minimal, full, raw, metadata)
+            concurrency: 동시에 진행할 최대 요청 수 (기본값: max_connections)
+
+        Returns:
+            BatchResult 객체 (results/errors는 message_ids 순서)
+        """
+        slots = asyncio.Semaphore(concurrency or self.max_connections)
+
+        async def _get(message_id: str):
+            async with slots:
+                return await self._call(
+                    QuotaUnit.MESSAGES_GET,
+                    "messages.get",
+                    "GET",
+                    f"messages/{message_id}",
+                    {"format": format},
+                    priority=QuotaPriority.BULK,
+                )
+
+        outcomes = await asyncio.gather(
+            *(_get(message_id) for message_id in message_ids), return_exceptions=True
+        )
+
+        result = BatchResult(total=len(message_ids))
+        for message_id, outcome in zip(message_ids, outcomes):
+            resume_after = await self._resume_after(outcome)
+            if resume_after is not None:
+                result.deferred.append(message_id)
+                result.resume_after = resume_after
+            elif isinstance(outcome, Exception):
+                result.errors.append({"message_id": message_id, "error": str(outcome)})
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                result.results.append(outcome)
+
+        result.succeeded = len(result.results)
+        result.failed = len(result.errors)
+        if result.deferred:
+            logger.warning(f"Deferred {len(result.deferred)} messages.get requests")
+
+        await asyncio.to_thread(self.sync_client._store_fetched, result.results, format)
+        return result
+
+    async def batch_modify_labels(
+        self,
+        message_ids: list[str],
+        add_labels: Optional[list[str]] = None,
+        remove_labels: Optional[list[str]] = None,
+    ) -> BatchResult:
+        """라벨 일괄 수정 (요청당 최대 1,000개의 batchModify 요청을 동시에 실행).
+
+        Args:
+            message_ids: 수정할 메시지 ID 목록
+            add_labels: 추가할 라벨 ID
+            remove_labels: 제거할 라벨 ID
+
+        Returns:
+            BatchResult 객체
+        """
+        size = BatchProcessor.MAX_IDS_PER_CALL["messages.batchModify"]
+        chunks = [message_ids[i : i + size] for i in range(0, len(message_ids), size)]
+
+        async def _modify(chunk: list[str]):
+            await self._call(
+                QuotaUnit.MESSAGES_BATCH_MODIFY,
+                "messages.batchModify",
+                "POST",
+                "messages/batchModify",
+                body={
+                    "ids": chunk,
+                    "addLabelIds": add_labels or [],
+                    "removeLabelIds": remove_labels or [],
+                },
+                priority=QuotaPriority.BULK,
+            )
+
+        outcomes = await asyncio.gather(
+            *(_modify(chunk) for chunk in chunks), return_exceptions=True
+        )
+
+        result = BatchResult(total=len(message_ids))
+        for chunk, outcome in zip(chunks, outcomes):
+            resume_after = await self._resume_after(outcome)
+            if resume_after is not None:
+                result.deferred.extend(chunk)
+                result.resume_after = resume_after
+            elif isinstance(outcome, Exception):
+                result.failed += len(chunk)
+                result.errors.append({"message_ids": chunk, "error": str(outcome)})
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                result.succeeded += len(chunk)
+                result.results.extend({"id": mid, "status": "modified"} for mid in chunk)
+
+        # batchModify는 빈 응답이므로 추가/제거한 라벨로 캐시 갱신
+        await asyncio.to_thread(
+            self.sync_client._apply_label_delta,
+            [r["id"] for r in result.results],
+            add_labels,
+            remove_labels,
+        )
+        return result
+
+    async def _resume_after(self, outcome: object) -> Optional[datetime]:
+        """연기할 실패면 다시 시도할 시각, 아니면 None.
+
+        deadline 초과는 지금, 회로 차단은 다음 확인 시각, 할당량 대기 타임아웃과
+        너무 먼 Retry-After로 포기한 속도 제한은 일시 중지가 끝나는 시각입니다.
+        """
+        if isinstance(outcome, CircuitOpenError):
+            wait = outcome.retry_in
+        elif isinstance(outcome, DeadlineExceeded):
+            wait = 0.0
+        elif isinstance(outcome, TimeoutError) or (
+            isinstance(outcome, HttpError) and is_rate_limit_error(outcome)
+        ):
+            quota = self.sync_client.quota_manager
+            # 공유 할당량 모드는 SQLite를 읽으므로 스레드에서
+            wait = await asyncio.to_thread(quota.get_pause, self.account_name) if quota else 0.0
+            if not isinstance(outcome, TimeoutError) and wait <= 0:
+                return None
+        else:
+            return None
+        return datetime.now(timezone.utc) + timedelta(seconds=wait)
+
+
+async def _main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AsyncGmailClient 예제")
+    parser.add_argument("--account", default="default", help="계정 이름")
+    parser.add_argument("--query", default="", help="Gmail 검색 쿼리")
+    parser.add_argument("--max", type=int, default=100, help="최대 메시지 수")
+    args = parser.parse_args()
+
+    async with AsyncGmailClient(args.account) as client:
+        messages = await client.list_messages(query=args.query, max_results=args.max)
+        result = await client.batch_get_messages([m["id"] for m in messages])
+        for raw in result.results:
+            msg = client.sync_client._parse_message(raw)
+            print(f"{msg['date'][:16]:16}  {msg['from'][:30]:30}  {msg['subject'][:60]}")
+        print(f"{result.succeeded} fetched, {result.failed} failed, {len(result.deferred)} deferred")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
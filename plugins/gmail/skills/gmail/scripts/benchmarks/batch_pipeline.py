@@ -0,0 +1,110 @@
+"""Batch Pipeline Benchmark.
+
+배치 요청 하나의 왕복 시간이 긴 상황에서 messages.get 대량 조회의 처리량을
+워커 수별로 측정합니다. 실제 API 대신 execute()가 --latency초 걸리는
+가짜 배치 요청을 사용합니다.
+
+- workers=1: 배치를 하나씩 실행 (이전 방식, 처리량은 왕복 시간에 묶임)
+- workers>1: 여러 배치를 동시에 실행, 처리량은 할당량 한도(--rate)에 묶임
+- units/s: 처음 버킷(burst)을 제외한 평균 할당량 사용 속도
+
+Usage:
+    python benchmarks/batch_pipeline.py
+    python benchmarks/batch_pipeline.py --messages 2000 --latency 2.0 --workers 1 4 8
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.batch_processor import BatchProcessor  # noqa: E402
+from core.quota_manager import QuotaManager, QuotaUnit  # noqa: E402
+
+USER = "bench"
+
+
+class FakeRequest:
+    def __init__(self, message_id: str):
+        self.message_id = message_id
+
+
+class FakeBatch:
+    """execute()가 latency초 걸리는 배치 요청."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = []
+
+    def add(self, request, callback):
+        self.requests.append((request, callback))
+
+    def execute(self, http=None):
+        time.sleep(self.latency)
+        for request, callback in self.requests:
+            callback(None, {"id": request.message_id}, None)
+
+
+class FakeService:
+    """users().messages().get()과 new_batch_http_request()만 흉내."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId: str, id: str, format: str):
+        return FakeRequest(id)
+
+    def new_batch_http_request(self):
+        return FakeBatch(self.latency)
+
+
+def run(workers: int, messages: int, latency: float, rate: int) -> tuple[float, bool]:
+    """messages개를 조회하고 (경과 시간, 입력 순서 유지 여부) 반환."""
+    processor = BatchProcessor(
+        FakeService(latency),
+        QuotaManager(rate_limit=rate),
+        user=USER,
+        workers=workers,
+        http_factory=threading.local,
+    )
+    ids = [f"msg{i}" for i in range(messages)]
+
+    started = time.monotonic()
+    result = processor.batch_get_messages(ids)
+    elapsed = time.monotonic() - started
+
+    ordered = [item["id"] for item in result.results] == ids
+    return elapsed, ordered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 파이프라인 벤치마크")
+    parser.add_argument("--messages", type=int, default=1000, help="조회할 메시지 수")
+    parser.add_argument("--latency", type=float, default=1.5, help="배치 요청 왕복 시간 (초)")
+    parser.add_argument("--rate", type=int, default=QuotaManager.USER_RATE_LIMIT, help="초당 할당량")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="비교할 워커 수")
+    args = parser.parse_args()
+
+    units = args.messages * QuotaUnit.MESSAGES_GET
+    print(
+        f"{args.messages} messages.get ({units} units), "
+        f"{args.latency:.1f}s per batch, limit {args.rate} units/s"
+    )
+    print(f"{'workers':>7} {'elapsed':>8} {'units/s':>8} {'ordered':>8}")
+    for workers in args.workers:
+        elapsed, ordered = run(workers, args.messages, args.latency, args.rate)
+        sustained = (units - args.rate) / elapsed
+        print(f"{workers:>7} {elapsed:>7.1f}s {sustained:>8.1f} {str(ordered):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Cache Concurrency Benchmark.
+
+여러 프로세스가 같은 캐시 디렉토리에 동시에 읽고 쓰는 상황(CLI 동시 실행)을
+재현하여 손상된 항목 때문에 다시 가져와야 하는 메시지 수를 측정합니다.
+
+- 모든 키를 미리 캐시한 뒤 각 프로세스가 무작위로 읽기/쓰기를 반복
+- 읽기 결과가 없으면 "재조회"(API 재호출에 해당), 체크섬이 맞지 않으면 "손상"
+- legacy-file: 제자리 쓰기(open "w")를 하던 이전 FileStorage (비교 기준)
+
+Usage:
+    python benchmarks/cache_concurrency.py
+    python benchmarks/cache_concurrency.py --processes 8 --operations 2000
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cache_manager import CacheConfig, EmailCache  # noqa: E402
+from core.cache_storage import FileStorage, create_storage  # noqa: E402
+
+ACCOUNT = "bench"
+
+
+class LegacyFileStorage(FileStorage):
+    """임시 파일 없이 제자리에 쓰는 이전 방식."""
+
+    def set(self, account: str, kind: str, key: str, value: dict) -> None:
+        path = self._path(account, kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(value, f, ensure_ascii=False)
+
+
+def make_message(message_id: str, rng: random.Random) -> dict:
+    """체크섬이 포함된 메시지 생성 (본문 크기 무작위)."""
+    body = "".join(rng.choices("abcdefghij ", k=rng.randint(2_000, 20_000)))
+    return {
+        "id": message_id,
+        "label_ids": ["INBOX"],
+        "body": body,
+        "checksum": hashlib.sha1(body.encode()).hexdigest(),
+    }
+
+
+def open_cache(backend: str, cache_dir: str) -> EmailCache:
+    """벤치마크용 캐시 (메모리 계층 비활성화)."""
+    config = CacheConfig(backend="file" if backend == "legacy-file" else backend)
+    config.memory_max_entries = 0
+    config.max_messages_per_account = 100_000
+    storage = (
+        LegacyFileStorage(Path(cache_dir))
+        if backend == "legacy-file"
+        else create_storage(config.backend, Path(cache_dir))
+    )
+    return EmailCache(cache_dir=cache_dir, config=config, storage=storage)
+
+
+def worker(args: tuple) -> dict:
+    """무작위 읽기/쓰기 수행 후 결과 집계."""
+    backend, cache_dir, keys, operations, write_ratio, seed = args
+    rng = random.Random(seed)
+    cache = open_cache(backend, cache_dir)
+    stats = {"reads": 0, "writes": 0, "refetches": 0, "corrupt": 0}
+
+    for _ in range(operations):
+        message_id = rng.choice(keys)
+        if rng.random() < write_ratio:
+            cache.set_message(ACCOUNT, message_id, make_message(message_id, rng))
+            stats["writes"] += 1
+            continue
+
+        stats["reads"] += 1
+        message = cache.get_message(ACCOUNT, message_id)
+        if message is None:
+            # 실제 클라이언트라면 API로 다시 가져와야 함
+            stats["refetches"] += 1
+            cache.set_message(ACCOUNT, message_id, make_message(message_id, rng))
+        elif hashlib.sha1(message["body"].encode()).hexdigest() != message["checksum"]:
+            stats["corrupt"] += 1
+
+    cache.close()
+    return stats
+
+
+def run(backend: str, processes: int, keys: int, operations: int, write_ratio: float) -> dict:
+    """백엔드 하나에 대해 벤치마크 실행."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        rng = random.Random(0)
+        key_list = [f"msg{i}" for i in range(keys)]
+
+        cache = open_cache(backend, cache_dir)
+        cache.set_messages(ACCOUNT, {k: make_message(k, rng) for k in key_list})
+        cache.close()
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(
+                worker,
+                [
+                    (backend, cache_dir, key_list, operations, write_ratio, seed)
+                    for seed in range(processes)
+                ],
+            )
+        elapsed = time.perf_counter() - started
+
+    total = {name: sum(r[name] for r in results) for name in results[0]}
+    total["elapsed"] = elapsed
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐시 동시 접근 벤치마크")
+    parser.add_argument("--processes", type=int, default=8, help="프로세스 수")
+    parser.add_argument("--keys", type=int, default=50, help="공유 메시지 수")
+    parser.add_argument("--operations", type=int, default=1000, help="프로세스당 작업 수")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="쓰기 비율")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["legacy-file", "file", "sqlite"],
+        help="비교할 백엔드",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.processes} processes x {args.operations} ops, "
+        f"{args.keys} shared keys, write ratio {args.write_ratio}"
+    )
+    print(f"{'backend':<12} {'reads':>8} {'writes':>8} {'refetch':>8} {'corrupt':>8} {'time':>8}")
+    for backend in args.backends:
+        r = run(backend, args.processes, args.keys, args.operations, args.write_ratio)
+        print(
+            f"{backend:<12} {r['reads']:>8} {r['writes']:>8} "
+            f"{r['refetches']:>8} {r['corrupt']:>8} {r['elapsed']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
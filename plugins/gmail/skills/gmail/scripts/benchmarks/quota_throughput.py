@@ -0,0 +1,139 @@
+"""Quota Limiter Benchmark.
+
+여러 스레드가 쉬지 않고 할당량을 요청할 때 실제로 허용되는 처리량과
+임의의 1초 구간에서 허용된 최대 단위를 측정합니다.
+
+- fixed-window: 1초 고정 창 + 100ms 폴링을 하던 이전 QuotaManager (비교 기준)
+- token-bucket: 현재 QuotaManager
+- sustained: 처음 버킷(burst)을 제외한 정상 상태 처리량 (units/s)
+- peak 1s: 시작 직후를 포함한 임의의 1초 구간(슬라이딩 창)에서 허용된 최대 단위
+  (버킷이 가득 찬 상태로 시작하므로 최대 burst + rate_limit)
+- steady 1s: 첫 1초 이후 구간만 본 최대 단위 (참고용)
+
+Usage:
+    python benchmarks/quota_throughput.py
+    python benchmarks/quota_throughput.py --threads 16 --duration 10 --units 5
+    python benchmarks/quota_throughput.py --burst 250
+"""
+
+import argparse
+import bisect
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.quota_manager import QuotaManager  # noqa: E402
+
+USER = "bench"
+
+
+class FixedWindowQuotaManager:
+    """1초마다 사용량을 0으로 되돌리던 이전 방식."""
+
+    def __init__(self, rate_limit: int = QuotaManager.USER_RATE_LIMIT):
+        self.rate_limit = rate_limit
+        self.units_used = 0
+        self.last_reset = datetime.now()
+        self._lock = threading.Lock()
+
+    def _reset_if_needed(self) -> None:
+        now = datetime.now()
+        if now - self.last_reset > timedelta(seconds=1):
+            self.units_used = 0
+            self.last_reset = now
+
+    def can_execute(self, user: str, units: int) -> bool:
+        with self._lock:
+            self._reset_if_needed()
+            return self.units_used + units <= self.rate_limit
+
+    def record_usage(self, user: str, units: int) -> None:
+        with self._lock:
+            self._reset_if_needed()
+            self.units_used += units
+
+    def wait_for_quota(self, user: str, units: int, timeout: float = 30.0) -> bool:
+        while not self.can_execute(user, units):
+            time.sleep(0.1)
+        return True
+
+
+def run(manager, threads: int, duration: float, units: int) -> list[float]:
+    """스레드들이 duration 동안 요청을 반복하고 허용 시각 목록 반환."""
+    admitted: list[float] = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    stop_at = started + duration
+
+    def worker():
+        while True:
+            manager.wait_for_quota(USER, units)
+            now = time.monotonic()
+            if now >= stop_at:
+                return
+            # 검사와 기록 사이에 다른 스레드가 끼어드는 실제 호출 패턴
+            manager.record_usage(USER, units)
+            with lock:
+                admitted.append(now - started)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sorted(admitted)
+
+
+def window_peak(admitted: list[float], units: int) -> int:
+    """임의의 1초 슬라이딩 창에서 허용된 최대 단위."""
+    peak = 0
+    for i, t in enumerate(admitted):
+        j = bisect.bisect_left(admitted, t + 1.0)
+        peak = max(peak, (j - i) * units)
+    return peak
+
+
+def summarize(admitted: list[float], units: int, duration: float, burst: int) -> dict:
+    """처리량과 1초 구간 최대 사용량 계산."""
+    total = len(admitted) * units
+    return {
+        "total": total,
+        "sustained": (total - burst) / duration,
+        "peak": window_peak(admitted, units),
+        "steady": window_peak([t for t in admitted if t >= 1.0], units),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="할당량 제한기 벤치마크")
+    parser.add_argument("--threads", type=int, default=8, help="스레드 수")
+    parser.add_argument("--duration", type=float, default=5.0, help="측정 시간 (초)")
+    parser.add_argument("--units", type=int, default=5, help="요청당 단위")
+    parser.add_argument("--burst", type=int, default=None, help="토큰 버킷 크기")
+    args = parser.parse_args()
+
+    limit = QuotaManager.USER_RATE_LIMIT
+    bucket = QuotaManager(burst=args.burst)
+    print(
+        f"{args.threads} threads x {args.duration:.0f}s, "
+        f"{args.units} units/request, limit {limit} units/s, burst {bucket.burst}"
+    )
+    print(f"{'limiter':<14} {'total':>8} {'sustained':>10} {'peak 1s':>8} {'steady 1s':>10}")
+    for name, manager in (
+        ("fixed-window", FixedWindowQuotaManager()),
+        ("token-bucket", bucket),
+    ):
+        admitted = run(manager, args.threads, args.duration, args.units)
+        r = summarize(admitted, args.units, args.duration, getattr(manager, "burst", limit))
+        print(
+            f"{name:<14} {r['total']:>8} {r['sustained']:>10.1f} "
+            f"{r['peak']:>8} {r['steady']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
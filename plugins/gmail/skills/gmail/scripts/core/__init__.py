@@ -3,16 +3,66 @@
 Rate limiting, caching, retry logic, and batch processing for Gmail API.
 """
 
-from .quota_manager import QuotaManager, QuotaUnit
-from .retry_handler import exponential_backoff, RetryConfig
+from .quota_manager import QuotaManager, QuotaPriority, QuotaUnit, get_quota_manager
+from .quota_store import SharedQuotaStore
+from .retry_handler import (
+    async_exponential_backoff,
+    exponential_backoff,
+    get_retry_after,
+    is_rate_limit_error,
+    RetryConfig,
+)
 from .cache_manager import EmailCache
-from .batch_processor import BatchProcessor
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    get_circuit_breaker,
+    get_retry_budget,
+)
+from .deadline import DeadlineExceeded, DeadlineHttp, check, deadline, remaining
+from .prefetch import prefetch
+from .batch_processor import BatchProcessor, BatchResult
+from .async_http import AsyncGmailHttp
+from .history_sync import HistorySync
+from .search_index import SearchIndex
+from .query_parser import (
+    ParsedQuery,
+    QueryTerm,
+    UnsupportedQueryError,
+    parse_query,
+)
 
 __all__ = [
     "QuotaManager",
     "QuotaUnit",
+    "QuotaPriority",
+    "get_quota_manager",
+    "SharedQuotaStore",
     "exponential_backoff",
+    "async_exponential_backoff",
+    "is_rate_limit_error",
+    "get_retry_after",
     "RetryConfig",
     "EmailCache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryBudget",
+    "get_circuit_breaker",
+    "get_retry_budget",
+    "DeadlineExceeded",
+    "DeadlineHttp",
+    "deadline",
+    "check",
+    "remaining",
+    "prefetch",
     "BatchProcessor",
+    "BatchResult",
+    "AsyncGmailHttp",
+    "HistorySync",
+    "SearchIndex",
+    "ParsedQuery",
+    "QueryTerm",
+    "UnsupportedQueryError",
+    "parse_query",
 ]
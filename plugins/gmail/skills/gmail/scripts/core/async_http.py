@@ -0,0 +1,214 @@
+"""Async Gmail HTTP Transport.
+
+AsyncGmailClient가 쓰는 Gmail REST API 전송 계층 (httpx, 선택 의존성).
+
+- 연결 풀: keep-alive 연결을 재사용하고, 동시 요청 수를 max_connections로
+  제한 (나머지는 풀 타임아웃 없이 차례를 기다림)
+- 인증: google-auth 자격 증명으로 헤더를 채우고, 만료되면 한 번만 갱신
+- 오류: 4xx/5xx 응답은 googleapiclient.errors.HttpError로, 연결/타임아웃 오류는
+  ConnectionError/TimeoutError로 바꿔 동기 클라이언트와 같은 재시도/회로 차단기
+  규칙(core.retry_handler, core.circuit_breaker)을 그대로 적용
+- deadline: 요청별 타임아웃을 현재 deadline(core.deadline)까지 남은 시간으로 제한
+
+Install:
+    pip install "gmail-skill[async]"
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+import httplib2
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+
+from .deadline import DeadlineExceeded, clamp, remaining
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 선택 의존성
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://gmail.googleapis.com/gmail/v1/users/me/"
+
+
+class AsyncGmailHttp:
+    """연결 풀을 쓰는 비동기 Gmail API 전송 계층.
+
+    이벤트 루프 하나에서 사용합니다. httpx 클라이언트는 첫 요청 때 만들고
+    aclose()로 닫습니다.
+
+    Usage:
+        http = AsyncGmailHttp(creds)
+        try:
+            message = await http.request("GET", "messages/abc", params={"format": "metadata"})
+        finally:
+            await http.aclose()
+    """
+
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_KEEPALIVE = 20
+
+    def __init__(
+        self,
+        creds: Credentials,
+        timeout: float = 30.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        base_url: str = BASE_URL,
+    ):
+        """
+        Args:
+            creds: google-auth 자격 증명
+            timeout: deadline이 없을 때의 요청별 타임아웃 (초)
+            max_connections: 동시에 열 수 있는 최대 연결 수 (= 동시 요청 수)
+            max_keepalive: 유휴 상태로 유지할 최대 연결 수
+            base_url: API 기본 URL
+
+        Raises:
+            ImportError: httpx가 설치되지 않은 경우
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncGmailClient requires httpx: pip install 'gmail-skill[async]'"
+            )
+        self.creds = creds
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.base_url = base_url
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._slots = asyncio.Semaphore(max_connections)
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """httpx 클라이언트 (lazy-loaded)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+            )
+        return self._client
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+    ) -> dict:
+        """API 요청 후 JSON 응답 반환 (빈 응답이면 {}).
+
+        Args:
+            method: HTTP 메서드
+            path: base_url 기준 경로 (예: "messages/abc")
+            params: 쿼리 매개변수 (값이 목록이면 반복 매개변수)
+            body: JSON 본문
+
+        Returns:
+            응답 JSON
+
+        Raises:
+            HttpError: 4xx/5xx 응답
+            TimeoutError: 요청 타임아웃 (deadline 초과면 DeadlineExceeded)
+            ConnectionError: 연결 오류
+        """
+        operation = f"{method} {path}"
+        async with self._slots:
+            response = await self._send(method, path, params, body, operation)
+            if response.status_code == 401:
+                # 다른 곳에서 토큰이 폐기됨 - 갱신 후 한 번만 다시 시도
+                await self._refresh(force=True)
+                response = await self._send(method, path, params, body, operation)
+
+        if response.status_code >= 400:
+            raise self._http_error(response)
+        if not response.content:
+            return {}
+        return response.json()
+
+    async def aclose(self) -> None:
+        """연결 풀 종료."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        body: Optional[dict],
+        operation: str,
+    ) -> "httpx.Response":
+        timeout = clamp(self.timeout, operation)
+        headers = await self._auth_headers()
+        try:
+            return await self.client.request(
+                method,
+                path,
+                params=params,
+                json=body,
+                headers=headers,
+                timeout=timeout,
+            )
+        except httpx.TimeoutException as e:
+            # deadline 때문에 줄어든 타임아웃이면 서버 장애가 아니라 deadline 초과
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(f"{operation}: deadline 초과") from e
+            raise TimeoutError(f"{operation}: {e!r}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"{operation}: {e!r}") from e
+
+    async def _auth_headers(self) -> dict[str, str]:
+        """인증 헤더 (만료되었으면 먼저 갱신)."""
+        if not self.creds.valid:
+            await self._refresh()
+        headers: dict[str, str] = {}
+        self.creds.apply(headers)
+        return headers
+
+    async def _refresh(self, force: bool = False) -> None:
+        """토큰 갱신 (동시에 만료를 본 요청들은 한 번만 갱신)."""
+        stale = self.creds.token
+        async with self._refresh_lock:
+            if self.creds.token != stale or (self.creds.valid and not force):
+                return
+            logger.debug("Refreshing access token")
+            # google-auth의 갱신은 동기 HTTP 호출이므로 스레드에서 실행
+            await asyncio.to_thread(self.creds.refresh, Request())
+
+    @staticmethod
+    def _http_error(response: "httpx.Response") -> HttpError:
+        """httpx 응답을 googleapiclient HttpError로 변환."""
+        info: dict[str, Any] = dict(response.headers)
+        info["status"] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason_phrase
+        return HttpError(resp, response.content, uri=str(response.request.url))
+
+
+if __name__ == "__main__":
+    # 테스트 (네트워크 없이 오류 변환만 확인)
+    if httpx is None:
+        print("httpx not installed")
+    else:
+        request = httpx.Request("GET", BASE_URL + "messages/x")
+        response = httpx.Response(
+            429,
+            headers={"Retry-After": "2"},
+            content=json.dumps({"error": {"code": 429, "message": "Too many"}}).encode(),
+            request=request,
+        )
+        error = AsyncGmailHttp._http_error(response)
+        print(f"Converted: {error.resp.status} retry-after={error.resp.get('retry-after')}")
@@ -11,16 +11,37 @@ Reference:
     https://developers.google.com/gmail/api/guides/batch
 """
 
+import contextvars
+import heapq
 import logging
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Optional
 
 from googleapiclient.discovery import Resource
 from googleapiclient.http import BatchHttpRequest
 
-from .quota_manager import QuotaManager, QuotaUnit, get_quota_manager
-from .retry_handler import exponential_backoff
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    get_circuit_breaker,
+    get_retry_budget,
+    is_failure,
+)
+from .deadline import DeadlineExceeded, remaining
+from .quota_manager import QuotaManager, QuotaPriority, QuotaUnit, get_quota_manager
+from .retry_handler import (
+    calculate_delay,
+    exponential_backoff,
+    get_retry_after,
+    is_rate_limit_error,
+    is_retryable_error,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +55,20 @@ class BatchResult:
     failed: int = 0
     results: list[dict] = field(default_factory=list)
     errors: list[dict] = field(default_factory=list)
+    # 일일 할당량 부족(또는 Gmail 장애로 회로 차단)으로 처리하지 않은 ID와
+    # 다시 시도할 수 있는 시각
+    deferred: list[str] = field(default_factory=list)
+    resume_after: Optional[datetime] = None
+
+
+@dataclass
+class _BatchOutcome:
+    """배치 하나의 하위 요청 결과 (워커 스레드에서 채워짐)."""
+
+    results: dict[str, dict] = field(default_factory=dict)  # ID: 결과 항목
+    errors: list[tuple[str, str]] = field(default_factory=list)  # 영구 오류 (ID, 메시지)
+    retries: list[tuple[str, Exception]] = field(default_factory=list)  # 일시적 오류
+    failures: list[str] = field(default_factory=list)  # 서버 장애 오류 (회로 차단기용)
 
 
 class BatchProcessor:
@@ -41,6 +76,22 @@ class BatchProcessor:
 
     여러 API 호출을 효율적으로 일괄 처리합니다.
 
+    배치 크기는 요청별 할당량 비용(QuotaUnit)과 남은 토큰으로 배치마다
+    계산합니다 (_batch_size_for). 예: 기본 버킷 크기 100 안에 들어가도록
+    messages.get(5)은 최대 20개, threads.get(10)은 최대 10개.
+
+    workers를 2 이상으로 주면 여러 배치를 동시에 실행합니다 (파이프라인).
+    배치 사이에 고정 지연 없이 할당량 관리자만 속도를 조절하므로, 처리량은
+    왕복 지연이 아니라 할당량 한도로 정해집니다.
+
+    하위 요청이 일시적 오류(429, 5xx)로 실패하면 백오프 후 이후 배치에서 다시
+    보내므로, result.errors에는 404/400 같은 영구 오류만 남습니다.
+
+    계정별 CircuitBreaker가 열리면 남은 ID는 실패로 처리하지 않고
+    result.deferred에 남기며 (복구 확인 요청이 진행 중이면 그 결과를 기다림), 성공한 요청은 GmailClient와 공유하는
+    RetryBudget에 반영합니다. deadline 블록(core.deadline) 안에서 시간이
+    다 되어도 마찬가지로 남은 ID를 result.deferred로 돌려줍니다.
+
     Usage:
         processor = BatchProcessor(gmail_service)
 
@@ -57,7 +108,16 @@ class BatchProcessor:
     """
 
     MAX_BATCH_SIZE = 50  # Gmail API 최대 배치 크기
-    DEFAULT_DELAY = 0.5  # 배치 간 기본 지연 (초)
+    LIST_PAGE_SIZE = 500  # messages.list 최대 페이지 크기
+    # ID 목록을 받는 엔드포인트의 요청당 최대 ID 수 (HTTP 배치와 별개)
+    MAX_IDS_PER_CALL = {
+        "messages.batchModify": 1000,
+        "messages.batchDelete": 1000,
+    }
+    DEFAULT_DELAY = 0.0  # 배치 간 기본 지연 (초) - 속도는 할당량 관리자가 조절
+    MIN_FILL = 0.5  # 토큰이 부족할 때 모아서 보낼 최소 배치 크기 (최대 크기 대비 비율)
+    DEFAULT_MAX_RETRIES = 5  # 일시적 오류로 실패한 하위 요청의 최대 재시도 횟수
+    MAX_RETRY_DELAY = 60.0  # 하위 요청 재시도 최대 대기 (초)
 
     def __init__(
         self,
@@ -66,18 +126,37 @@ class BatchProcessor:
         user: str = "default",
         batch_size: int = MAX_BATCH_SIZE,
         delay_between_batches: float = DEFAULT_DELAY,
+        budget: Optional[RetryBudget] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        workers: int = 1,
+        http_factory: Optional[Callable[[], Any]] = None,
     ):
         """
         Args:
             service: Gmail API 서비스 객체
             quota_manager: 할당량 관리자 (없으면 기본 사용)
             user: 사용자 식별자 (할당량 추적용)
-            batch_size: 배치당 최대 요청 수
+            batch_size: 배치당 최대 요청 수 (할당량에 맞게 더 작게 나눌 수 있음)
             delay_between_batches: 배치 간 지연 (초)
+            budget: 재시도 예산 (없으면 계정별 기본 인스턴스)
+            breaker: 회로 차단기 (없으면 계정별 기본 인스턴스)
+            max_retries: 일시적 오류로 실패한 하위 요청의 최대 재시도 횟수
+            workers: 동시에 실행할 배치 수 (2 이상이면 http_factory 필요)
+            http_factory: 워커별 HTTP 연결(httplib2.Http 호환) 생성 함수
         """
+        if workers > 1 and http_factory is None:
+            raise ValueError("workers > 1 requires http_factory (httplib2.Http is not thread-safe)")
+
         self.service = service
         self.quota_manager = quota_manager or get_quota_manager()
         self.user = user
+        self.budget = budget or get_retry_budget(user)
+        self.breaker = breaker or get_circuit_breaker(user)
+        self.max_retries = max_retries
+        self.workers = max(1, workers)
+        self.http_factory = http_factory
+        self._local = threading.local()
         self.batch_size = min(batch_size, self.MAX_BATCH_SIZE)
         self.delay = delay_between_batches
 
@@ -101,59 +180,17 @@ class BatchProcessor:
         Returns:
             BatchResult 객체
         """
-        result = BatchResult(total=len(message_ids))
-
-        for i in range(0, len(message_ids), self.batch_size):
-            batch_ids = message_ids[i : i + self.batch_size]
-            batch_results = []
-            batch_errors = []
-
-            def callback_factory(msg_id: str):
-                def callback(request_id, response, exception):
-                    if exception:
-                        batch_errors.append({
-                            "message_id": msg_id,
-                            "error": str(exception),
-                        })
-                    else:
-                        batch_results.append(response)
-
-                return callback
-
-            # 배치 요청 생성
-            batch = self.service.new_batch_http_request()
-
-            for msg_id in batch_ids:
-                batch.add(
-                    self.service.users()
-                    .messages()
-                    .get(userId="me", id=msg_id, format=format),
-                    callback=callback_factory(msg_id),
-                )
-
-            # 할당량 확인 및 대기
-            units = len(batch_ids) * QuotaUnit.MESSAGES_GET
-            self.quota_manager.wait_for_quota(self.user, units)
-
-            # 배치 실행
-            batch.execute()
-            self.quota_manager.record_usage(self.user, units)
-
-            # 결과 수집
-            result.results.extend(batch_results)
-            result.errors.extend(batch_errors)
-            result.succeeded += len(batch_results)
-            result.failed += len(batch_errors)
-
-            # 진행 상황 콜백
-            if on_progress:
-                on_progress(min(i + self.batch_size, len(message_ids)), len(message_ids))
-
-            # 다음 배치 전 지연
-            if i + self.batch_size < len(message_ids):
-                time.sleep(self.delay)
-
-        return result
+        return self._run_batches(
+            message_ids,
+            QuotaUnit.MESSAGES_GET,
+            "messages.get",
+            lambda msg_id: self.service.users()
+            .messages()
+            .get(userId="me", id=msg_id, format=format),
+            on_success=lambda msg_id, response: response,
+            id_key="message_id",
+            on_progress=on_progress,
+        )
 
     def batch_modify_labels(
         self,
@@ -162,7 +199,7 @@ class BatchProcessor:
         remove_labels: Optional[list[str]] = None,
         on_progress: Optional[Callable[[int, int], None]] = None,
     ) -> BatchResult:
-        """라벨 일괄 수정 (batchModify API 사용).
+        """라벨 일괄 수정 (batchModify API 사용, 요청당 최대 1,000개).
 
         Args:
             message_ids: 수정할 메시지 ID 목록
@@ -173,48 +210,17 @@ class BatchProcessor:
         Returns:
             BatchResult 객체
         """
-        result = BatchResult(total=len(message_ids))
-
-        for i in range(0, len(message_ids), self.batch_size):
-            batch_ids = message_ids[i : i + self.batch_size]
-
-            # 할당량 확인 및 대기
-            units = QuotaUnit.MESSAGES_BATCH_MODIFY
-            self.quota_manager.wait_for_quota(self.user, units)
-
-            try:
-                self.service.users().messages().batchModify(
-                    userId="me",
-                    body={
-                        "ids": batch_ids,
-                        "addLabelIds": add_labels or [],
-                        "removeLabelIds": remove_labels or [],
-                    },
-                ).execute()
-
-                self.quota_manager.record_usage(self.user, units)
-
-                # batchModify는 성공 시 빈 응답 반환
-                result.succeeded += len(batch_ids)
-                result.results.extend([{"id": mid, "status": "modified"} for mid in batch_ids])
-
-            except Exception as e:
-                result.failed += len(batch_ids)
-                result.errors.append({
-                    "message_ids": batch_ids,
-                    "error": str(e),
-                })
-                logger.error(f"Batch modify failed: {e}")
-
-            # 진행 상황 콜백
-            if on_progress:
-                on_progress(min(i + self.batch_size, len(message_ids)), len(message_ids))
-
-            # 다음 배치 전 지연
-            if i + self.batch_size < len(message_ids):
-                time.sleep(self.delay)
-
-        return result
+        body = {"addLabelIds": add_labels or [], "removeLabelIds": remove_labels or []}
+        return self._run_id_chunks(
+            message_ids,
+            QuotaUnit.MESSAGES_BATCH_MODIFY,
+            "messages.batchModify",
+            lambda chunk: self.service.users()
+            .messages()
+            .batchModify(userId="me", body={"ids": chunk, **body}),
+            status="modified",
+            on_progress=on_progress,
+        )
 
     def batch_trash_messages(
         self,
@@ -230,58 +236,22 @@ class BatchProcessor:
         Returns:
             BatchResult 객체
         """
-        result = BatchResult(total=len(message_ids))
-
-        for i in range(0, len(message_ids), self.batch_size):
-            batch_ids = message_ids[i : i + self.batch_size]
-            batch_results = []
-            batch_errors = []
-
-            def callback_factory(msg_id: str):
-                def callback(request_id, response, exception):
-                    if exception:
-                        batch_errors.append({
-                            "message_id": msg_id,
-                            "error": str(exception),
-                        })
-                    else:
-                        batch_results.append({"id": msg_id, "status": "trashed"})
-
-                return callback
-
-            batch = self.service.new_batch_http_request()
-
-            for msg_id in batch_ids:
-                batch.add(
-                    self.service.users().messages().trash(userId="me", id=msg_id),
-                    callback=callback_factory(msg_id),
-                )
-
-            units = len(batch_ids) * QuotaUnit.MESSAGES_TRASH
-            self.quota_manager.wait_for_quota(self.user, units)
-
-            batch.execute()
-            self.quota_manager.record_usage(self.user, units)
-
-            result.results.extend(batch_results)
-            result.errors.extend(batch_errors)
-            result.succeeded += len(batch_results)
-            result.failed += len(batch_errors)
-
-            if on_progress:
-                on_progress(min(i + self.batch_size, len(message_ids)), len(message_ids))
-
-            if i + self.batch_size < len(message_ids):
-                time.sleep(self.delay)
-
-        return result
+        return self._run_batches(
+            message_ids,
+            QuotaUnit.MESSAGES_TRASH,
+            "messages.trash",
+            lambda msg_id: self.service.users().messages().trash(userId="me", id=msg_id),
+            on_success=lambda msg_id, response: {"id": msg_id, "status": "trashed"},
+            id_key="message_id",
+            on_progress=on_progress,
+        )
 
     def batch_delete_messages(
         self,
         message_ids: list[str],
         on_progress: Optional[Callable[[int, int], None]] = None,
     ) -> BatchResult:
-        """메시지 일괄 영구 삭제.
+        """메시지 일괄 영구 삭제 (batchDelete API 사용, 요청당 최대 1,000개).
 
         주의: 이 작업은 되돌릴 수 없습니다!
 
@@ -292,51 +262,16 @@ class BatchProcessor:
         Returns:
             BatchResult 객체
         """
-        result = BatchResult(total=len(message_ids))
-
-        for i in range(0, len(message_ids), self.batch_size):
-            batch_ids = message_ids[i : i + self.batch_size]
-            batch_results = []
-            batch_errors = []
-
-            def callback_factory(msg_id: str):
-                def callback(request_id, response, exception):
-                    if exception:
-                        batch_errors.append({
-                            "message_id": msg_id,
-                            "error": str(exception),
-                        })
-                    else:
-                        batch_results.append({"id": msg_id, "status": "deleted"})
-
-                return callback
-
-            batch = self.service.new_batch_http_request()
-
-            for msg_id in batch_ids:
-                batch.add(
-                    self.service.users().messages().delete(userId="me", id=msg_id),
-                    callback=callback_factory(msg_id),
-                )
-
-            units = len(batch_ids) * QuotaUnit.MESSAGES_DELETE
-            self.quota_manager.wait_for_quota(self.user, units)
-
-            batch.execute()
-            self.quota_manager.record_usage(self.user, units)
-
-            result.results.extend(batch_results)
-            result.errors.extend(batch_errors)
-            result.succeeded += len(batch_results)
-            result.failed += len(batch_errors)
-
-            if on_progress:
-                on_progress(min(i + self.batch_size, len(message_ids)), len(message_ids))
-
-            if i + self.batch_size < len(message_ids):
-                time.sleep(self.delay)
-
-        return result
+        return self._run_id_chunks(
+            message_ids,
+            QuotaUnit.MESSAGES_BATCH_DELETE,
+            "messages.batchDelete",
+            lambda chunk: self.service.users()
+            .messages()
+            .batchDelete(userId="me", body={"ids": chunk}),
+            status="deleted",
+            on_progress=on_progress,
+        )
 
     # =========================================================================
     # Thread Operations
@@ -358,53 +293,17 @@ class BatchProcessor:
         Returns:
             BatchResult 객체
         """
-        result = BatchResult(total=len(thread_ids))
-
-        for i in range(0, len(thread_ids), self.batch_size):
-            batch_ids = thread_ids[i : i + self.batch_size]
-            batch_results = []
-            batch_errors = []
-
-            def callback_factory(thread_id: str):
-                def callback(request_id, response, exception):
-                    if exception:
-                        batch_errors.append({
-                            "thread_id": thread_id,
-                            "error": str(exception),
-                        })
-                    else:
-                        batch_results.append(response)
-
-                return callback
-
-            batch = self.service.new_batch_http_request()
-
-            for thread_id in batch_ids:
-                batch.add(
-                    self.service.users()
-                    .threads()
-                    .get(userId="me", id=thread_id, format=format),
-                    callback=callback_factory(thread_id),
-                )
-
-            units = len(batch_ids) * QuotaUnit.THREADS_GET
-            self.quota_manager.wait_for_quota(self.user, units)
-
-            batch.execute()
-            self.quota_manager.record_usage(self.user, units)
-
-            result.results.extend(batch_results)
-            result.errors.extend(batch_errors)
-            result.succeeded += len(batch_results)
-            result.failed += len(batch_errors)
-
-            if on_progress:
-                on_progress(min(i + self.batch_size, len(thread_ids)), len(thread_ids))
-
-            if i + self.batch_size < len(thread_ids):
-                time.sleep(self.delay)
-
-        return result
+        return self._run_batches(
+            thread_ids,
+            QuotaUnit.THREADS_GET,
+            "threads.get",
+            lambda thread_id: self.service.users()
+            .threads()
+            .get(userId="me", id=thread_id, format=format),
+            on_success=lambda thread_id, response: response,
+            id_key="thread_id",
+            on_progress=on_progress,
+        )
 
     # =========================================================================
     # Utility Methods
@@ -414,95 +313,657 @@ class BatchProcessor:
         self,
         query: str = "is:unread",
         max_messages: int = 500,
+        on_modified: Optional[Callable[[list[str]], None]] = None,
     ) -> BatchResult:
         """조건에 맞는 메시지 전체 읽음 처리.
 
+        목록 페이지를 받는 대로 수정하고, 수정한 뒤 첫 페이지부터 다시 조회합니다.
+        일일 할당량이 부족하면 들어가는 만큼만 처리하고 나머지는
+        result.deferred에 남깁니다 (result.resume_after 이후 다시 실행).
+
         Args:
             query: 검색 쿼리 (기본: 읽지 않음)
             max_messages: 최대 처리 메시지 수
+            on_modified: 수정한 ID로 페이지마다 호출
 
         Returns:
             BatchResult 객체
         """
-        # 먼저 메시지 ID 목록 조회
-        message_ids = []
-        page_token = None
-
-        while len(message_ids) < max_messages:
-            result = (
-                self.service.users()
-                .messages()
-                .list(
-                    userId="me",
-                    q=query,
-                    maxResults=min(100, max_messages - len(message_ids)),
-                    pageToken=page_token,
-                )
-                .execute()
-            )
-
-            for msg in result.get("messages", []):
-                message_ids.append(msg["id"])
-
-            page_token = result.get("nextPageToken")
-            if not page_token:
-                break
-
-        if not message_ids:
-            return BatchResult()
-
-        return self.batch_modify_labels(
-            message_ids,
-            remove_labels=["UNREAD"],
-        )
+        return self._modify_matching(query, max_messages, remove_labels=["UNREAD"], on_modified=on_modified)
 
     def archive_all(
         self,
         query: str = "",
         max_messages: int = 500,
+        on_modified: Optional[Callable[[list[str]], None]] = None,
     ) -> BatchResult:
         """조건에 맞는 메시지 전체 보관처리.
 
+        목록 페이지를 받는 대로 수정하고, 수정한 뒤 첫 페이지부터 다시 조회합니다.
+        일일 할당량이 부족하면 들어가는 만큼만 처리하고 나머지는
+        result.deferred에 남깁니다 (result.resume_after 이후 다시 실행).
+
         Args:
             query: 검색 쿼리
             max_messages: 최대 처리 메시지 수
+            on_modified: 수정한 ID로 페이지마다 호출
 
         Returns:
             BatchResult 객체
         """
         # INBOX 라벨이 있는 메시지만 조회
         full_query = f"in:inbox {query}".strip()
+        return self._modify_matching(full_query, max_messages, remove_labels=["INBOX"], on_modified=on_modified)
 
-        message_ids = []
-        page_token = None
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
 
-        while len(message_ids) < max_messages:
-            result = (
-                self.service.users()
-                .messages()
-                .list(
-                    userId="me",
-                    q=full_query,
-                    maxResults=min(100, max_messages - len(message_ids)),
-                    pageToken=page_token,
-                )
-                .execute()
+    def _check_rate_limit(self, error: Exception) -> None:
+        """속도 제한 오류면 학습된 rate를 낮추고 (AIMD) 서버가 알려준 시각까지 중지."""
+        if is_rate_limit_error(error):
+            self.quota_manager.report_rate_limited(self.user, get_retry_after(error))
+
+    def _on_rate_limited(self, error: Exception, retry_after: Optional[float]) -> None:
+        """속도 제한 응답마다 호출 (exponential_backoff on_rate_limited)."""
+        self.quota_manager.report_rate_limited(self.user, retry_after)
+
+    def _defer(
+        self,
+        result: BatchResult,
+        unprocessed: list[str],
+        resume_after: datetime,
+        reason: str,
+    ) -> None:
+        """처리하지 않은 ID를 result.deferred에 기록."""
+        logger.warning(f"{reason}; deferred {len(unprocessed)} items")
+        result.deferred.extend(unprocessed)
+        result.resume_after = resume_after
+
+    def _quota_resume_after(self) -> datetime:
+        """할당량을 확보하지 못해 중단할 때 다시 시도할 시각 (서버가 알려준 일시 중지의 끝)."""
+        pause = self.quota_manager.get_pause(self.user)
+        return datetime.now(timezone.utc) + timedelta(seconds=pause)
+
+    def _record_outcome(self, succeeded: int, failures: int) -> None:
+        """배치 결과를 회로 차단기와 재시도 예산에 반영.
+
+        하위 요청이 하나라도 성공했거나 장애가 아닌 오류만 있으면 서버가
+        응답하고 있는 것으로 봅니다.
+        """
+        if failures and not succeeded:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if succeeded:
+            self.budget.record_success(succeeded)
+
+    def _chunk_size(self, method: str) -> int:
+        """ID 목록을 받는 엔드포인트의 요청당 최대 ID 수."""
+        return self.MAX_IDS_PER_CALL.get(method, self.batch_size)
+
+    def _batch_size_for(self, unit_cost: int) -> int:
+        """요청당 할당량 비용과 현재 토큰으로 다음 배치 크기 계산.
+
+        - 배치 비용이 버킷 크기(학습된 rate 반영)를 넘지 않도록 분할
+          (넘으면 토큰이 끝내 모이지 않아 대기가 타임아웃됨)
+        - 지금 토큰으로 처리할 수 있는 만큼 보내되, 토큰이 적으면 작은 배치를
+          여러 번 보내지 않고 최대 크기의 MIN_FILL 이상이 될 때까지 모아서 보냄
+
+        Args:
+            unit_cost: 하위 요청 하나의 할당량 단위
+
+        Returns:
+            배치에 넣을 요청 수 (1 이상)
+        """
+        quota = self.quota_manager
+        capacity = quota.burst * quota.get_rate(self.user) / quota.rate_limit
+        largest = max(1, min(self.batch_size, int(capacity // unit_cost)))
+        smallest = max(1, int(largest * self.MIN_FILL))
+
+        available = quota.get_remaining_rate(self.user) // unit_cost
+        return max(smallest, min(largest, available))
+
+    def _run_id_chunks(
+        self,
+        ids: list[str],
+        unit_cost: int,
+        method: str,
+        make_request: Callable[[list[str]], Any],
+        status: str,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BatchResult:
+        """ID 목록을 받는 엔드포인트(batchModify, batchDelete)로 일괄 처리.
+
+        ID를 엔드포인트가 받는 최대 개수(MAX_IDS_PER_CALL)씩 나눠 요청 하나로
+        보냅니다. 요청 단위로 재시도하고(재시도 예산/회로 차단기 공유),
+        재시도할 수 없는 오류는 해당 ID 묶음 전체를 result.errors에 기록합니다.
+        재시도도 요청을 다시 보내므로 시도마다 할당량을 기다리고 기록합니다.
+
+        Args:
+            ids: 처리할 ID 목록
+            unit_cost: 요청 하나의 할당량 단위
+            method: API 메서드 이름 (MAX_IDS_PER_CALL 키, 일일 사용 기록용)
+            make_request: ID 묶음으로 API 요청 생성
+            status: 성공한 결과 항목의 status 값
+            on_progress: 진행 상황 콜백 (current, total)
+
+        Returns:
+            BatchResult 객체
+        """
+        result = BatchResult(total=len(ids))
+        size = self._chunk_size(method)
+
+        def _reacquire(attempt: int, error: Exception, delay: float) -> None:
+            # 다시 보내기 전에 할당량 확보 (속도 제한은 실패한 시도에서 이미 반영)
+            self.quota_manager.wait_for_quota(
+                self.user, unit_cost, priority=QuotaPriority.BULK
             )
 
-            for msg in result.get("messages", []):
-                message_ids.append(msg["id"])
+        @exponential_backoff(
+            max_delay=self.MAX_RETRY_DELAY,
+            on_retry=_reacquire,
+            budget=self.budget,
+            breaker=self.breaker,
+        )
+        def _execute(chunk: list[str]):
+            try:
+                response = self._execute(make_request(chunk))
+            except Exception as e:
+                # 실패한 시도도 할당량을 씀 - 속도 제한을 먼저 반영한 뒤 (실패로) 기록
+                self._check_rate_limit(e)
+                self.quota_manager.record_usage(
+                    self.user, unit_cost, method, succeeded=False
+                )
+                raise
+            self.quota_manager.record_usage(self.user, unit_cost, method)
+            return response
+
+        for i in range(0, len(ids), size):
+            chunk = ids[i : i + size]
 
-            page_token = result.get("nextPageToken")
-            if not page_token:
+            # 할당량 확인 및 대기
+            try:
+                self.quota_manager.wait_for_quota(
+                    self.user, unit_cost, priority=QuotaPriority.BULK
+                )
+            except DeadlineExceeded as e:
+                self._defer(result, ids[i:], datetime.now(timezone.utc), str(e))
+                break
+            except TimeoutError as e:
+                # 서버가 알려준 재시도 시각(Retry-After)이 대기 한도보다 멂
+                self._defer(result, ids[i:], self._quota_resume_after(), str(e))
                 break
 
-        if not message_ids:
-            return BatchResult()
+            try:
+                _execute(chunk)
+            except CircuitOpenError as e:
+                # 회로가 열려 보내지 않은 요청의 할당량 예약 반납
+                self.quota_manager.release(self.user, unit_cost)
+                resume_after = datetime.now(timezone.utc) + timedelta(seconds=e.retry_in)
+                self._defer(result, ids[i:], resume_after, str(e))
+                break
+            except DeadlineExceeded as e:
+                self._defer(result, ids[i:], datetime.now(timezone.utc), str(e))
+                break
+            except TimeoutError as e:
+                # 재시도 전 할당량 대기 실패 (또는 요청 타임아웃) - 실패가 아니라 연기
+                self._defer(result, ids[i:], self._quota_resume_after(), str(e))
+                break
+            except Exception as e:
+                if is_rate_limit_error(e) and self.quota_manager.get_pause(self.user) > 0:
+                    # 서버가 알려준 재시도 시각이 너무 멀어 포기 - 그 시각 이후로 연기
+                    self._defer(result, ids[i:], self._quota_resume_after(), str(e))
+                    break
+                result.failed += len(chunk)
+                result.errors.append({"message_ids": chunk, "error": str(e)})
+                logger.error(f"{method} failed for {len(chunk)} ids: {e}")
+            else:
+                # batchModify/batchDelete는 성공 시 빈 응답 반환
+                result.succeeded += len(chunk)
+                result.results.extend({"id": item_id, "status": status} for item_id in chunk)
 
-        return self.batch_modify_labels(
-            message_ids,
-            remove_labels=["INBOX"],
+            # 진행 상황 콜백
+            if on_progress:
+                on_progress(min(i + size, len(ids)), len(ids))
+
+            # 다음 요청 전 지연
+            if i + size < len(ids) and self.delay:
+                time.sleep(self.delay)
+
+        return result
+
+    def _run_batches(
+        self,
+        ids: list[str],
+        unit_cost: int,
+        method: str,
+        make_request: Callable[[str], Any],
+        on_success: Callable[[str, Any], dict],
+        id_key: str,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BatchResult:
+        """ID별 요청을 할당량에 맞춘 크기의 배치로 나눠 실행.
+
+        workers > 1이면 최대 workers개의 배치를 동시에 실행합니다. 배치 구성과
+        할당량 대기는 호출 스레드에서 하므로 속도는 할당량 관리자만 조절하고,
+        각 워커는 자기 HTTP 연결(http_factory)로 배치를 보냅니다.
+
+        일시적 오류(429, 5xx, 연결 오류)로 실패한 하위 요청은 백오프 후 이후
+        배치에 다시 넣습니다 (ID별 max_retries, 계정 재시도 예산 안에서 -
+        예산은 재시도가 필요한 배치마다 한 번 차감).
+        배치 요청 전체가 일시적 오류로 실패해도 같은 방식으로 재시도합니다.
+        result.errors에는 재시도할 수 없는 오류만 남습니다.
+
+        결과와 오류는 완료 순서와 관계없이 ids 순서로 정렬됩니다.
+
+        Args:
+            ids: 처리할 ID 목록
+            unit_cost: 하위 요청 하나의 할당량 단위
+            method: API 메서드 이름 (일일 사용 기록용)
+            make_request: ID로 API 요청 생성
+            on_success: (ID, 응답)으로 결과 항목 생성
+            id_key: 오류 항목에 ID를 담을 키
+            on_progress: 진행 상황 콜백 (current, total)
+
+        Returns:
+            BatchResult 객체
+        """
+        result = BatchResult(total=len(ids))
+        pending = deque(ids)
+        waiting: list[tuple[float, int, str]] = []  # (재시도 시각, 순번, ID) 힙
+        attempts: dict[str, int] = {}
+        succeeded: dict[str, dict] = {}
+        failed: dict[str, dict] = {}
+        in_flight: dict[Future, tuple[list[str], int, _BatchOutcome]] = {}
+        stop: Optional[tuple[datetime, str]] = None  # 중단 시 (다시 시도할 시각, 사유)
+
+        executor = None
+        if self.workers > 1:
+            executor = ThreadPoolExecutor(self.workers, thread_name_prefix="gmail-batch")
+
+        try:
+            while in_flight or (stop is None and (pending or waiting)):
+                probing = False  # 다른 확인 요청(HALF_OPEN)의 결과를 기다리는 중
+
+                # 빈 워커만큼 배치 제출
+                while stop is None and len(in_flight) < self.workers:
+                    left = remaining()
+                    if left is not None and left <= 0:
+                        stop = (datetime.now(timezone.utc), "deadline exceeded")
+                        break
+
+                    # 재시도 시각이 된 요청을 먼저 처리
+                    now = time.monotonic()
+                    ready = []
+                    while waiting and waiting[0][0] <= now:
+                        ready.append(heapq.heappop(waiting)[2])
+                    pending.extendleft(reversed(ready))
+                    if not pending:
+                        break
+
+                    size = self._batch_size_for(unit_cost)
+                    batch_ids = [pending.popleft() for _ in range(min(size, len(pending)))]
+
+                    # 회로 차단기 확인 (할당량을 예약하기 전에)
+                    try:
+                        self.breaker.before_call()
+                    except CircuitOpenError as e:
+                        pending.extendleft(reversed(batch_ids))
+                        if e.retry_in <= 0:
+                            # 확인 요청이 진행 중 - 중단하지 않고 결과를 기다린 뒤 다시 제출
+                            probing = True
+                            break
+                        resume_after = datetime.now(timezone.utc) + timedelta(seconds=e.retry_in)
+                        stop = (resume_after, str(e))
+                        break
+
+                    # 할당량 확인 및 대기
+                    units = len(batch_ids) * unit_cost
+                    try:
+                        self.quota_manager.wait_for_quota(
+                            self.user, units, priority=QuotaPriority.BULK
+                        )
+                    except DeadlineExceeded as e:
+                        self.breaker.cancel()
+                        pending.extendleft(reversed(batch_ids))
+                        stop = (datetime.now(timezone.utc), str(e))
+                        break
+                    except TimeoutError as e:
+                        # 서버가 알려준 재시도 시각(Retry-After)이 대기 한도보다 멂
+                        self.breaker.cancel()
+                        pending.extendleft(reversed(batch_ids))
+                        stop = (self._quota_resume_after(), str(e))
+                        break
+
+                    batch, outcome = self._build_batch(batch_ids, make_request, on_success)
+                    in_flight[self._submit(executor, batch)] = (batch_ids, units, outcome)
+
+                if not in_flight:
+                    if probing:
+                        # 다른 호출자(GmailClient 등)의 확인 요청
+                        left = remaining()
+                        self.breaker.wait_for_probe(
+                            self.breaker.reset_timeout if left is None else max(0.0, left)
+                        )
+                    elif stop is None and waiting:
+                        # 재시도 대기 중인 요청만 남음
+                        pause = waiting[0][0] - time.monotonic()
+                        left = remaining()
+                        time.sleep(max(0.0, pause if left is None else min(pause, left)))
+                    continue
+
+                # 완료된 배치 처리 (빈 워커가 있으면 다음 재시도 시각에 깨어남)
+                timeout = None
+                if waiting and len(in_flight) < self.workers and stop is None:
+                    timeout = max(0.0, waiting[0][0] - time.monotonic())
+                completed, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in completed:
+                    batch_ids, units, outcome = in_flight.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        # 속도 제한을 사용량 기록보다 먼저 반영
+                        self._check_rate_limit(error)
+                    # 일시적 오류(429, 5xx)가 섞인 배치는 AIMD 성공으로 보지 않음
+                    self.quota_manager.record_usage(
+                        self.user,
+                        units,
+                        method,
+                        calls=len(batch_ids),
+                        succeeded=error is None and not outcome.retries,
+                    )
+
+                    if error is None:
+                        self._record_outcome(len(outcome.results), len(outcome.failures))
+                        retries = outcome.retries
+                    elif isinstance(error, DeadlineExceeded):
+                        self.breaker.record_error(error)
+                        pending.extendleft(reversed(batch_ids))
+                        stop = stop or (datetime.now(timezone.utc), str(error))
+                        continue
+                    else:
+                        self.breaker.record_error(error)
+                        if not (is_retryable_error(error) or is_failure(error)):
+                            raise error
+                        # 배치 전체가 일시적 오류 - 모든 하위 요청을 재시도 대상으로
+                        retries = [(item_id, error) for item_id in batch_ids]
+
+                    succeeded.update(outcome.results)
+                    for item_id, error_text in outcome.errors:
+                        failed[item_id] = {id_key: item_id, "error": error_text}
+
+                    # 일시적 오류: 백오프 후 다시 넣거나, 재시도할 수 없으면 오류로
+                    # (재시도 예산은 HTTP 요청 단위로 배치당 한 번 차감)
+                    within_budget = not retries or self.budget.try_retry()
+                    for item_id, retry_error in retries:
+                        delay = self._retry_delay(attempts.get(item_id, 0), retry_error)
+                        if delay is None or not within_budget:
+                            failed[item_id] = {id_key: item_id, "error": str(retry_error)}
+                            continue
+                        attempts[item_id] = attempts.get(item_id, 0) + 1
+                        heapq.heappush(
+                            waiting, (time.monotonic() + delay, len(attempts), item_id)
+                        )
+
+                    if retries:
+                        logger.warning(
+                            f"{len(retries)} {method} requests failed transiently; "
+                            f"{len(waiting)} scheduled for retry"
+                        )
+
+                    # 진행 상황 콜백
+                    if on_progress:
+                        on_progress(len(succeeded) + len(failed), len(ids))
+
+                # 다음 배치 전 지연
+                if (pending or waiting) and self.delay:
+                    time.sleep(self.delay)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        if stop is not None:
+            unprocessed = list(pending) + [entry[2] for entry in sorted(waiting)]
+            self._defer(result, unprocessed, *stop)
+
+        # 입력 순서대로 병합
+        result.results = [succeeded[item_id] for item_id in ids if item_id in succeeded]
+        result.errors = [failed[item_id] for item_id in ids if item_id in failed]
+        result.succeeded = len(result.results)
+        result.failed = len(result.errors)
+        return result
+
+    def _build_batch(
+        self,
+        batch_ids: list[str],
+        make_request: Callable[[str], Any],
+        on_success: Callable[[str, Any], dict],
+    ) -> tuple[BatchHttpRequest, "_BatchOutcome"]:
+        """배치 요청과, 실행 중 하위 요청 결과를 모을 _BatchOutcome 생성."""
+        outcome = _BatchOutcome()
+
+        def callback_factory(item_id: str):
+            def callback(request_id, response, exception):
+                if exception:
+                    self._check_rate_limit(exception)
+                    if is_failure(exception):
+                        outcome.failures.append(item_id)
+                    if is_retryable_error(exception) or is_failure(exception):
+                        outcome.retries.append((item_id, exception))
+                        return
+                    outcome.errors.append((item_id, str(exception)))
+                else:
+                    outcome.results[item_id] = on_success(item_id, response)
+
+            return callback
+
+        batch = self.service.new_batch_http_request()
+        for item_id in batch_ids:
+            batch.add(make_request(item_id), callback=callback_factory(item_id))
+        return batch, outcome
+
+    def _submit(self, executor: Optional[ThreadPoolExecutor], batch: BatchHttpRequest) -> Future:
+        """배치 실행 (워커가 없으면 호출 스레드에서 바로 실행하고 완료된 Future 반환)."""
+        if executor is not None:
+            # deadline 등 호출 스레드의 컨텍스트를 워커로 전달
+            return executor.submit(contextvars.copy_context().run, self._execute, batch)
+
+        future: Future = Future()
+        try:
+            self._execute(batch)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+        return future
+
+    def _execute(self, request: Any) -> Any:
+        """현재 스레드의 HTTP 연결로 요청(또는 배치) 실행 (httplib2.Http는 스레드 안전하지 않음)."""
+        if self.http_factory is None:
+            return request.execute()
+
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = self.http_factory()
+        return request.execute(http=http)
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """하위 요청을 다시 보낼 때까지의 대기 시간.
+
+        Args:
+            attempt: 지금까지 재시도한 횟수
+            error: 발생한 일시적 오류
+
+        Returns:
+            대기 시간 (초). 재시도 횟수를 넘었거나 서버가 알려준 재시도
+            시각이 너무 멀면 None
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = get_retry_after(error)
+        if retry_after is not None and retry_after > self.MAX_RETRY_DELAY:
+            return None
+        return calculate_delay(attempt, max_delay=self.MAX_RETRY_DELAY, retry_after=retry_after)
+
+    def _modify_matching(
+        self,
+        query: str,
+        max_messages: int,
+        remove_labels: list[str],
+        on_modified: Optional[Callable[[list[str]], None]] = None,
+    ) -> BatchResult:
+        """쿼리에 맞는 메시지를 조회하면서 라벨 일괄 수정.
+
+        목록 페이지를 받는 대로 그 페이지의 ID를 batchModify로 수정합니다.
+        쿼리가 기준으로 삼는 라벨(UNREAD, INBOX)을 제거하면 결과 집합이 바뀌어
+        이전 pageToken이 메시지를 건너뛸 수 있으므로, 다음 페이지는 수정이 끝난
+        뒤 첫 페이지부터 다시 조회합니다 (_list_pages). 두 단계 모두 BULK
+        우선순위로 할당량을 기다리고 일시적 오류를 재시도합니다. 전체 ID를 먼저
+        모으지 않으므로 max_messages가 커도 버퍼에는 페이지 하나만 남습니다.
+
+        일일 할당량이 부족하면 남은 할당량으로 처리할 수 있는 만큼만 진행하고,
+        조회했지만 처리하지 못한 ID를 result.deferred에 남깁니다.
+
+        Args:
+            query: 검색 쿼리
+            max_messages: 최대 처리 메시지 수
+            remove_labels: 제거할 라벨 ID
+            on_modified: 수정한 ID로 페이지마다 호출 (캐시 갱신 등)
+
+        Returns:
+            BatchResult 객체 (total은 조회한 메시지 수)
+        """
+        chunk = self._chunk_size("messages.batchModify")
+        page_units = QuotaUnit.MESSAGES_LIST + QuotaUnit.MESSAGES_BATCH_MODIFY * -(
+            -self.LIST_PAGE_SIZE // chunk
         )
+        pages = -(-max_messages // self.LIST_PAGE_SIZE)
+
+        forecast = self.quota_manager.forecast(self.user, pages * page_units)
+        if forecast.allowed < QuotaUnit.MESSAGES_LIST + QuotaUnit.MESSAGES_BATCH_MODIFY:
+            # 조회 후 한 배치도 처리할 수 없으면 시작하지 않음
+            logger.warning(
+                f"Daily quota exhausted for {self.user}; "
+                f"deferring until {forecast.resets_at.isoformat()}"
+            )
+            return BatchResult(resume_after=forecast.resets_at)
+
+        result = BatchResult()
+        allowance = forecast.allowed
+        listing = self._list_pages(query, max_messages)
+
+        try:
+            for page_ids in listing:
+                result.total += len(page_ids)
+                allowance -= QuotaUnit.MESSAGES_LIST
+
+                # 남은 일일 할당량 안에서 처리 가능한 만큼만 진행
+                calls = max(0, allowance // QuotaUnit.MESSAGES_BATCH_MODIFY)
+                allowed_ids = page_ids[: calls * chunk]
+                deferred = page_ids[len(allowed_ids):]
+
+                if allowed_ids:
+                    allowance -= QuotaUnit.MESSAGES_BATCH_MODIFY * -(-len(allowed_ids) // chunk)
+                    page = self.batch_modify_labels(allowed_ids, remove_labels=remove_labels)
+                    self._merge(result, page)
+                    if on_modified and page.results:
+                        on_modified([r["id"] for r in page.results])
+                    if page.deferred:
+                        # deadline 초과 또는 회로 차단 - 나머지는 조회하지 않음
+                        break
+
+                if deferred:
+                    logger.warning(
+                        f"Daily quota low for {self.user}: deferred {len(deferred)} messages "
+                        f"until {forecast.resets_at.isoformat()}"
+                    )
+                    result.deferred.extend(deferred)
+                    result.resume_after = forecast.resets_at
+                    break
+        except CircuitOpenError as e:
+            logger.warning(f"{e}; stopped listing after {result.total} messages")
+            result.resume_after = datetime.now(timezone.utc) + timedelta(seconds=e.retry_in)
+        except DeadlineExceeded as e:
+            logger.warning(f"{e}; stopped listing after {result.total} messages")
+            result.resume_after = datetime.now(timezone.utc)
+        except TimeoutError as e:
+            # 서버가 알려준 재시도 시각까지 목록 조회 할당량을 확보할 수 없음
+            logger.warning(f"{e}; stopped listing after {result.total} messages")
+            result.resume_after = self._quota_resume_after()
+        finally:
+            listing.close()
+
+        return result
+
+    def _list_pages(self, query: str, max_messages: int) -> Iterator[list[str]]:
+        """수정 중인 쿼리 결과를 페이지 단위로 조회 (BULK 할당량 대기, 일시적 오류 재시도).
+
+        호출자는 받은 페이지를 수정한 뒤 다음 페이지를 요청해야 합니다. 수정한
+        메시지는 더 이상 쿼리에 맞지 않으므로 다음 페이지는 pageToken 없이 첫
+        페이지부터 다시 조회하고, 이미 반환한 ID(수정에 실패했거나 검색 반영이
+        늦어 아직 보이는 메시지)는 건너뜁니다. 새 ID가 없는 페이지만 pageToken을
+        따라갑니다.
+
+        Yields:
+            페이지의 (처음 반환하는) 메시지 ID 목록
+        """
+
+        @exponential_backoff(
+            max_delay=self.MAX_RETRY_DELAY,
+            on_rate_limited=self._on_rate_limited,
+            budget=self.budget,
+            breaker=self.breaker,
+        )
+        def _list(**kwargs):
+            return self._execute(self.service.users().messages().list(**kwargs))
+
+        listed = 0
+        seen: set[str] = set()
+        page_token = None
+        while listed < max_messages:
+            self.quota_manager.wait_for_quota(
+                self.user, QuotaUnit.MESSAGES_LIST, priority=QuotaPriority.BULK
+            )
+            try:
+                response = _list(
+                    userId="me",
+                    q=query,
+                    maxResults=min(self.LIST_PAGE_SIZE, max_messages - listed),
+                    pageToken=page_token,
+                )
+            except CircuitOpenError:
+                # 회로가 열려 보내지 않은 요청의 할당량 예약 반납
+                self.quota_manager.release(self.user, QuotaUnit.MESSAGES_LIST)
+                raise
+            self.quota_manager.record_usage(self.user, QuotaUnit.MESSAGES_LIST, "messages.list")
+
+            page_ids = [
+                msg["id"] for msg in response.get("messages", []) if msg["id"] not in seen
+            ]
+            seen.update(page_ids)
+            listed += len(page_ids)
+            if page_ids:
+                yield page_ids
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+            if page_ids:
+                # 수정으로 결과 집합이 바뀌었으므로 이전 토큰 대신 처음부터
+                page_token = None
+
+    @staticmethod
+    def _merge(result: BatchResult, page: BatchResult) -> None:
+        """페이지 결과를 전체 결과에 합침."""
+        result.succeeded += page.succeeded
+        result.failed += page.failed
+        result.results.extend(page.results)
+        result.errors.extend(page.errors)
+        result.deferred.extend(page.deferred)
+        if page.resume_after is not None:
+            result.resume_after = page.resume_after
 
 
 if __name__ == "__main__":
@@ -5,14 +5,38 @@ API 호출을 최소화하기 위한 로컬 캐시 레이어.
 캐시 전략:
 - 메시지 내용: 24시간 유효 (메시지는 불변)
 - 메시지 메타데이터: 1시간 유효 (라벨 변경 가능)
+- 메시지 항목은 형식(full/metadata)을 기록하며, full 항목은
+  metadata 조회에도 응답하고 metadata 저장이 full 항목을 덮어쓰지 않음
 - 메시지 목록: 5분 유효 (자주 변경됨)
+  - 다음 페이지 토큰을 함께 저장하여 더 많은 결과 요청 시 이어서 조회
 - 라벨 목록: 1시간 유효
 
 캐시 무효화:
-- 메시지 수정 시 해당 메시지 캐시 무효화
+- 메시지 라벨 수정 시 재조회 없이 캐시된 라벨과 목록 멤버십을 제자리 갱신
+  (멤버십을 판단할 수 없는 목록만 무효화)
 - 발송 시 목록 캐시 무효화
 - 라벨 변경 시 라벨 캐시 무효화
 
+증분 동기화:
+- History API 동기화 상태(historyId)가 최근 것이면 동기화 시작 이후
+  캐시된 메시지/목록은 TTL과 무관하게 유효 (변경분은 동기화가 반영)
+- 검색 쿼리 목록도 쿼리를 로컬에서 평가할 수 있으면 (query_parser)
+  무효화하지 않고 멤버십을 갱신
+
+저장소:
+- 기본값은 단일 파일 SQLite (WAL) 저장소 (cache_storage.SQLiteStorage)
+- GMAIL_CACHE_BACKEND=file 로 기존 파일 저장소 사용 가능
+- 디스크 앞에 프로세스 내 LRU 메모리 계층 (write-through)
+
+동시 실행:
+- 같은 캐시 디렉토리를 쓰는 여러 프로세스(CLI 동시 실행)는 잠금 파일
+  (.cache.lock)로 쓰기, 목록 갱신, 제거, 무효화를 직렬화 (process_lock)
+- 읽기는 잠금 없이 수행 (저장소 쓰기가 원자적)
+
+크기 제한:
+- 계정당 메시지 수 (max_messages_per_account)와 전체 크기 (max_cache_size_mb)
+- 캐시 옆의 제거 인덱스(eviction_index.EvictionIndex)로 LRU/LFU 순서 관리
+
 Reference:
     https://community.latenode.com/t/understanding-gmail-api-quota-restrictions-and-rate-limits/28113
 """
@@ -20,12 +44,16 @@ Reference:
 import hashlib
 import json
 import os
-import shutil
-import threading
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional
+from typing import Iterable, Optional
+
+from .cache_storage import CacheStorage, create_storage
+from .eviction_index import EvictionIndex
+from .memory_cache import MemoryCache
+from .process_lock import ProcessLock
+from .query_parser import HIDDEN_LABELS, UnsupportedQueryError, parse_query
 
 
 @dataclass
@@ -41,12 +69,27 @@ class CacheConfig:
     # 캐시 크기 제한
     max_messages_per_account: int = 1000
     max_cache_size_mb: int = 100
+    eviction_policy: str = "lru"  # "lru" 또는 "lfu"
+
+    # 저장소 백엔드 ("sqlite" 또는 "file")
+    backend: str = field(
+        default_factory=lambda: os.environ.get("GMAIL_CACHE_BACKEND", "sqlite")
+    )
+
+    # 프로세스 내 메모리 계층 (0이면 비활성화)
+    memory_max_entries: int = 500
+    memory_max_mb: int = 32
+
+    # 증분 동기화가 이 시간 안에 수행되었으면 TTL 대신 동기화 상태로 판단
+    sync_max_age_minutes: int = 5
 
 
 class EmailCache:
     """Gmail 이메일 로컬 캐시 관리자.
 
     API 호출을 줄이기 위해 메시지, 목록, 라벨을 로컬에 캐싱합니다.
+    TTL과 무효화 정책만 이 클래스가 담당하고, 실제 저장은
+    CacheStorage 백엔드(기본값: SQLite)에 위임합니다.
 
     Usage:
         cache = EmailCache()
@@ -59,6 +102,10 @@ class EmailCache:
         else:
             message = cached
 
+        # 여러 메시지 일괄 조회/저장 (각각 트랜잭션 1회)
+        found = cache.get_messages("work", ["msg1", "msg2"])
+        cache.set_messages("work", {"msg3": message3, "msg4": message4})
+
         # 목록 캐싱
         query = "is:unread"
         cached_list = cache.get_list("work", query)
@@ -71,11 +118,13 @@ class EmailCache:
         self,
         cache_dir: Optional[str] = None,
         config: Optional[CacheConfig] = None,
+        storage: Optional[CacheStorage] = None,
     ):
         """
         Args:
             cache_dir: 캐시 디렉토리 (기본값: .cache/gmail)
             config: 캐시 설정
+            storage: 저장소 백엔드 (없으면 config.backend로 생성)
         """
         self.config = config or CacheConfig()
 
@@ -87,7 +136,14 @@ class EmailCache:
             self.cache_dir = Path(__file__).parent.parent.parent / ".cache" / "gmail"
 
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self.storage = storage or create_storage(self.config.backend, self.cache_dir)
+        self.memory = MemoryCache(
+            max_entries=self.config.memory_max_entries,
+            max_bytes=self.config.memory_max_mb * 1024 * 1024,
+        )
+        self.eviction = EvictionIndex(self.cache_dir)
+        # 스레드 및 프로세스 간 잠금 (쓰기/제거/무효화)
+        self._lock = ProcessLock(self.cache_dir / ".cache.lock")
 
     # =========================================================================
     # Message Cache
@@ -101,6 +157,9 @@ class EmailCache:
     ) -> Optional[dict]:
         """캐시된 메시지 조회.
 
+        full 항목은 metadata 조회에도 그대로 응답합니다.
+        라벨(label_ids)은 metadata TTL, 본문/헤더는 message TTL을 적용합니다.
+
         Args:
             account: 계정 이름
             message_id: 메시지 ID
@@ -109,36 +168,88 @@ class EmailCache:
         Returns:
             캐시된 메시지 또는 None
         """
-        cache_file = self._message_path(account, message_id)
+        data = self._read(account, "messages", message_id)
+        if data is None:
+            return None
 
-        if not cache_file.exists():
+        synced_since = self._synced_since(account)
+        if not self._is_content_fresh(data, synced_since):
+            # 만료된 캐시 삭제
+            self._delete(account, "messages", [message_id])
             return None
 
-        try:
-            with open(cache_file) as f:
-                data = json.load(f)
+        if self._satisfies_format(data, metadata_only) and self._is_labels_fresh(
+            data, synced_since
+        ):
+            return data.get("message")
+        return None
 
-            ttl_hours = (
-                self.config.metadata_ttl_hours
-                if metadata_only
-                else self.config.message_ttl_hours
-            )
+    def get_messages(
+        self,
+        account: str,
+        message_ids: Iterable[str],
+        metadata_only: bool = False,
+    ) -> dict[str, dict]:
+        """캐시된 메시지 일괄 조회 (단일 트랜잭션).
 
-            if self._is_fresh(data.get("cached_at"), ttl_hours):
-                return data.get("message")
+        Args:
+            account: 계정 이름
+            message_ids: 메시지 ID 목록
+            metadata_only: 메타데이터만 조회 시 True
 
-            # 만료된 캐시 삭제
-            cache_file.unlink(missing_ok=True)
-            return None
-        except (json.JSONDecodeError, KeyError):
-            cache_file.unlink(missing_ok=True)
+        Returns:
+            {메시지 ID: 메시지} (캐시에 있고 유효한 항목만)
+        """
+        synced_since = self._synced_since(account)
+        found = {}
+        expired = []
+
+        for message_id, data in self._read_many(account, "messages", message_ids).items():
+            if not self._is_content_fresh(data, synced_since):
+                expired.append(message_id)
+            elif self._satisfies_format(data, metadata_only) and self._is_labels_fresh(
+                data, synced_since
+            ):
+                found[message_id] = data.get("message")
+
+        if expired:
+            self._delete(account, "messages", expired)
+
+        return found
+
+    def get_message_body(
+        self,
+        account: str,
+        message_id: str,
+        metadata_only: bool = False,
+    ) -> Optional[dict]:
+        """라벨 신선도와 무관하게 불변 내용이 유효한 메시지 조회.
+
+        라벨만 만료된 경우 호출자는 라벨만 다시 받아
+        update_message_labels()로 갱신하면 됩니다.
+
+        Args:
+            account: 계정 이름
+            message_id: 메시지 ID
+            metadata_only: 메타데이터만 필요하면 True
+
+        Returns:
+            캐시된 메시지 (label_ids는 오래되었을 수 있음) 또는 None
+        """
+        data = self._read(account, "messages", message_id)
+        if data is None or not self._is_content_fresh(data, self._synced_since(account)):
             return None
 
+        if self._satisfies_format(data, metadata_only):
+            return data.get("message")
+        return None
+
     def set_message(
         self,
         account: str,
         message_id: str,
         message: dict,
+        format: str = "full",
     ) -> None:
         """메시지 캐시.
 
@@ -146,23 +257,90 @@ class EmailCache:
             account: 계정 이름
             message_id: 메시지 ID
             message: 메시지 데이터
+            format: 메시지 형식 ("full" 또는 "metadata")
         """
-        with self._lock:
-            account_dir = self.cache_dir / account / "messages"
-            account_dir.mkdir(parents=True, exist_ok=True)
+        self.set_messages(account, {message_id: message}, format=format)
 
-            cache_file = self._message_path(account, message_id)
-            cache_data = {
-                "cached_at": datetime.now().isoformat(),
-                "message": message,
-            }
+    def set_messages(
+        self,
+        account: str,
+        messages: dict[str, dict],
+        format: str = "full",
+    ) -> None:
+        """메시지 일괄 캐시 (단일 트랜잭션).
+
+        metadata 형식은 이미 캐시된 full 항목을 덮어쓰지 않고
+        라벨만 갱신합니다.
 
-            with open(cache_file, "w") as f:
-                json.dump(cache_data, f, ensure_ascii=False)
+        Args:
+            account: 계정 이름
+            messages: {메시지 ID: 메시지 데이터}
+            format: 메시지 형식 ("full" 또는 "metadata")
+        """
+        if not messages:
+            return
+
+        cached_at = datetime.now().isoformat()
+
+        with self._lock:
+            existing = {}
+            if format != "full":
+                existing = self._read_many(account, "messages", messages)
+            synced_since = self._synced_since(account)
+
+            entries = {}
+            for message_id, message in messages.items():
+                current = existing.get(message_id)
+                if (
+                    current is not None
+                    and current.get("format") == "full"
+                    and self._is_content_fresh(current, synced_since)
+                ):
+                    entries[message_id] = self._with_labels(
+                        current, message.get("label_ids", []), cached_at
+                    )
+                else:
+                    entries[message_id] = {
+                        "cached_at": cached_at,
+                        "labels_cached_at": cached_at,
+                        "format": format,
+                        "message": message,
+                    }
+
+            self._write(account, "messages", entries)
 
             # 캐시 크기 정리
             self._cleanup_if_needed(account)
 
+    def update_message_labels(
+        self,
+        account: str,
+        message_id: str,
+        label_ids: list[str],
+    ) -> Optional[dict]:
+        """캐시된 메시지의 라벨만 갱신 (캐시에 없으면 무시).
+
+        Args:
+            account: 계정 이름
+            message_id: 메시지 ID
+            label_ids: 현재 라벨 ID 목록
+
+        Returns:
+            갱신된 메시지 또는 None
+        """
+        with self._lock:
+            data = self._read(account, "messages", message_id)
+            if data is None or not self._is_content_fresh(
+                data, self._synced_since(account)
+            ):
+                return None
+
+            updated = self._with_labels(
+                data, label_ids, datetime.now().isoformat()
+            )
+            self._write(account, "messages", {message_id: updated})
+            return updated["message"]
+
     # =========================================================================
     # List Cache
     # =========================================================================
@@ -183,32 +361,50 @@ class EmailCache:
         Returns:
             캐시된 메시지 ID 목록 또는 None
         """
-        cache_key = self._list_cache_key(query, label_ids)
-        cache_file = self._list_path(account, cache_key)
-
-        if not cache_file.exists():
-            return None
+        page = self.get_list_page(account, query, label_ids)
+        return page["messages"] if page is not None else None
 
-        try:
-            with open(cache_file) as f:
-                data = json.load(f)
+    def get_list_page(
+        self,
+        account: str,
+        query: str,
+        label_ids: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        """캐시된 목록과 이어서 조회할 페이지 토큰 조회.
 
-            ttl_minutes = self.config.list_ttl_minutes
-            if self._is_fresh(data.get("cached_at"), ttl_minutes / 60):
-                return data.get("messages")
+        Args:
+            account: 계정 이름
+            query: 검색 쿼리
+            label_ids: 라벨 필터
 
-            cache_file.unlink(missing_ok=True)
-            return None
-        except (json.JSONDecodeError, KeyError):
-            cache_file.unlink(missing_ok=True)
+        Returns:
+            {"messages": [...], "next_page_token": str | None} 또는 None
+            (next_page_token이 None이면 전체 결과가 캐시됨)
+        """
+        cache_key = self._list_cache_key(query, label_ids)
+        data = self._read(account, "lists", cache_key)
+        if data is None:
             return None
 
+        ttl_minutes = self.config.list_ttl_minutes
+        if self._is_fresh_or_synced(
+            data.get("cached_at"), ttl_minutes / 60, self._synced_since(account)
+        ):
+            return {
+                "messages": data.get("messages", []),
+                "next_page_token": data.get("next_page_token"),
+            }
+
+        self._delete(account, "lists", [cache_key])
+        return None
+
     def set_list(
         self,
         account: str,
         query: str,
         messages: list[dict],
         label_ids: Optional[list[str]] = None,
+        next_page_token: Optional[str] = None,
     ) -> None:
         """목록 캐시.
 
@@ -217,23 +413,69 @@ class EmailCache:
             query: 검색 쿼리
             messages: 메시지 목록
             label_ids: 라벨 필터
+            next_page_token: 이어서 조회할 페이지 토큰 (마지막 페이지면 None)
         """
+        cache_key = self._list_cache_key(query, label_ids)
+        cache_data = {
+            "cached_at": datetime.now().isoformat(),
+            "query": query,
+            "label_ids": label_ids,
+            "messages": messages,
+            "next_page_token": next_page_token,
+        }
+
         with self._lock:
-            list_dir = self.cache_dir / account / "lists"
-            list_dir.mkdir(parents=True, exist_ok=True)
+            self._write(account, "lists", {cache_key: cache_data})
+            self._cleanup_if_needed(account)
 
-            cache_key = self._list_cache_key(query, label_ids)
-            cache_file = self._list_path(account, cache_key)
+    def extend_list(
+        self,
+        account: str,
+        query: str,
+        messages: list[dict],
+        label_ids: Optional[list[str]] = None,
+        next_page_token: Optional[str] = None,
+    ) -> None:
+        """캐시된 목록 뒤에 이어서 받은 페이지 추가.
 
-            cache_data = {
-                "cached_at": datetime.now().isoformat(),
-                "query": query,
-                "label_ids": label_ids,
-                "messages": messages,
-            }
+        기존 항목의 캐시 시각은 유지하므로 TTL은 처음 조회 기준입니다.
+        캐시된 목록이 없으면 set_list와 같습니다.
+
+        Args:
+            account: 계정 이름
+            query: 검색 쿼리
+            messages: 추가로 받은 메시지 목록
+            label_ids: 라벨 필터
+            next_page_token: 이어서 조회할 페이지 토큰 (마지막 페이지면 None)
+        """
+        cache_key = self._list_cache_key(query, label_ids)
 
-            with open(cache_file, "w") as f:
-                json.dump(cache_data, f, ensure_ascii=False)
+        with self._lock:
+            data = self._read(account, "lists", cache_key)
+            if data is None:
+                data = {
+                    "cached_at": datetime.now().isoformat(),
+                    "query": query,
+                    "label_ids": label_ids,
+                    "messages": [],
+                }
+
+            existing = data.get("messages", [])
+            seen = {m["id"] for m in existing}
+            extended = existing + [m for m in messages if m["id"] not in seen]
+
+            self._write(
+                account,
+                "lists",
+                {
+                    cache_key: {
+                        **data,
+                        "messages": extended,
+                        "next_page_token": next_page_token,
+                    }
+                },
+            )
+            self._cleanup_if_needed(account)
 
     # =========================================================================
     # Labels Cache
@@ -248,23 +490,15 @@ class EmailCache:
         Returns:
             캐시된 라벨 목록 또는 None
         """
-        cache_file = self.cache_dir / account / "labels.json"
-
-        if not cache_file.exists():
+        data = self._read(account, "labels", "")
+        if data is None:
             return None
 
-        try:
-            with open(cache_file) as f:
-                data = json.load(f)
-
-            if self._is_fresh(data.get("cached_at"), self.config.labels_ttl_hours):
-                return data.get("labels")
+        if self._is_fresh(data.get("cached_at"), self.config.labels_ttl_hours):
+            return data.get("labels")
 
-            cache_file.unlink(missing_ok=True)
-            return None
-        except (json.JSONDecodeError, KeyError):
-            cache_file.unlink(missing_ok=True)
-            return None
+        self._delete(account, "labels", [""])
+        return None
 
     def set_labels(self, account: str, labels: list[dict]) -> None:
         """라벨 캐시.
@@ -273,23 +507,193 @@ class EmailCache:
             account: 계정 이름
             labels: 라벨 목록
         """
+        cache_data = {
+            "cached_at": datetime.now().isoformat(),
+            "labels": labels,
+        }
+
         with self._lock:
-            account_dir = self.cache_dir / account
-            account_dir.mkdir(parents=True, exist_ok=True)
+            self._write(account, "labels", {"": cache_data})
+
+    # =========================================================================
+    # Incremental Sync
+    # =========================================================================
+
+    def get_sync_state(self, account: str) -> Optional[dict]:
+        """History API 동기화 상태 조회.
+
+        Args:
+            account: 계정 이름
+
+        Returns:
+            {"history_id", "since", "synced_at"} 또는 None
+        """
+        # 캐시 조회마다 확인하므로 메모리 계층에 둠 (상태가 없으면 빈 dict로 기억)
+        state = self.memory.get((account, "sync", ""))
+        if state is None:
+            state = self.storage.get(account, "sync", "") or {}
+            self.memory.put((account, "sync", ""), state)
+        return state or None
+
+    def set_sync_state(
+        self,
+        account: str,
+        history_id: str,
+        reset: bool = False,
+    ) -> None:
+        """History API 동기화 상태 저장.
+
+        Args:
+            account: 계정 이름
+            history_id: 마지막으로 반영한 historyId
+            reset: 동기화를 새로 시작하는 경우 True (이전 캐시는 TTL로 판단)
+        """
+        now = datetime.now().isoformat()
 
-            cache_file = account_dir / "labels.json"
-            cache_data = {
-                "cached_at": datetime.now().isoformat(),
-                "labels": labels,
+        with self._lock:
+            state = None if reset else self.get_sync_state(account)
+            state = {
+                "history_id": str(history_id),
+                "since": state["since"] if state else now,
+                "synced_at": now,
             }
+            self.storage.set(account, "sync", "", state)
+            self.memory.put((account, "sync", ""), state)
 
-            with open(cache_file, "w") as f:
-                json.dump(cache_data, f, ensure_ascii=False)
+    def is_synced(self, account: str) -> bool:
+        """증분 동기화가 유지되고 있는지 (sync_max_age_minutes 이내) 확인.
+
+        Args:
+            account: 계정 이름
+        """
+        return self._synced_since(account) is not None
+
+    def clear_sync_state(self, account: str) -> None:
+        """History API 동기화 상태 삭제.
+
+        Args:
+            account: 계정 이름
+        """
+        self.memory.evict((account, "sync", ""))
+        self.storage.delete(account, "sync", "")
+
+    def apply_message_changes(
+        self,
+        account: str,
+        upserts: Iterable[dict],
+        deleted_ids: Iterable[str] = (),
+        added_ids: Iterable[str] = (),
+    ) -> None:
+        """메시지 변경분을 캐시된 메시지와 목록에 반영.
+
+        Args:
+            account: 계정 이름
+            upserts: 추가되었거나 라벨이 바뀐 메시지
+                ({"id", "threadId", "labelIds"}, 시간순)
+            deleted_ids: 삭제된 메시지 ID 목록
+            added_ids: upserts 중 새로 도착한 메시지 ID
+        """
+        deleted = set(deleted_ids)
+        upserts = [m for m in upserts if m["id"] not in deleted]
+        if not upserts and not deleted:
+            return
+
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            labels_by_id = {m["id"]: m.get("labelIds", []) for m in upserts}
+            previous = {}
+            if labels_by_id:
+                synced_since = self._synced_since(account)
+                cached = self._read_many(account, "messages", labels_by_id)
+                previous = {
+                    message_id: data.get("message", {}).get("label_ids", [])
+                    for message_id, data in cached.items()
+                    if self._is_labels_fresh(data, synced_since)
+                }
+                self._write(
+                    account,
+                    "messages",
+                    {
+                        message_id: self._with_labels(
+                            data, labels_by_id[message_id], now
+                        )
+                        for message_id, data in cached.items()
+                    },
+                )
+
+            if deleted:
+                self._delete(account, "messages", list(deleted))
+
+            self._patch_lists(account, upserts, deleted, previous, added_ids)
 
     # =========================================================================
     # Cache Invalidation
     # =========================================================================
 
+    def apply_label_delta(
+        self,
+        account: str,
+        message_ids: Iterable[str],
+        add_labels: Iterable[str] = (),
+        remove_labels: Iterable[str] = (),
+    ) -> None:
+        """라벨 일괄 추가/제거(batchModify) 결과를 캐시된 메시지와 목록에 반영.
+
+        라벨이 유효한 캐시 메시지는 새 라벨을 계산해 갱신하고, 그 외 메시지는
+        추가/제거된 라벨만으로 목록 멤버십이 확정되는 경우에만 목록을 갱신합니다.
+
+        Args:
+            account: 계정 이름
+            message_ids: 수정된 메시지 ID 목록
+            add_labels: 추가된 라벨 ID
+            remove_labels: 제거된 라벨 ID
+        """
+        message_ids = list(message_ids)
+        add_labels = list(add_labels)
+        remove_labels = set(remove_labels)
+        if not message_ids or not (add_labels or remove_labels):
+            return
+
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            synced_since = self._synced_since(account)
+            cached = self._read_many(account, "messages", message_ids)
+
+            updated = {}
+            upserts = []
+            previous = {}
+            for message_id, data in cached.items():
+                if not self._is_labels_fresh(data, synced_since):
+                    continue
+                message = data.get("message", {})
+                previous[message_id] = message.get("label_ids", [])
+                label_ids = [
+                    l for l in previous[message_id] if l not in remove_labels
+                ]
+                label_ids += [l for l in add_labels if l not in label_ids]
+                updated[message_id] = self._with_labels(data, label_ids, now)
+                upserts.append(
+                    {
+                        "id": message_id,
+                        "threadId": message.get("thread_id"),
+                        "labelIds": label_ids,
+                    }
+                )
+
+            if updated:
+                self._write(account, "messages", updated)
+
+            unknown = [m for m in message_ids if m not in updated]
+            self._patch_lists(
+                account,
+                upserts,
+                set(),
+                previous,
+                unknown=(unknown, set(add_labels), remove_labels) if unknown else None,
+            )
+
     def invalidate_message(self, account: str, message_id: str) -> None:
         """메시지 캐시 무효화.
 
@@ -298,8 +702,17 @@ class EmailCache:
             message_id: 메시지 ID
         """
         with self._lock:
-            cache_file = self._message_path(account, message_id)
-            cache_file.unlink(missing_ok=True)
+            self._delete(account, "messages", [message_id])
+
+    def invalidate_messages(self, account: str, message_ids: Iterable[str]) -> None:
+        """메시지 캐시 일괄 무효화 (단일 트랜잭션).
+
+        Args:
+            account: 계정 이름
+            message_ids: 메시지 ID 목록
+        """
+        with self._lock:
+            self._delete(account, "messages", list(message_ids))
 
     def invalidate_lists(self, account: str) -> None:
         """목록 캐시 전체 무효화.
@@ -308,9 +721,9 @@ class EmailCache:
             account: 계정 이름
         """
         with self._lock:
-            list_dir = self.cache_dir / account / "lists"
-            if list_dir.exists():
-                shutil.rmtree(list_dir, ignore_errors=True)
+            self.memory.evict_kind(account, "lists")
+            self.eviction.remove_kind(account, "lists")
+            self.storage.delete_kind(account, "lists")
 
     def invalidate_labels(self, account: str) -> None:
         """라벨 캐시 무효화.
@@ -319,8 +732,7 @@ class EmailCache:
             account: 계정 이름
         """
         with self._lock:
-            cache_file = self.cache_dir / account / "labels.json"
-            cache_file.unlink(missing_ok=True)
+            self._delete(account, "labels", [""])
 
     def invalidate_account(self, account: str) -> None:
         """계정의 모든 캐시 무효화.
@@ -329,16 +741,16 @@ class EmailCache:
             account: 계정 이름
         """
         with self._lock:
-            account_dir = self.cache_dir / account
-            if account_dir.exists():
-                shutil.rmtree(account_dir, ignore_errors=True)
+            self.memory.evict_account(account)
+            self.eviction.remove_account(account)
+            self.storage.delete_account(account)
 
     def invalidate_all(self) -> None:
         """전체 캐시 무효화."""
         with self._lock:
-            if self.cache_dir.exists():
-                shutil.rmtree(self.cache_dir, ignore_errors=True)
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.memory.clear()
+            self.eviction.clear()
+            self.storage.clear()
 
     # =========================================================================
     # Cache Statistics
@@ -355,30 +767,24 @@ class EmailCache:
         """
         stats = {
             "cache_dir": str(self.cache_dir),
+            "backend": self.storage.name,
             "accounts": {},
             "total_size_bytes": 0,
             "total_messages": 0,
+            "memory": self.memory.get_stats(),
+            "eviction_policy": self.config.eviction_policy,
+            "max_cache_size_mb": self.config.max_cache_size_mb,
         }
 
-        accounts = [account] if account else self._get_cached_accounts()
+        accounts = [account] if account else self.storage.accounts()
 
         for acc in accounts:
-            acc_dir = self.cache_dir / acc
-            if not acc_dir.exists():
-                continue
-
-            msg_dir = acc_dir / "messages"
-            list_dir = acc_dir / "lists"
+            msg_count = self.storage.count(acc, "messages")
+            list_count = self.storage.count(acc, "lists")
+            size = self.storage.size_bytes(acc)
 
-            msg_count = len(list(msg_dir.glob("*.json"))) if msg_dir.exists() else 0
-            list_count = len(list(list_dir.glob("*.json"))) if list_dir.exists() else 0
-
-            # 계정 디렉토리 크기 계산
-            size = sum(
-                f.stat().st_size
-                for f in acc_dir.rglob("*")
-                if f.is_file()
-            )
+            if not (msg_count or list_count or size):
+                continue
 
             stats["accounts"][acc] = {
                 "messages_cached": msg_count,
@@ -396,17 +802,110 @@ class EmailCache:
 
         return stats
 
+    def close(self) -> None:
+        """저장소 연결 정리."""
+        self.eviction.close()
+        self.storage.close()
+        self._lock.close()
+
     # =========================================================================
     # Internal Methods
     # =========================================================================
 
-    def _message_path(self, account: str, message_id: str) -> Path:
-        """메시지 캐시 파일 경로."""
-        return self.cache_dir / account / "messages" / f"{message_id}.json"
+    def _read(self, account: str, kind: str, key: str) -> Optional[dict]:
+        """메모리 계층 → 저장소 순으로 항목 조회."""
+        data = self.memory.get((account, kind, key))
+        if data is None:
+            data = self.storage.get(account, kind, key)
+            if data is None:
+                return None
+            self.memory.put((account, kind, key), data)
+
+        self.eviction.touch(account, kind, [key])
+        return data
+
+    def _read_many(
+        self,
+        account: str,
+        kind: str,
+        keys: Iterable[str],
+    ) -> dict[str, dict]:
+        """메모리 계층 → 저장소 순으로 항목 일괄 조회."""
+        found = {}
+        missing = []
+
+        for key in keys:
+            data = self.memory.get((account, kind, key))
+            if data is not None:
+                found[key] = data
+            else:
+                missing.append(key)
+
+        if missing:
+            for key, data in self.storage.get_many(account, kind, missing).items():
+                self.memory.put((account, kind, key), data)
+                found[key] = data
+
+        self.eviction.touch(account, kind, found)
+        return found
+
+    def _write(self, account: str, kind: str, items: dict[str, dict]) -> None:
+        """저장소와 메모리 계층에 함께 저장 (write-through)."""
+        encoded = {
+            key: json.dumps(data, ensure_ascii=False).encode()
+            for key, data in items.items()
+        }
+
+        self.storage.set_many(account, kind, items)
+        for key, data in items.items():
+            self.memory.put((account, kind, key), data, encoded=encoded[key])
+        self.eviction.record(
+            account, kind, {key: len(value) for key, value in encoded.items()}
+        )
+
+    def _delete(self, account: str, kind: str, keys: list[str]) -> None:
+        """저장소와 메모리 계층에서 함께 삭제."""
+        for key in keys:
+            self.memory.evict((account, kind, key))
+        self.eviction.remove(account, kind, keys)
+        self.storage.delete_many(account, kind, keys)
+
+    def _is_content_fresh(
+        self,
+        data: dict,
+        synced_since: Optional[datetime] = None,
+    ) -> bool:
+        """메시지 불변 내용(본문/헤더)의 신선도 확인."""
+        return self._is_fresh_or_synced(
+            data.get("cached_at"), self.config.message_ttl_hours, synced_since
+        )
+
+    def _is_labels_fresh(
+        self,
+        data: dict,
+        synced_since: Optional[datetime] = None,
+    ) -> bool:
+        """메시지 라벨의 신선도 확인."""
+        return self._is_fresh_or_synced(
+            data.get("labels_cached_at", data.get("cached_at")),
+            self.config.metadata_ttl_hours,
+            synced_since,
+        )
 
-    def _list_path(self, account: str, cache_key: str) -> Path:
-        """목록 캐시 파일 경로."""
-        return self.cache_dir / account / "lists" / f"{cache_key}.json"
+    def _satisfies_format(self, data: dict, metadata_only: bool) -> bool:
+        """캐시 항목이 요청 형식을 충족하는지 확인.
+
+        형식 정보가 없는 예전 항목은 metadata로 간주합니다.
+        """
+        return metadata_only or data.get("format", "metadata") == "full"
+
+    def _with_labels(self, data: dict, label_ids: list[str], labels_cached_at: str) -> dict:
+        """라벨만 교체한 새 캐시 항목."""
+        return {
+            **data,
+            "labels_cached_at": labels_cached_at,
+            "message": {**data.get("message", {}), "label_ids": label_ids},
+        }
 
     def _list_cache_key(
         self,
@@ -433,33 +932,250 @@ class EmailCache:
         except ValueError:
             return False
 
-    def _get_cached_accounts(self) -> list[str]:
-        """캐시된 계정 목록."""
-        if not self.cache_dir.exists():
-            return []
+    def _synced_since(self, account: str) -> Optional[datetime]:
+        """동기화가 유지되고 있으면 동기화 시작 시각, 아니면 None."""
+        state = self.get_sync_state(account)
+        if not state:
+            return None
 
-        return [
-            d.name
-            for d in self.cache_dir.iterdir()
-            if d.is_dir() and not d.name.startswith(".")
-        ]
+        if not self._is_fresh(
+            state.get("synced_at"), self.config.sync_max_age_minutes / 60
+        ):
+            return None
 
-    def _cleanup_if_needed(self, account: str) -> None:
-        """캐시 크기 제한 적용."""
-        msg_dir = self.cache_dir / account / "messages"
-        if not msg_dir.exists():
-            return
+        try:
+            return datetime.fromisoformat(state["since"])
+        except (KeyError, ValueError):
+            return None
 
-        cache_files = sorted(
-            msg_dir.glob("*.json"),
-            key=lambda f: f.stat().st_mtime,
-        )
+    def _is_fresh_or_synced(
+        self,
+        cached_at: Optional[str],
+        max_age_hours: float,
+        synced_since: Optional[datetime],
+    ) -> bool:
+        """동기화 이후 캐시된 항목이면 유효, 아니면 TTL로 판단."""
+        if synced_since is not None and cached_at:
+            try:
+                if datetime.fromisoformat(cached_at) >= synced_since:
+                    return True
+            except ValueError:
+                return False
+
+        return self._is_fresh(cached_at, max_age_hours)
+
+    def _patch_lists(
+        self,
+        account: str,
+        upserts: list[dict],
+        deleted: set[str],
+        previous: Optional[dict[str, list[str]]] = None,
+        new_ids: Iterable[str] = (),
+        unknown: Optional[tuple[list[str], set[str], set[str]]] = None,
+    ) -> None:
+        """메시지 변경분을 캐시된 목록에 반영.
+
+        라벨 필터만 있는 목록은 멤버십을 직접 계산하고, 검색 쿼리가 있는
+        목록은 쿼리를 로컬에서 평가할 수 있을 때만 계산합니다.
+        이전 라벨을 알면 멤버십이 실제로 바뀐 메시지만 반영합니다.
+        판단할 수 없으면 (지원하지 않는 쿼리, 캐시에 없는 메시지,
+        일부 페이지만 캐시된 목록의 위치를 모르는 새 멤버) 무효화합니다.
+
+        Args:
+            account: 계정 이름
+            upserts: 현재 라벨을 아는 변경 메시지 ({"id", "threadId", "labelIds"})
+            deleted: 삭제된 메시지 ID
+            previous: 변경 전 라벨을 아는 메시지의 {ID: 이전 라벨 ID 목록}
+            new_ids: 새로 도착한 메시지 ID (목록 맨 앞에 추가)
+            unknown: 현재 라벨을 모르는 메시지의 (ID 목록, 추가된 라벨, 제거된 라벨)
+        """
+        updates = {}
+        stale = []
+        cached_messages: dict[str, dict] = {}
+        labels: Optional[list[dict]] = None
+        previous = previous or {}
+        new_ids = set(new_ids)
+
+        current_labels = {c["id"]: c.get("labelIds", []) for c in upserts}
+        previous_labels = {
+            message_id: label_ids
+            for message_id, label_ids in previous.items()
+            if message_id in current_labels
+        }
+
+        if upserts or unknown:
+            label_data = self._read(account, "labels", "")
+            labels = label_data.get("labels") if label_data else None
+        if upserts:
+            cached_messages = self._read_many(account, "messages", current_labels)
+
+        for key, data in self.storage.items(account, "lists").items():
+            messages = data.get("messages", [])
+            query = data.get("query") or ""
+            label_filter = data.get("label_ids") or []
+
+            membership = self._list_membership(
+                query, label_filter, current_labels, cached_messages, labels
+            )
+            if membership is None:
+                stale.append(key)
+                continue
+            before = self._list_membership(
+                query, label_filter, previous_labels, cached_messages, labels
+            ) or {}
+
+            patched = [m for m in messages if m["id"] not in deleted]
+            partial = bool(data.get("next_page_token"))
+
+            for change in upserts:
+                message_id = change["id"]
+                matches = membership[message_id]
+                if message_id in before and before[message_id] == matches:
+                    continue
+
+                present = any(m["id"] == message_id for m in patched)
+                if matches and not present:
+                    if partial and message_id not in before and message_id not in new_ids:
+                        # 이미 일치하던 메시지가 뒤 페이지에 있을 수 있음
+                        patched = None
+                        break
+                    patched.insert(0, {"id": message_id, "threadId": change.get("threadId")})
+                elif present and not matches:
+                    patched = [m for m in patched if m["id"] != message_id]
+
+            if patched is not None and unknown:
+                patched = self._patch_unknown_membership(
+                    patched, query, label_filter, labels, *unknown
+                )
+
+            if patched is None:
+                stale.append(key)
+            elif patched != messages:
+                updates[key] = {**data, "messages": patched}
+
+        if updates:
+            self._write(account, "lists", updates)
+        if stale:
+            self._delete(account, "lists", stale)
+
+    @staticmethod
+    def _patch_unknown_membership(
+        messages: list[dict],
+        query: str,
+        label_filter: list[str],
+        labels: Optional[list[dict]],
+        message_ids: list[str],
+        added: set[str],
+        removed: set[str],
+    ) -> Optional[list[dict]]:
+        """라벨 변화량만으로 목록 멤버십 갱신 (판단할 수 없으면 None).
+
+        조건이 모두 AND이므로, 필요한 라벨이 제거되거나 허용되지 않는 라벨이
+        추가된 메시지는 확실히 빠지고, 반대 방향의 변화만 새 멤버를 만들 수 있습니다.
+        """
+        required = set(label_filter)
+        include_spam_trash = bool(set(HIDDEN_LABELS) & required)
+
+        if query:
+            try:
+                parsed = parse_query(query, labels)
+            except UnsupportedQueryError:
+                return None
+            query_required, forbidden = parsed.label_requirements(include_spam_trash)
+            required |= query_required
+        else:
+            forbidden = set(HIDDEN_LABELS) - required
+
+        if removed & required or added & forbidden:
+            targets = set(message_ids)
+            return [m for m in messages if m["id"] not in targets]
+
+        if added & required or removed & forbidden:
+            present = {m["id"] for m in messages}
+            if any(message_id not in present for message_id in message_ids):
+                return None
+
+        return messages
+
+    def _list_membership(
+        self,
+        query: str,
+        label_filter: list[str],
+        label_ids_by_id: dict[str, list[str]],
+        cached_messages: dict[str, dict],
+        labels: Optional[list[dict]],
+    ) -> Optional[dict[str, bool]]:
+        """주어진 라벨에서 메시지별 목록 멤버십 (평가할 수 없으면 None)."""
+        if not query:
+            return {
+                message_id: self._matches_label_filter(label_ids, label_filter)
+                for message_id, label_ids in label_ids_by_id.items()
+            }
+
+        if not label_ids_by_id:
+            return {}
+
+        try:
+            parsed = parse_query(query, labels)
+        except UnsupportedQueryError:
+            return None
+
+        include_spam_trash = bool(set(HIDDEN_LABELS) & set(label_filter))
+        membership = {}
+
+        for message_id, label_ids in label_ids_by_id.items():
+            if not set(label_ids).issuperset(label_filter):
+                membership[message_id] = False
+                continue
+
+            if parsed.label_only:
+                message = {"label_ids": label_ids}
+            else:
+                entry = cached_messages.get(message_id)
+                if entry is None or (
+                    parsed.needs_body and entry.get("format") != "full"
+                ):
+                    return None
+                message = {**entry.get("message", {}), "label_ids": label_ids}
+
+            membership[message_id] = parsed.matches(message, include_spam_trash)
+
+        return membership
+
+    @staticmethod
+    def _matches_label_filter(label_ids: list[str], label_filter: list[str]) -> bool:
+        """messages.list(labelIds=...)와 같은 기준으로 멤버십 판단."""
+        labels = set(label_ids)
+        if not labels.issuperset(label_filter):
+            return False
+
+        # includeSpamTrash=False 기본 동작: 명시하지 않은 스팸/휴지통 제외
+        hidden = {"SPAM", "TRASH"} - set(label_filter)
+        return not (labels & hidden)
+
+    def _cleanup_if_needed(self, account: str) -> None:
+        """캐시 크기 제한 적용 (제거 인덱스만 조회, 디렉토리 스캔 없음)."""
+        policy = self.config.eviction_policy
 
         # 메시지 수 제한
-        if len(cache_files) > self.config.max_messages_per_account:
-            to_delete = len(cache_files) - self.config.max_messages_per_account
-            for f in cache_files[:to_delete]:
-                f.unlink(missing_ok=True)
+        count = self.eviction.count(account, "messages")
+        if count > self.config.max_messages_per_account:
+            to_delete = count - self.config.max_messages_per_account
+            self._delete(
+                account,
+                "messages",
+                self.eviction.victims(account, "messages", to_delete, policy),
+            )
+
+        # 전체 크기 제한
+        max_bytes = self.config.max_cache_size_mb * 1024 * 1024
+        excess = self.eviction.total_bytes() - max_bytes
+        if excess > 0:
+            grouped: dict[tuple[str, str], list[str]] = {}
+            for acc, kind, key in self.eviction.victims_by_size(excess, policy):
+                grouped.setdefault((acc, kind), []).append(key)
+            for (acc, kind), keys in grouped.items():
+                self._delete(acc, kind, keys)
 
 
 # 싱글톤 인스턴스
@@ -501,6 +1217,14 @@ if __name__ == "__main__":
         cached = cache.get_message("work", "msg123")
         print(f"Cached message: {cached['subject']}")
 
+        # 일괄 캐싱 테스트
+        cache.set_messages(
+            "work",
+            {f"bulk{i}": {"id": f"bulk{i}", "subject": f"Bulk {i}"} for i in range(100)},
+        )
+        found = cache.get_messages("work", [f"bulk{i}" for i in range(120)])
+        print(f"Bulk cached: {len(found)} messages")
+
         # 목록 캐싱 테스트
         test_list = [
             {"id": "msg1", "threadId": "thread1"},
@@ -521,6 +1245,10 @@ if __name__ == "__main__":
         cached_labels = cache.get_labels("work")
         print(f"Cached labels: {len(cached_labels)} labels")
 
+        # 메모리 계층 테스트 (두 번째 조회는 디스크를 거치지 않음)
+        cache.get_message("work", "msg123")
+        cache.get_message("work", "msg123")
+
         # 통계
         stats = cache.get_stats()
         print(f"\nCache stats: {json.dumps(stats, indent=2)}")
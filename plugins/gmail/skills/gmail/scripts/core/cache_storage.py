@@ -0,0 +1,460 @@
+"""Gmail Cache Storage Backends.
+
+EmailCache가 사용하는 저장소 백엔드.
+
+Backends:
+- SQLiteStorage: 단일 파일 SQLite (WAL) 저장소 (기본값)
+- FileStorage: 항목당 JSON 파일 1개 (기존 방식)
+  - 임시 파일에 쓴 뒤 os.replace로 교체하므로 다른 프로세스가
+    쓰기 중인 (잘린) 파일을 읽는 일이 없음
+
+모든 항목은 (account, kind, key)로 식별되며 값은 JSON 직렬화 가능한 dict.
+kind는 "messages", "lists", "labels" 등 항목 종류이고,
+key가 빈 문자열이면 계정당 하나뿐인 항목(예: 라벨 목록)을 의미합니다.
+
+Reference:
+    https://www.sqlite.org/wal.html
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional
+
+# SQLite 바인딩 변수 수 제한을 넘지 않도록 IN (...) 쿼리를 나눌 크기
+_SQL_CHUNK_SIZE = 500
+
+
+class CacheStorage(ABC):
+    """캐시 저장소 인터페이스.
+
+    EmailCache는 TTL, 무효화 정책만 담당하고
+    실제 읽기/쓰기는 이 인터페이스를 통해 수행합니다.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def get(self, account: str, kind: str, key: str) -> Optional[dict]:
+        """항목 조회 (없거나 손상되었으면 None)."""
+
+    @abstractmethod
+    def get_many(
+        self,
+        account: str,
+        kind: str,
+        keys: Iterable[str],
+    ) -> dict[str, dict]:
+        """여러 항목 일괄 조회 (존재하는 항목만 반환)."""
+
+    @abstractmethod
+    def items(self, account: str, kind: str) -> dict[str, dict]:
+        """계정의 특정 종류 항목 전체 조회."""
+
+    @abstractmethod
+    def set(self, account: str, kind: str, key: str, value: dict) -> None:
+        """항목 저장 (있으면 덮어씀)."""
+
+    @abstractmethod
+    def set_many(self, account: str, kind: str, items: dict[str, dict]) -> None:
+        """여러 항목 일괄 저장."""
+
+    @abstractmethod
+    def delete(self, account: str, kind: str, key: str) -> None:
+        """항목 삭제."""
+
+    @abstractmethod
+    def delete_many(self, account: str, kind: str, keys: Iterable[str]) -> None:
+        """여러 항목 일괄 삭제."""
+
+    @abstractmethod
+    def delete_kind(self, account: str, kind: str) -> None:
+        """계정의 특정 종류 항목 전체 삭제."""
+
+    @abstractmethod
+    def delete_account(self, account: str) -> None:
+        """계정의 모든 항목 삭제."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """전체 항목 삭제."""
+
+    @abstractmethod
+    def count(self, account: str, kind: str) -> int:
+        """계정의 특정 종류 항목 수."""
+
+    @abstractmethod
+    def size_bytes(self, account: str) -> int:
+        """계정 항목의 총 크기 (바이트)."""
+
+    @abstractmethod
+    def accounts(self) -> list[str]:
+        """항목이 있는 계정 목록."""
+
+    def close(self) -> None:
+        """저장소 리소스 정리."""
+
+
+class SQLiteStorage(CacheStorage):
+    """단일 파일 SQLite 저장소.
+
+    모든 계정/종류의 항목을 (account, kind, key) 기본 키로 인덱싱된
+    한 테이블에 저장합니다. WAL 모드를 사용하므로 여러 프로세스가
+    동시에 읽어도 쓰기와 충돌하지 않습니다.
+    """
+
+    name = "sqlite"
+    DB_FILENAME = "cache.sqlite3"
+
+    def __init__(self, cache_dir: Path, busy_timeout: float = 30.0):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 (DB 파일이 생성될 위치)
+            busy_timeout: 다른 연결이 잠금을 보유한 경우 최대 대기 시간 (초)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / self.DB_FILENAME
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,  # autocommit, 트랜잭션은 명시적으로 시작
+        )
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    account TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (account, kind, key)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def get(self, account: str, kind: str, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries "
+                "WHERE account = ? AND kind = ? AND key = ?",
+                (account, kind, key),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            self.delete(account, kind, key)
+            return None
+
+    def get_many(
+        self,
+        account: str,
+        kind: str,
+        keys: Iterable[str],
+    ) -> dict[str, dict]:
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, dict] = {}
+        corrupt: list[str] = []
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for i in range(0, len(keys), _SQL_CHUNK_SIZE):
+                    chunk = keys[i : i + _SQL_CHUNK_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        "SELECT key, value FROM cache_entries "
+                        f"WHERE account = ? AND kind = ? AND key IN ({placeholders})",
+                        (account, kind, *chunk),
+                    ).fetchall()
+                    for key, value in rows:
+                        try:
+                            found[key] = json.loads(value)
+                        except json.JSONDecodeError:
+                            corrupt.append(key)
+            finally:
+                self._conn.execute("COMMIT")
+
+        if corrupt:
+            self.delete_many(account, kind, corrupt)
+
+        return found
+
+    def items(self, account: str, kind: str) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM cache_entries WHERE account = ? AND kind = ?",
+                (account, kind),
+            ).fetchall()
+
+        found = {}
+        for key, value in rows:
+            try:
+                found[key] = json.loads(value)
+            except json.JSONDecodeError:
+                continue
+        return found
+
+    def set(self, account: str, kind: str, key: str, value: dict) -> None:
+        self.set_many(account, kind, {key: value})
+
+    def set_many(self, account: str, kind: str, items: dict[str, dict]) -> None:
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            encoded = json.dumps(value, ensure_ascii=False)
+            rows.append((account, kind, key, encoded, len(encoded.encode()), now))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries "
+                    "(account, kind, key, value, size, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def delete(self, account: str, kind: str, key: str) -> None:
+        self.delete_many(account, kind, [key])
+
+    def delete_many(self, account: str, kind: str, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM cache_entries "
+                    "WHERE account = ? AND kind = ? AND key = ?",
+                    [(account, kind, key) for key in keys],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def delete_kind(self, account: str, kind: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE account = ? AND kind = ?",
+                (account, kind),
+            )
+
+    def delete_account(self, account: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE account = ?",
+                (account,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def count(self, account: str, kind: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE account = ? AND kind = ?",
+                (account, kind),
+            ).fetchone()
+        return row[0]
+
+    def size_bytes(self, account: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE account = ?",
+                (account,),
+            ).fetchone()
+        return row[0]
+
+    def accounts(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT account FROM cache_entries"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FileStorage(CacheStorage):
+    """항목당 JSON 파일 1개를 사용하는 저장소.
+
+    디렉토리 구조:
+        <cache_dir>/<account>/<kind>/<key>.json
+        <cache_dir>/<account>/<kind>.json  (key가 빈 문자열인 경우)
+    """
+
+    name = "file"
+
+    def __init__(self, cache_dir: Path):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, account: str, kind: str, key: str) -> Optional[dict]:
+        path = self._path(account, kind, key)
+
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            # 쓰기는 원자적이므로 손상된 파일만 해당 (예: 이전 버전의 중단된 쓰기)
+            path.unlink(missing_ok=True)
+            return None
+
+    def get_many(
+        self,
+        account: str,
+        kind: str,
+        keys: Iterable[str],
+    ) -> dict[str, dict]:
+        found = {}
+        for key in keys:
+            value = self.get(account, kind, key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def items(self, account: str, kind: str) -> dict[str, dict]:
+        kind_dir = self.cache_dir / account / kind
+        if not kind_dir.exists():
+            return {}
+        return self.get_many(account, kind, [f.stem for f in kind_dir.glob("*.json")])
+
+    def set(self, account: str, kind: str, key: str, value: dict) -> None:
+        path = self._path(account, kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 같은 디렉토리의 임시 파일에 쓰고 교체 (원자적 rename)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def set_many(self, account: str, kind: str, items: dict[str, dict]) -> None:
+        for key, value in items.items():
+            self.set(account, kind, key, value)
+
+    def delete(self, account: str, kind: str, key: str) -> None:
+        self._path(account, kind, key).unlink(missing_ok=True)
+
+    def delete_many(self, account: str, kind: str, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(account, kind, key)
+
+    def delete_kind(self, account: str, kind: str) -> None:
+        kind_dir = self.cache_dir / account / kind
+        if kind_dir.exists():
+            shutil.rmtree(kind_dir, ignore_errors=True)
+        (self.cache_dir / account / f"{kind}.json").unlink(missing_ok=True)
+
+    def delete_account(self, account: str) -> None:
+        account_dir = self.cache_dir / account
+        if account_dir.exists():
+            shutil.rmtree(account_dir, ignore_errors=True)
+
+    def clear(self) -> None:
+        # 계정 디렉토리만 삭제 (같은 디렉토리의 인덱스/잠금 파일은 유지)
+        for account in self.accounts():
+            self.delete_account(account)
+
+    def count(self, account: str, kind: str) -> int:
+        kind_dir = self.cache_dir / account / kind
+        if not kind_dir.exists():
+            return 0
+        return len(list(kind_dir.glob("*.json")))
+
+    def size_bytes(self, account: str) -> int:
+        account_dir = self.cache_dir / account
+        if not account_dir.exists():
+            return 0
+        return sum(f.stat().st_size for f in account_dir.rglob("*") if f.is_file())
+
+    def accounts(self) -> list[str]:
+        if not self.cache_dir.exists():
+            return []
+
+        return [
+            d.name
+            for d in self.cache_dir.iterdir()
+            if d.is_dir() and not d.name.startswith(".")
+        ]
+
+    def _path(self, account: str, kind: str, key: str) -> Path:
+        """항목 파일 경로."""
+        if not key:
+            return self.cache_dir / account / f"{kind}.json"
+        return self.cache_dir / account / kind / f"{key}.json"
+
+
+STORAGE_BACKENDS: dict[str, type[CacheStorage]] = {
+    SQLiteStorage.name: SQLiteStorage,
+    FileStorage.name: FileStorage,
+}
+
+
+def create_storage(backend: str, cache_dir: Path) -> CacheStorage:
+    """이름으로 저장소 백엔드 생성.
+
+    Args:
+        backend: 백엔드 이름 ("sqlite" 또는 "file")
+        cache_dir: 캐시 디렉토리
+
+    Returns:
+        CacheStorage 인스턴스
+
+    Raises:
+        ValueError: 알 수 없는 백엔드 이름
+    """
+    try:
+        storage_cls = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"알 수 없는 캐시 백엔드: {backend} "
+            f"(사용 가능: {', '.join(STORAGE_BACKENDS)})"
+        ) from None
+    return storage_cls(cache_dir)
@@ -0,0 +1,356 @@
+"""Retry Budget and Circuit Breaker.
+
+Gmail 장애 시 대기 중인 수백 개의 작업이 각자 최대 재시도(약 2분)를 모두
+소진하지 않도록, 계정별로 재시도와 호출 자체를 제한합니다.
+
+- RetryBudget: 최근 window초 동안의 재시도 수를 성공한 요청 수의 일정
+  비율(+ 최소 허용량)로 제한. 예산을 넘으면 재시도하지 않고 즉시 실패
+- CircuitBreaker: 서버 오류(5xx, 연결 오류)가 연속으로 이어지면 열려서
+  reset_timeout 동안 호출을 즉시 실패시키고(CircuitOpenError), 이후에는
+  요청 하나만 보내 복구 여부를 확인 (half-open)
+
+같은 계정의 GmailClient, BatchProcessor, HistorySync는
+get_retry_budget/get_circuit_breaker로 같은 인스턴스를 공유합니다.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Optional
+
+from googleapiclient.errors import HttpError
+
+from .deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# 서버 장애로 보는 HTTP 상태 코드 (429/403 속도 제한은 할당량 관리자가 처리)
+FAILURE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않고 실패."""
+
+    def __init__(self, user: str, retry_in: float):
+        """
+        Args:
+            user: 사용자 식별자
+            retry_in: 다음 확인 요청까지 남은 시간 (초)
+        """
+        super().__init__(
+            f"Gmail API 장애로 호출 중단 (사용자: {user}), {retry_in:.1f}초 후 재확인"
+        )
+        self.user = user
+        self.retry_in = retry_in
+
+
+class CircuitState(Enum):
+    """회로 상태."""
+
+    CLOSED = "closed"  # 정상
+    OPEN = "open"  # 장애 - 호출 즉시 실패
+    HALF_OPEN = "half_open"  # 복구 확인 중 - 요청 하나만 허용
+
+
+def is_failure(error: BaseException) -> bool:
+    """서버 장애로 볼 오류인지 확인 (5xx, 연결/타임아웃 오류).
+
+    Args:
+        error: 발생한 예외
+
+    Returns:
+        장애 오류면 True
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status in FAILURE_STATUS_CODES
+    # deadline 초과는 호출자가 정한 시간 제한이므로 제외
+    return isinstance(error, OSError) and not isinstance(error, DeadlineExceeded)
+
+
+class RetryBudget:
+    """계정별 재시도 예산.
+
+    최근 window초 동안의 재시도 수가
+    min_retries + ratio × (같은 기간 성공한 요청 수)를 넘지 않도록 합니다.
+    정상 상황에서는 간헐적 오류를 모두 재시도하고, 장애로 성공이 끊기면
+    재시도가 곧바로 멈춥니다.
+
+    Usage:
+        budget = RetryBudget()
+
+        budget.record_success()
+        if budget.try_retry():
+            ...  # 재시도
+    """
+
+    DEFAULT_RATIO = 0.2  # 성공한 요청 대비 허용 재시도 비율
+    DEFAULT_MIN_RETRIES = 10  # 성공이 없어도 window 동안 허용할 재시도 수
+    DEFAULT_WINDOW = 10.0  # 집계 기간 (초)
+
+    def __init__(
+        self,
+        ratio: float = DEFAULT_RATIO,
+        min_retries: int = DEFAULT_MIN_RETRIES,
+        window: float = DEFAULT_WINDOW,
+    ):
+        """
+        Args:
+            ratio: 성공한 요청 대비 허용 재시도 비율
+            min_retries: window 동안 항상 허용할 재시도 수
+            window: 집계 기간 (초)
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._successes: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def record_success(self, count: int = 1) -> None:
+        """성공한 요청 기록.
+
+        Args:
+            count: 성공한 요청 수 (배치는 하위 요청 수)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._successes.extend([now] * count)
+
+    def try_retry(self) -> bool:
+        """재시도 가능하면 예산에서 차감하고 True."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._successes):
+                return False
+            self._retries.append(now)
+            return True
+
+    def get_stats(self) -> dict:
+        """최근 window 동안의 성공/재시도 수."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {"successes": len(self._successes), "retries": len(self._retries)}
+
+    def _expire(self, now: float) -> None:
+        """집계 기간이 지난 기록 제거 (락 보유 상태에서 호출)."""
+        cutoff = now - self.window
+        for events in (self._successes, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+
+class CircuitBreaker:
+    """계정별 회로 차단기.
+
+    CLOSED에서 장애 오류가 failure_threshold번 연속되면 OPEN이 되어
+    reset_timeout 동안 before_call이 CircuitOpenError를 발생시킵니다.
+    이후 HALF_OPEN에서 요청 하나만 통과시켜, 성공하면 CLOSED로,
+    실패하면 다시 OPEN으로 돌아갑니다.
+
+    Usage:
+        breaker = CircuitBreaker(user="work")
+
+        breaker.before_call()  # 열려 있으면 CircuitOpenError
+        try:
+            result = request.execute()
+        except Exception as e:
+            breaker.record_error(e)
+            raise
+        breaker.record_success()
+    """
+
+    DEFAULT_FAILURE_THRESHOLD = 5  # 회로를 열 연속 장애 수
+    DEFAULT_RESET_TIMEOUT = 30.0  # 열린 뒤 확인 요청까지 대기 (초)
+
+    def __init__(
+        self,
+        user: str = "default",
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        """
+        Args:
+            user: 사용자 식별자 (오류 메시지/로그용)
+            failure_threshold: 회로를 열 연속 장애 수
+            reset_timeout: 열린 뒤 확인 요청까지 대기 (초)
+        """
+        self.user = user
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)
+
+    @property
+    def state(self) -> CircuitState:
+        """현재 상태 (OPEN이 만료되었으면 HALF_OPEN)."""
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._retry_in() <= 0:
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """호출 전 확인.
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 다른 확인 요청이 진행 중일 때
+        """
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return
+
+            if self._state == CircuitState.OPEN:
+                retry_in = self._retry_in()
+                if retry_in > 0:
+                    raise CircuitOpenError(self.user, retry_in)
+                self._state = CircuitState.HALF_OPEN
+
+            # HALF_OPEN: 확인 요청은 하나만
+            if self._probing:
+                raise CircuitOpenError(self.user, 0.0)
+            self._probing = True
+
+    def record_success(self) -> None:
+        """서버가 응답함 (성공 또는 장애가 아닌 오류)."""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"Circuit closed for {self.user}: Gmail API recovered")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._end_probe()
+
+    def record_failure(self) -> None:
+        """장애 오류 기록."""
+        with self._lock:
+            self._failures += 1
+            self._end_probe()
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED
+                and self._failures >= self.failure_threshold
+            ):
+                if self._state == CircuitState.CLOSED:
+                    logger.warning(
+                        f"Circuit opened for {self.user} after {self._failures} failures; "
+                        f"failing fast for {self.reset_timeout:.1f}s"
+                    )
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_error(self, error: BaseException) -> None:
+        """오류 종류에 따라 장애/정상 응답으로 기록.
+
+        Args:
+            error: 발생한 예외
+        """
+        if isinstance(error, CircuitOpenError):
+            return
+        if isinstance(error, DeadlineExceeded):
+            self.cancel()
+            return
+        if is_failure(error):
+            self.record_failure()
+        elif isinstance(error, HttpError):
+            # 404, 429 등 서버가 정상적으로 응답한 오류
+            self.record_success()
+        else:
+            self.cancel()
+
+    def cancel(self) -> None:
+        """before_call을 통과했지만 요청을 보내지 않음 (확인 요청 슬롯 반납)."""
+        with self._lock:
+            self._end_probe()
+
+    def wait_for_probe(self, timeout: Optional[float] = None) -> None:
+        """진행 중인 확인 요청(HALF_OPEN)의 결과가 나올 때까지 대기.
+
+        Args:
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+        """
+        with self._probe_done:
+            self._probe_done.wait_for(lambda: not self._probing, timeout)
+
+    def retry_in(self) -> float:
+        """다음 확인 요청까지 남은 시간 (초, 열려 있지 않으면 0)."""
+        with self._lock:
+            if self._state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self._retry_in())
+
+    def reset(self) -> None:
+        """회로를 닫힌 상태로 초기화."""
+        self.record_success()
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
+
+    def _end_probe(self) -> None:
+        # 락 보유 상태에서 호출
+        self._probing = False
+        self._probe_done.notify_all()
+
+
+# 계정별 인스턴스
+_budgets: dict[str, RetryBudget] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_retry_budget(user: str) -> RetryBudget:
+    """계정별 RetryBudget 인스턴스 반환.
+
+    Args:
+        user: 사용자 식별자
+
+    Returns:
+        같은 계정이면 같은 인스턴스
+    """
+    with _registry_lock:
+        if user not in _budgets:
+            _budgets[user] = RetryBudget()
+        return _budgets[user]
+
+
+def get_circuit_breaker(user: str) -> CircuitBreaker:
+    """계정별 CircuitBreaker 인스턴스 반환.
+
+    Args:
+        user: 사용자 식별자
+
+    Returns:
+        같은 계정이면 같은 인스턴스
+    """
+    with _registry_lock:
+        if user not in _breakers:
+            _breakers[user] = CircuitBreaker(user=user)
+        return _breakers[user]
+
+
+if __name__ == "__main__":
+    # 테스트
+    breaker = CircuitBreaker(user="test", failure_threshold=3, reset_timeout=0.5)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    print(f"After 3 failures: {breaker.state.value}")
+
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        print(f"Fail fast: {e}")
+
+    time.sleep(0.5)
+    breaker.before_call()  # 확인 요청
+    breaker.record_success()
+    print(f"After probe: {breaker.state.value}")
+
+    budget = RetryBudget(ratio=0.2, min_retries=2)
+    budget.record_success(10)
+    allowed = sum(budget.try_retry() for _ in range(10))
+    print(f"Retries allowed after 10 successes: {allowed}")
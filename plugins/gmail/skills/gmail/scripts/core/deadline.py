@@ -0,0 +1,141 @@
+"""Request Deadlines.
+
+호출 전체에 걸리는 시간의 상한(deadline)을 contextvars로 전달합니다.
+deadline 블록 안에서 실행되는 모든 단계가 남은 시간을 기준으로 동작합니다:
+
+- 소켓 타임아웃: DeadlineHttp가 요청마다 min(기본 타임아웃, 남은 시간)을 적용
+- 할당량 대기: QuotaManager.wait_for_quota의 timeout을 남은 시간으로 제한
+- 재시도: 다음 재시도까지의 대기가 남은 시간을 넘으면 기다리지 않고 실패
+- 배치 처리: 남은 시간이 없으면 처리하지 않은 ID를 result.deferred로
+
+블록이 중첩되면 더 이른 deadline이 적용됩니다.
+
+Usage:
+    with deadline(10.0):
+        client.get_message(message_id)  # 10초 안에 끝나거나 DeadlineExceeded
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import httplib2
+
+# 현재 deadline (time.monotonic 기준, 없으면 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("gmail_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """호출 deadline 초과."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """블록 안의 모든 API 호출에 deadline 적용.
+
+    Args:
+        seconds: 블록 전체에 허용할 시간 (초, None이면 바깥 deadline 유지)
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires = min(expires, outer)
+
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """현재 deadline까지 남은 시간 (초, deadline이 없으면 None)."""
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+
+def check(operation: str = "Gmail API call") -> None:
+    """deadline이 지났으면 DeadlineExceeded 발생.
+
+    Args:
+        operation: 오류 메시지에 표시할 작업 이름
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"{operation}: deadline 초과")
+
+
+def clamp(timeout: float, operation: str = "Gmail API call") -> float:
+    """timeout을 deadline까지 남은 시간으로 제한.
+
+    Args:
+        timeout: 기본 타임아웃 (초)
+        operation: 오류 메시지에 표시할 작업 이름
+
+    Returns:
+        min(timeout, 남은 시간)
+
+    Raises:
+        DeadlineExceeded: deadline이 이미 지난 경우
+    """
+    check(operation)
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+class DeadlineHttp(httplib2.Http):
+    """요청마다 소켓 타임아웃을 현재 deadline에 맞추는 httplib2.Http.
+
+    httplib2는 연결을 만들 때의 timeout을 재사용하므로, 요청 직전에
+    열려 있는 연결의 소켓 타임아웃도 함께 갱신합니다.
+    """
+
+    def __init__(self, timeout: float, **kwargs):
+        """
+        Args:
+            timeout: deadline이 없을 때의 요청별 소켓 타임아웃 (초)
+            **kwargs: httplib2.Http 인자
+        """
+        super().__init__(timeout=timeout, **kwargs)
+        self.default_timeout = timeout
+
+    def request(self, uri, method="GET", *args, **kwargs):
+        operation = f"{method} {uri.split('?')[0]}"
+        timeout = clamp(self.default_timeout, operation)
+        self.timeout = timeout
+        for conn in self.connections.values():
+            conn.timeout = timeout
+            if getattr(conn, "sock", None) is not None:
+                conn.sock.settimeout(timeout)
+
+        try:
+            return super().request(uri, method, *args, **kwargs)
+        except TimeoutError as e:
+            # deadline 때문에 줄어든 타임아웃이면 서버 장애가 아니라 deadline 초과
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(f"{operation}: deadline 초과") from e
+            raise
+
+
+if __name__ == "__main__":
+    # 테스트
+    print(f"No deadline: {remaining()}")
+
+    with deadline(1.0):
+        print(f"Clamped 30s timeout: {clamp(30.0):.2f}")
+        with deadline(5.0):
+            print(f"Nested keeps earlier deadline: {remaining():.2f}")
+
+    with deadline(0.0):
+        try:
+            check("test")
+        except DeadlineExceeded as e:
+            print(f"Expired: {e}")
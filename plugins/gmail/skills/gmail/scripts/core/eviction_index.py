@@ -0,0 +1,358 @@
+"""Cache Eviction Index.
+
+EmailCache 항목의 크기/접근 기록을 보관하는 영속 인덱스.
+
+캐시 디렉토리 옆의 SQLite 파일(eviction.sqlite3)에 항목별
+(크기, 마지막 접근 시각, 조회 횟수)를 기록하고, 계정/종류별 합계는
+트리거로 유지합니다. 덕분에 크기 제한 확인과 제거 대상 선정이
+디렉토리 스캔 없이 인덱스 조회만으로 끝납니다.
+
+Eviction Policies:
+- lru: 마지막 접근이 가장 오래된 항목부터 제거
+- lfu: 조회 횟수가 가장 적은 항목부터 제거 (동률이면 LRU)
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+_ORDER_BY = {
+    "lru": "last_access",
+    "lfu": "hits, last_access",
+}
+
+
+class EvictionIndex:
+    """LRU/LFU 제거 순서를 관리하는 영속 인덱스.
+
+    조회 기록(touch)은 메모리에 모았다가 일정 개수마다 한 번에 반영하므로
+    조회당 비용은 상각 O(1)입니다.
+
+    Usage:
+        index = EvictionIndex(Path(".cache/gmail"))
+
+        index.record("work", "messages", {"msg123": 2048})
+        index.touch("work", "messages", ["msg123"])
+
+        if index.count("work", "messages") > 1000:
+            victims = index.victims("work", "messages", 10, policy="lru")
+    """
+
+    DB_FILENAME = "eviction.sqlite3"
+    TOUCH_FLUSH_THRESHOLD = 256
+
+    def __init__(self, cache_dir: Path, busy_timeout: float = 30.0):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 (인덱스 파일이 생성될 위치)
+            busy_timeout: 다른 연결이 잠금을 보유한 경우 최대 대기 시간 (초)
+        """
+        self.db_path = Path(cache_dir) / self.DB_FILENAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._pending_touches: dict[tuple[str, str, str], tuple[int, float]] = {}
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._init_schema()
+
+        # 짧게 실행되는 CLI에서도 조회 기록이 남도록 종료 시 반영
+        atexit.register(self.flush)
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS eviction_entries (
+                    account TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (account, kind, key)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_eviction_lru
+                ON eviction_entries (account, kind, last_access);
+                CREATE INDEX IF NOT EXISTS idx_eviction_lfu
+                ON eviction_entries (account, kind, hits, last_access);
+                CREATE INDEX IF NOT EXISTS idx_eviction_global_lru
+                ON eviction_entries (last_access);
+                CREATE INDEX IF NOT EXISTS idx_eviction_global_lfu
+                ON eviction_entries (hits, last_access);
+
+                CREATE TABLE IF NOT EXISTS eviction_totals (
+                    account TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    entries INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    PRIMARY KEY (account, kind)
+                ) WITHOUT ROWID;
+
+                CREATE TRIGGER IF NOT EXISTS trg_eviction_insert
+                AFTER INSERT ON eviction_entries
+                BEGIN
+                    INSERT INTO eviction_totals (account, kind, entries, bytes)
+                    VALUES (new.account, new.kind, 1, new.size)
+                    ON CONFLICT (account, kind) DO UPDATE SET
+                        entries = entries + 1,
+                        bytes = bytes + new.size;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_eviction_delete
+                AFTER DELETE ON eviction_entries
+                BEGIN
+                    UPDATE eviction_totals SET
+                        entries = entries - 1,
+                        bytes = bytes - old.size
+                    WHERE account = old.account AND kind = old.kind;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_eviction_resize
+                AFTER UPDATE OF size ON eviction_entries
+                BEGIN
+                    UPDATE eviction_totals SET
+                        bytes = bytes - old.size + new.size
+                    WHERE account = old.account AND kind = old.kind;
+                END;
+                """
+            )
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def record(self, account: str, kind: str, sizes: dict[str, int]) -> None:
+        """저장된 항목 기록 (크기 갱신, 마지막 접근 시각 = 현재).
+
+        Args:
+            account: 계정 이름
+            kind: 항목 종류
+            sizes: {키: 크기(바이트)}
+        """
+        if not sizes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._write(
+                "INSERT INTO eviction_entries "
+                "(account, kind, key, size, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT (account, kind, key) DO UPDATE SET "
+                "size = excluded.size, last_access = excluded.last_access",
+                [(account, kind, key, size, now) for key, size in sizes.items()],
+            )
+
+    def touch(self, account: str, kind: str, keys: Iterable[str]) -> None:
+        """항목 조회 기록 (지연 반영).
+
+        Args:
+            account: 계정 이름
+            kind: 항목 종류
+            keys: 조회된 키 목록
+        """
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                hits, _ = self._pending_touches.get((account, kind, key), (0, now))
+                self._pending_touches[(account, kind, key)] = (hits + 1, now)
+
+            if len(self._pending_touches) >= self.TOUCH_FLUSH_THRESHOLD:
+                self.flush()
+
+    def flush(self) -> None:
+        """보류 중인 조회 기록을 인덱스에 반영."""
+        with self._lock:
+            if not self._pending_touches:
+                return
+
+            pending = self._pending_touches
+            self._pending_touches = {}
+            try:
+                self._write(
+                    "UPDATE eviction_entries SET "
+                    "hits = hits + ?, last_access = MAX(last_access, ?) "
+                    "WHERE account = ? AND kind = ? AND key = ?",
+                    [
+                        (hits, last_access, account, kind, key)
+                        for (account, kind, key), (hits, last_access) in pending.items()
+                    ],
+                )
+            except sqlite3.ProgrammingError:
+                # 이미 닫힌 연결 (종료 시점) - 조회 기록은 버려도 무방
+                pass
+
+    def remove(self, account: str, kind: str, keys: Iterable[str]) -> None:
+        """항목 제거."""
+        keys = list(keys)
+        if not keys:
+            return
+
+        with self._lock:
+            for key in keys:
+                self._pending_touches.pop((account, kind, key), None)
+            self._write(
+                "DELETE FROM eviction_entries "
+                "WHERE account = ? AND kind = ? AND key = ?",
+                [(account, kind, key) for key in keys],
+            )
+
+    def remove_kind(self, account: str, kind: str) -> None:
+        """계정의 특정 종류 항목 전체 제거."""
+        with self._lock:
+            self._drop_pending(lambda k: k[0] == account and k[1] == kind)
+            self._write(
+                "DELETE FROM eviction_entries WHERE account = ? AND kind = ?",
+                [(account, kind)],
+            )
+
+    def remove_account(self, account: str) -> None:
+        """계정의 모든 항목 제거."""
+        with self._lock:
+            self._drop_pending(lambda k: k[0] == account)
+            self._write(
+                "DELETE FROM eviction_entries WHERE account = ?",
+                [(account,)],
+            )
+
+    def clear(self) -> None:
+        """전체 항목 제거."""
+        with self._lock:
+            self._pending_touches.clear()
+            self._write("DELETE FROM eviction_entries", [()])
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def count(self, account: str, kind: str) -> int:
+        """계정의 특정 종류 항목 수 (O(1))."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entries FROM eviction_totals WHERE account = ? AND kind = ?",
+                (account, kind),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def total_bytes(self) -> int:
+        """전체 항목 크기 합계 (바이트)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(bytes), 0) FROM eviction_totals"
+            ).fetchone()
+        return row[0]
+
+    def victims(
+        self,
+        account: str,
+        kind: str,
+        limit: int,
+        policy: str = "lru",
+    ) -> list[str]:
+        """계정/종류 내 제거 대상 키 (제거 순서대로).
+
+        Args:
+            account: 계정 이름
+            kind: 항목 종류
+            limit: 최대 개수
+            policy: 제거 정책 ("lru" 또는 "lfu")
+
+        Returns:
+            제거할 키 목록
+        """
+        if limit <= 0:
+            return []
+
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT key FROM eviction_entries "
+                "WHERE account = ? AND kind = ? "
+                f"ORDER BY {self._order_by(policy)} LIMIT ?",
+                (account, kind, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def victims_by_size(
+        self,
+        bytes_to_free: int,
+        policy: str = "lru",
+    ) -> list[tuple[str, str, str]]:
+        """전체 캐시에서 지정한 크기 이상을 확보할 제거 대상.
+
+        Args:
+            bytes_to_free: 확보할 크기 (바이트)
+            policy: 제거 정책 ("lru" 또는 "lfu")
+
+        Returns:
+            [(account, kind, key), ...] 제거 순서대로
+        """
+        if bytes_to_free <= 0:
+            return []
+
+        victims = []
+        freed = 0
+
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(
+                "SELECT account, kind, key, size FROM eviction_entries "
+                f"ORDER BY {self._order_by(policy)}"
+            )
+            for account, kind, key, size in cursor:
+                victims.append((account, kind, key))
+                freed += size
+                if freed >= bytes_to_free:
+                    break
+            cursor.close()
+
+        return victims
+
+    def close(self) -> None:
+        """보류 중인 기록을 반영하고 연결 정리."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+        atexit.unregister(self.flush)
+
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
+
+    def _write(self, sql: str, rows: list[tuple]) -> None:
+        """쓰기 트랜잭션 실행 (락 보유 상태에서 호출)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(sql, rows)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _drop_pending(self, predicate) -> None:
+        """조건에 맞는 보류 중 조회 기록 제거 (락 보유 상태에서 호출)."""
+        for key in [k for k in self._pending_touches if predicate(k)]:
+            del self._pending_touches[key]
+
+    @staticmethod
+    def _order_by(policy: str) -> str:
+        try:
+            return _ORDER_BY[policy]
+        except KeyError:
+            raise ValueError(
+                f"알 수 없는 제거 정책: {policy} "
+                f"(사용 가능: {', '.join(EVICTION_POLICIES)})"
+            ) from None
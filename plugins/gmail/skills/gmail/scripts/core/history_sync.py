@@ -0,0 +1,329 @@
+"""Gmail History API Incremental Sync.
+
+users.history.list로 마지막 동기화 이후의 변경분만 받아
+로컬 캐시(메시지, 목록)에 반영합니다.
+
+동기화 흐름:
+1. 최초 실행: getProfile의 historyId를 기준점으로 저장
+2. 이후 실행: startHistoryId 이후 변경분 조회 (페이지당 2 units)
+   - messagesAdded: 라벨 필터 목록에 추가
+   - messagesDeleted: 메시지/목록 캐시에서 제거
+   - labelsAdded/labelsRemoved: 캐시된 메시지 라벨과 목록 멤버십 갱신
+   - 로컬 검색 인덱스가 있으면 라벨 변경/삭제를 함께 반영
+3. historyId가 만료된 경우 (HTTP 404): 기준점을 새로 잡음
+   - 변경분이 누락되므로 로컬 검색 인덱스의 완전성 표시도 해제
+
+Reference:
+    https://developers.google.com/workspace/gmail/api/guides/sync
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+
+from .cache_manager import EmailCache
+from .circuit_breaker import get_circuit_breaker, get_retry_budget
+from .quota_manager import QuotaManager, QuotaUnit
+from .retry_handler import exponential_backoff
+from .search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class HistorySync:
+    """History API 기반 캐시 증분 동기화.
+
+    Usage:
+        sync = HistorySync(gmail_service, cache, quota_manager, user="work")
+
+        # 최근 동기화가 min_interval 이내면 건너뜀
+        stats = sync.sync()
+
+        # 강제 동기화
+        stats = sync.sync(force=True)
+    """
+
+    DEFAULT_MIN_INTERVAL = 30.0  # 동기화 최소 간격 (초)
+    PAGE_SIZE = 500
+
+    def __init__(
+        self,
+        service: Resource,
+        cache: EmailCache,
+        quota_manager: Optional[QuotaManager] = None,
+        user: str = "default",
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        search_index: Optional[SearchIndex] = None,
+    ):
+        """
+        Args:
+            service: Gmail API 서비스 객체
+            cache: 동기화할 캐시
+            quota_manager: 할당량 관리자 (None이면 할당량 추적 안 함)
+            user: 사용자 식별자 (캐시 계정명)
+            min_interval: 동기화 최소 간격 (초)
+            search_index: 함께 갱신할 로컬 검색 인덱스 (선택)
+        """
+        self.service = service
+        self.cache = cache
+        self.quota_manager = quota_manager
+        self.user = user
+        self.min_interval = min_interval
+        self.search_index = search_index
+
+    def sync(self, force: bool = False) -> dict:
+        """캐시 증분 동기화.
+
+        Args:
+            force: 최소 간격과 무관하게 동기화
+
+        Returns:
+            동기화 결과 (status, history_id, changed, deleted, label_changes,
+            pages, added_ids)
+        """
+        state = self.cache.get_sync_state(self.user)
+
+        if state is None:
+            return self._bootstrap("bootstrapped")
+
+        if not force and self._synced_recently(state):
+            return {"status": "skipped", "history_id": state["history_id"]}
+
+        try:
+            return self._apply_history(state["history_id"])
+        except HttpError as e:
+            if e.resp.status == 404:
+                # historyId 만료 (보통 1주일 이상 경과)
+                logger.info(f"historyId 만료, 동기화 기준점 재설정: {self.user}")
+                return self._bootstrap("reset")
+            raise
+
+    def reset(self) -> dict:
+        """현재 historyId로 동기화 기준점을 새로 잡음.
+
+        Returns:
+            {"status": "reset", "history_id"}
+        """
+        return self._bootstrap("reset")
+
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
+
+    def _bootstrap(self, status: str) -> dict:
+        """현재 historyId를 새 기준점으로 저장."""
+
+        @self._backoff()
+        def _get_profile():
+            return self.service.users().getProfile(userId="me").execute()
+
+        self._wait_for_quota(QuotaUnit.PROFILE_GET)
+        profile = _get_profile()
+        self._record_quota(QuotaUnit.PROFILE_GET, "getProfile")
+
+        history_id = profile["historyId"]
+        self.cache.set_sync_state(self.user, history_id, reset=True)
+        if self.search_index:
+            self.search_index.set_complete(self.user, False)
+
+        return {"status": status, "history_id": str(history_id)}
+
+    def _apply_history(self, start_history_id: str) -> dict:
+        """startHistoryId 이후 변경분을 조회하여 캐시에 반영."""
+
+        @self._backoff()
+        def _list_history(**kwargs):
+            return self.service.users().history().list(**kwargs).execute()
+
+        upserts: dict[str, dict] = {}
+        added: set[str] = set()
+        deleted: set[str] = set()
+        label_changes = 0
+        pages = 0
+        page_token = None
+        latest_history_id = start_history_id
+
+        while True:
+            kwargs = {
+                "userId": "me",
+                "startHistoryId": start_history_id,
+                "maxResults": self.PAGE_SIZE,
+            }
+            if page_token:
+                kwargs["pageToken"] = page_token
+
+            self._wait_for_quota(QuotaUnit.HISTORY_LIST)
+            result = _list_history(**kwargs)
+            self._record_quota(QuotaUnit.HISTORY_LIST, "history.list")
+            pages += 1
+
+            for record in result.get("history", []):
+                for item in record.get("messagesAdded", []):
+                    message = item["message"]
+                    deleted.discard(message["id"])
+                    added.add(message["id"])
+                    upserts[message["id"]] = message
+
+                for item in record.get("messagesDeleted", []):
+                    message_id = item["message"]["id"]
+                    deleted.add(message_id)
+                    added.discard(message_id)
+                    upserts.pop(message_id, None)
+
+                for change_type in ("labelsAdded", "labelsRemoved"):
+                    for item in record.get(change_type, []):
+                        message = item["message"]
+                        if message["id"] not in deleted:
+                            upserts[message["id"]] = message
+                            label_changes += 1
+
+            latest_history_id = result.get("historyId", latest_history_id)
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+        self.cache.apply_message_changes(
+            self.user, upserts.values(), deleted, added_ids=added
+        )
+        if self.search_index:
+            self.search_index.update_labels(
+                self.user,
+                {m["id"]: m["labelIds"] for m in upserts.values() if "labelIds" in m},
+            )
+            self.search_index.remove(self.user, deleted)
+        self.cache.set_sync_state(self.user, latest_history_id)
+
+        return {
+            "status": "synced",
+            "history_id": str(latest_history_id),
+            "changed": len(upserts),
+            "deleted": len(deleted),
+            "label_changes": label_changes,
+            "pages": pages,
+            "added_ids": sorted(added),
+        }
+
+    def _synced_recently(self, state: dict) -> bool:
+        """마지막 동기화가 최소 간격 이내인지 확인."""
+        try:
+            synced_at = datetime.fromisoformat(state["synced_at"])
+        except (KeyError, ValueError):
+            return False
+        return datetime.now() - synced_at < timedelta(seconds=self.min_interval)
+
+    def _wait_for_quota(self, units: int) -> None:
+        if self.quota_manager:
+            self.quota_manager.wait_for_quota(self.user, units)
+
+    def _record_quota(self, units: int, method: str) -> None:
+        if self.quota_manager:
+            self.quota_manager.record_usage(self.user, units, method)
+
+    def _backoff(self):
+        """exponential_backoff + 속도 제한 응답을 할당량 관리자에 알림 (AIMD)."""
+
+        def on_rate_limited(error: Exception, retry_after: Optional[float]) -> None:
+            if self.quota_manager:
+                self.quota_manager.report_rate_limited(self.user, retry_after)
+
+        return exponential_backoff(
+            max_retries=5,
+            on_rate_limited=on_rate_limited,
+            budget=get_retry_budget(self.user),
+            breaker=get_circuit_breaker(self.user),
+        )
+
+
+if __name__ == "__main__":
+    # 테스트 (가짜 Gmail 서비스)
+    import tempfile
+    from pathlib import Path
+
+    from httplib2 import Response
+
+    class _Request:
+        def __init__(self, result):
+            self.result = result
+
+        def execute(self):
+            if isinstance(self.result, Exception):
+                raise self.result
+            return self.result
+
+    class _FakeService:
+        """getProfile과 history.list만 흉내 냄 (pageToken은 페이지 번호)."""
+
+        def __init__(self):
+            self.history_id = "100"
+            self.pages: list = []
+
+        def users(self):
+            return self
+
+        def history(self):
+            return self
+
+        def getProfile(self, userId):
+            return _Request({"emailAddress": "me@example.com", "historyId": self.history_id})
+
+        def list(self, userId, startHistoryId, maxResults, pageToken=None):
+            if isinstance(self.pages, Exception):
+                return _Request(self.pages)
+            page = int(pageToken or 0)
+            result = {"history": self.pages[page], "historyId": self.history_id}
+            if page + 1 < len(self.pages):
+                result["nextPageToken"] = str(page + 1)
+            return _Request(result)
+
+    def _message(message_id: str, label_ids: list[str]) -> dict:
+        return {"message": {"id": message_id, "threadId": "t", "labelIds": label_ids}}
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        service = _FakeService()
+        cache = EmailCache(cache_dir=cache_dir)
+        index = SearchIndex(Path(cache_dir))
+        sync = HistorySync(service, cache, user="test", search_index=index)
+
+        # 1. 최초 실행: 기준점 저장
+        stats = sync.sync()
+        assert stats == {"status": "bootstrapped", "history_id": "100"}, stats
+        assert sync.sync()["status"] == "skipped"
+
+        message = {"id": "m1", "subject": "hi", "label_ids": ["INBOX", "UNREAD"]}
+        cache.set_message("test", "m1", message)
+        index.index_messages("test", [message])
+        index.set_complete("test", True)
+
+        # 2. 변경분 반영 (두 페이지: 라벨 변경, 새 메시지, 삭제)
+        service.history_id = "105"
+        service.pages = [
+            [{"labelsRemoved": [_message("m1", ["INBOX"])]}],
+            [
+                {"messagesAdded": [_message("m2", ["INBOX", "UNREAD"])]},
+                {"messagesAdded": [_message("m3", ["INBOX"])]},
+                {"messagesDeleted": [_message("m3", [])]},
+            ],
+        ]
+        stats = sync.sync(force=True)
+        print(f"Synced: {stats}")
+        assert stats["status"] == "synced" and stats["history_id"] == "105"
+        assert stats["pages"] == 2 and stats["added_ids"] == ["m2"]
+        assert stats["changed"] == 2 and stats["deleted"] == 1 and stats["label_changes"] == 1
+        assert cache.get_message("test", "m1")["label_ids"] == ["INBOX"]
+        assert index.search(accounts=["test"])[0]["label_ids"] == ["INBOX"]
+        assert cache.get_sync_state("test")["history_id"] == "105"
+
+        # 3. historyId 만료 (404): 기준점을 새로 잡고 인덱스 완전성 해제
+        service.pages = HttpError(Response({"status": 404}), b'{"error": {"code": 404}}')
+        stats = sync.sync(force=True)
+        print(f"Expired: {stats}")
+        assert stats == {"status": "reset", "history_id": "105"}, stats
+        assert not index.is_complete("test")
+
+        index.close()
+        cache.close()
+
+    print("OK")
@@ -0,0 +1,147 @@
+"""In-process LRU Memory Cache.
+
+EmailCache의 디스크 저장소 앞에 놓이는 프로세스 내 메모리 계층.
+
+- (account, kind, key) 단위로 항목 보관
+- 항목 수와 바이트 크기 두 가지 한도를 모두 적용
+- 한도 초과 시 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+- 값은 직렬화된 JSON으로 보관하고 조회할 때마다 새 객체로 복원
+  (호출자가 반환된 dict를 수정해도 캐시된 값은 바뀌지 않음)
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+CacheKey = tuple[str, str, str]
+
+
+class MemoryCache:
+    """크기 제한이 있는 LRU 메모리 캐시.
+
+    Usage:
+        memory = MemoryCache(max_entries=500, max_bytes=32 * 1024 * 1024)
+
+        memory.put(("work", "messages", "msg123"), data)
+        data = memory.get(("work", "messages", "msg123"))
+
+        memory.evict_kind("work", "lists")
+    """
+
+    def __init__(self, max_entries: int = 500, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: 최대 항목 수 (0이면 비활성화)
+            max_bytes: 최대 크기 (바이트, 0이면 비활성화)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """메모리 계층 사용 여부."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: CacheKey) -> Optional[dict]:
+        """항목 조회 (조회된 항목은 가장 최근 사용으로 이동).
+
+        Args:
+            key: (account, kind, key)
+
+        Returns:
+            캐시된 값의 복사본 또는 None
+        """
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(encoded)
+
+    def put(self, key: CacheKey, value: dict, encoded: Optional[bytes] = None) -> None:
+        """항목 저장.
+
+        Args:
+            key: (account, kind, key)
+            value: 저장할 값
+            encoded: 이미 직렬화한 값 (UTF-8 JSON, 없으면 value를 직렬화)
+        """
+        if not self.enabled:
+            return
+
+        if encoded is None:
+            encoded = json.dumps(value, ensure_ascii=False).encode()
+
+        with self._lock:
+            self._remove(key)
+
+            # 한도보다 큰 단일 항목은 메모리에 두지 않음
+            if len(encoded) > self.max_bytes:
+                return
+
+            self._entries[key] = encoded
+            self._bytes += len(encoded)
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def evict(self, key: CacheKey) -> None:
+        """항목 제거."""
+        with self._lock:
+            self._remove(key)
+
+    def evict_kind(self, account: str, kind: str) -> None:
+        """계정의 특정 종류 항목 전체 제거."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == account and k[1] == kind]:
+                self._remove(key)
+
+    def evict_account(self, account: str) -> None:
+        """계정의 모든 항목 제거."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == account]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """전체 항목 제거."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+        """메모리 계층 통계."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        """항목 제거 (락 보유 상태에서 호출)."""
+        encoded = self._entries.pop(key, None)
+        if encoded is not None:
+            self._bytes -= len(encoded)
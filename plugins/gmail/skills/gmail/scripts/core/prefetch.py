@@ -0,0 +1,111 @@
+"""Background Prefetch.
+
+반복자를 백그라운드 스레드에서 depth개만큼 앞서 실행합니다.
+호출자가 현재 페이지/배치를 처리하는 동안 다음 것을 미리 받아 두고,
+버퍼가 차면 생산자가 멈추므로 메모리 사용량은 결과 크기와 관계없이
+depth개 항목으로 일정합니다.
+
+- 생산자에서 발생한 예외는 호출자 쪽 next()에서 다시 발생
+- 호출자가 반복을 중단하면(close/break) 생산자도 다음 항목에서 멈춤
+- 호출 스레드의 deadline(core.deadline) 등 contextvars가 생산자에 전달됨
+
+Usage:
+    for page in prefetch(fetch_pages()):
+        process(page)  # 그동안 다음 페이지를 조회
+"""
+
+import contextvars
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# 생산자가 끝났음을 알리는 표시
+_DONE = object()
+
+
+class _Failure:
+    """생산자에서 발생한 예외 전달용."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], depth: int = 1) -> Iterator[T]:
+    """items를 백그라운드 스레드에서 depth개만큼 앞서 가져오는 반복자.
+
+    Args:
+        items: 미리 가져올 반복 가능 객체 (보통 API를 호출하는 제너레이터)
+        depth: 호출자보다 앞서 준비해 둘 최대 항목 수
+
+    Returns:
+        items와 같은 순서의 반복자
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        # 호출자가 반복을 중단했으면 False (버퍼가 가득 찬 채로 멈추지 않도록 주기적으로 확인)
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+        else:
+            put(_DONE)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    context = contextvars.copy_context()
+    producer = threading.Thread(
+        target=context.run, args=(produce,), name="gmail-prefetch", daemon=True
+    )
+    producer.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+if __name__ == "__main__":
+    # 테스트
+    import time
+
+    def slow_pages():
+        for i in range(5):
+            time.sleep(0.2)  # 페이지 조회
+            yield [i] * 3
+
+    started = time.monotonic()
+    for page in prefetch(slow_pages()):
+        time.sleep(0.2)  # 페이지 처리
+    print(f"Overlapped: {time.monotonic() - started:.1f}s (serial would be 2.0s)")
+
+    def failing():
+        yield 1
+        raise ValueError("page 2 failed")
+
+    try:
+        print([x for x in prefetch(failing())])
+    except ValueError as e:
+        print(f"Propagated: {e}")
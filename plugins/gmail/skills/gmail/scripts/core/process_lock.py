@@ -0,0 +1,77 @@
+"""Cross-Process Lock.
+
+같은 캐시 디렉토리를 공유하는 여러 프로세스(동시에 실행된 CLI 등) 사이의
+권고 잠금(advisory lock).
+
+- POSIX: 잠금 파일에 fcntl.flock 배타 잠금
+- fcntl이 없는 플랫폼(Windows): 프로세스 내 스레드 잠금만 적용
+"""
+
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class ProcessLock:
+    """프로세스 간 배타 잠금 (같은 프로세스 안에서는 재진입 가능).
+
+    스레드 잠금을 함께 잡으므로 threading.Lock 대신 그대로 사용할 수 있습니다.
+
+    Usage:
+        lock = ProcessLock(Path(".cache/gmail/.cache.lock"))
+
+        with lock:
+            # 다른 프로세스/스레드와 배타적으로 실행
+            ...
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 잠금 파일 경로 (없으면 생성)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self) -> None:
+        """잠금 획득 (다른 프로세스가 보유 중이면 대기)."""
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """잠금 해제."""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def close(self) -> None:
+        """잠금 파일 닫기."""
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "ProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
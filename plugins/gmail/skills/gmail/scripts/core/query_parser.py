@@ -0,0 +1,443 @@
+"""Gmail Search Query Parser.
+
+도구에서 주로 쓰는 Gmail 검색 쿼리 일부를 해석하여 로컬에서 평가합니다.
+같은 쿼리를 Python 조건식(캐시된 메시지)과 SQL 조건절(로컬 검색 인덱스)
+두 가지로 컴파일할 수 있습니다.
+
+지원 연산자:
+- from:, to:, subject:       헤더 부분 일치 (대소문자 무시)
+- is:unread, is:read, is:starred, is:important
+- label:, in:                라벨 이름 또는 ID (in:anywhere는 스팸/휴지통 포함)
+- has:attachment
+- after:, before:            YYYY/MM/DD (PST 자정 기준) 또는 epoch 초
+- 일반 검색어 (단어 단위 일치), "정확한 구문"
+- -연산자 / -검색어           부정
+
+OR, 괄호, 그 밖의 연산자는 UnsupportedQueryError를 발생시키므로
+호출자는 API 검색으로 대체해야 합니다.
+
+Reference:
+    https://support.google.com/mail/answer/7190
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _GMAIL_TZ = ZoneInfo("America/Los_Angeles")
+except (ImportError, KeyError):
+    # tzdata가 없는 환경: PST 고정 오프셋
+    _GMAIL_TZ = timezone(timedelta(hours=-8))
+
+SYSTEM_LABELS = {
+    "inbox": "INBOX",
+    "sent": "SENT",
+    "draft": "DRAFT",
+    "drafts": "DRAFT",
+    "spam": "SPAM",
+    "trash": "TRASH",
+    "starred": "STARRED",
+    "unread": "UNREAD",
+    "important": "IMPORTANT",
+    "chat": "CHAT",
+}
+
+HIDDEN_LABELS = ("SPAM", "TRASH")
+
+# is: 값 → (라벨 ID, 라벨이 있어야 하는지)
+_IS_LABELS = {
+    "unread": ("UNREAD", True),
+    "read": ("UNREAD", False),
+    "starred": ("STARRED", True),
+    "important": ("IMPORTANT", True),
+}
+
+_HEADER_FIELDS = {
+    "from": ("from_addr", ("from",)),
+    "to": ("to_addr", ("to", "cc")),
+    "subject": ("subject", ("subject",)),
+}
+
+_TEXT_FIELDS = ("subject", "from", "to", "cc", "snippet", "body")
+
+_TOKEN_PATTERN = re.compile(r'(-)?(?:([A-Za-z_]+):)?("[^"]*"|\S+)')
+
+
+class UnsupportedQueryError(ValueError):
+    """로컬에서 평가할 수 없는 쿼리."""
+
+
+@dataclass
+class QueryTerm:
+    """쿼리의 단일 조건.
+
+    field: "text", "from", "to", "subject", "label", "has", "after", "before"
+    """
+
+    field: str
+    value: str
+    negated: bool = False
+    phrase: bool = False
+
+
+@dataclass
+class ParsedQuery:
+    """해석된 쿼리 (조건들의 AND).
+
+    Usage:
+        parsed = parse_query("from:alice is:unread after:2024/01/01")
+
+        # 캐시된 메시지 평가 (GmailClient._parse_message 형식)
+        parsed.matches(message)
+
+        # 로컬 검색 인덱스 조건절
+        where, params = parsed.to_sql()
+    """
+
+    terms: list[QueryTerm] = field(default_factory=list)
+    include_spam_trash: bool = False
+
+    @property
+    def label_only(self) -> bool:
+        """라벨만으로 평가 가능한지 (헤더/본문/날짜 불필요)."""
+        return all(term.field == "label" for term in self.terms)
+
+    @property
+    def needs_body(self) -> bool:
+        """본문 또는 첨부파일 정보가 있어야 평가 가능한지."""
+        return any(term.field in ("text", "has") for term in self.terms)
+
+    @property
+    def uses_attachments(self) -> bool:
+        """has:attachment 조건 포함 여부."""
+        return any(term.field == "has" for term in self.terms)
+
+    def label_requirements(
+        self,
+        include_spam_trash: bool = False,
+    ) -> tuple[set[str], set[str]]:
+        """쿼리가 요구하는 라벨과 허용하지 않는 라벨.
+
+        Args:
+            include_spam_trash: 스팸/휴지통 메시지 포함 여부
+
+        Returns:
+            (있어야 하는 라벨 ID, 없어야 하는 라벨 ID)
+        """
+        required = {t.value for t in self.terms if t.field == "label" and not t.negated}
+        forbidden = {t.value for t in self.terms if t.field == "label" and t.negated}
+        if not (include_spam_trash or self.include_spam_trash):
+            forbidden.update(HIDDEN_LABELS)
+        return required, forbidden
+
+    def matches(self, message: dict, include_spam_trash: bool = False) -> bool:
+        """메시지가 쿼리 조건을 모두 만족하는지 확인.
+
+        Args:
+            message: 파싱된 메시지 (label_ids, from, to, subject, body,
+                attachments 또는 has_attachment, internal_date 등)
+            include_spam_trash: 스팸/휴지통 메시지 포함 여부
+
+        Returns:
+            조건 만족 여부
+        """
+        labels = set(message.get("label_ids") or [])
+
+        if not (include_spam_trash or self.include_spam_trash):
+            if labels.intersection(HIDDEN_LABELS):
+                return False
+
+        for term in self.terms:
+            if self._term_matches(term, message, labels) == term.negated:
+                return False
+        return True
+
+    def to_sql(self, include_spam_trash: bool = False) -> tuple[str, list]:
+        """로컬 검색 인덱스(indexed_messages AS m)에 대한 조건절 생성.
+
+        Args:
+            include_spam_trash: 스팸/휴지통 메시지 포함 여부
+
+        Returns:
+            (조건절, 바인딩 값) - 조건이 없으면 ("1", [])
+        """
+        conditions = []
+        params: list = []
+
+        if not (include_spam_trash or self.include_spam_trash):
+            for label_id in HIDDEN_LABELS:
+                conditions.append("instr(' ' || m.labels || ' ', ?) = 0")
+                params.append(f" {label_id} ")
+
+        for term in self.terms:
+            sql, values = self._term_sql(term)
+            conditions.append(f"NOT ({sql})" if term.negated else sql)
+            params.extend(values)
+
+        return (" AND ".join(conditions) or "1"), params
+
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
+
+    @staticmethod
+    def _term_matches(term: QueryTerm, message: dict, labels: set[str]) -> bool:
+        if term.field == "label":
+            return term.value in labels
+
+        if term.field == "has":
+            if "has_attachment" in message:
+                return bool(message["has_attachment"])
+            return bool(message.get("attachments"))
+
+        if term.field in ("after", "before"):
+            internal_date = int(message.get("internal_date") or 0)
+            if term.field == "after":
+                return internal_date >= int(term.value)
+            return internal_date < int(term.value)
+
+        if term.field in _HEADER_FIELDS:
+            needle = term.value.lower()
+            return any(
+                needle in (message.get(name) or "").lower()
+                for name in _HEADER_FIELDS[term.field][1]
+            )
+
+        # 일반 검색어/구문: Gmail처럼 단어 단위 일치 (접두어는 일치하지 않음)
+        words = [re.escape(word) for word in term.value.split()]
+        pattern = re.compile(r"(?<!\w)" + r"\s+".join(words) + r"(?!\w)", re.IGNORECASE)
+        return any(
+            pattern.search(message.get(name) or "") for name in _TEXT_FIELDS
+        )
+
+    @staticmethod
+    def _term_sql(term: QueryTerm) -> tuple[str, list]:
+        if term.field == "label":
+            return "instr(' ' || m.labels || ' ', ?) > 0", [f" {term.value} "]
+
+        if term.field == "has":
+            return "COALESCE(m.has_attachment, 0) = 1", []
+
+        if term.field == "after":
+            return "m.internal_date >= ?", [int(term.value)]
+
+        if term.field == "before":
+            return "m.internal_date < ?", [int(term.value)]
+
+        if term.field in _HEADER_FIELDS:
+            column = _HEADER_FIELDS[term.field][0]
+            return f"m.{column} LIKE ? ESCAPE '\\'", [f"%{_escape_like(term.value)}%"]
+
+        # 라벨 열은 제외하고 헤더/스니펫/본문에서만 검색 (접두어 검색 '*' 없이 단어 단위)
+        match = '{subject from_addr to_addr snippet body} : "' + term.value.replace('"', '""') + '"'
+        return (
+            "m.rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)",
+            [match],
+        )
+
+
+def parse_query(query: str, labels: Optional[list[dict]] = None) -> ParsedQuery:
+    """Gmail 검색 쿼리 해석.
+
+    Args:
+        query: Gmail 검색 쿼리
+        labels: 라벨 목록 ({"id", "name"}) - 사용자 라벨 이름 해석용
+
+    Returns:
+        ParsedQuery
+
+    Raises:
+        UnsupportedQueryError: 지원하지 않는 연산자나 문법이 포함된 경우
+    """
+    parsed = ParsedQuery()
+
+    for match in _TOKEN_PATTERN.finditer(query or ""):
+        negated = bool(match.group(1))
+        operator = (match.group(2) or "").lower()
+        raw = match.group(3)
+        phrase = raw.startswith('"')
+        value = raw[1:-1] if phrase else raw
+
+        if not operator:
+            if raw in ("OR", "|", "AND") or raw[0] in "({" or raw[-1] in ")}":
+                if raw == "AND":
+                    continue
+                raise UnsupportedQueryError(f"지원하지 않는 쿼리 문법: {raw}")
+            if value:
+                parsed.terms.append(QueryTerm("text", value, negated, phrase))
+            continue
+
+        if not value or value[0] in "({":
+            raise UnsupportedQueryError(f"지원하지 않는 쿼리 값: {match.group(0)}")
+
+        if operator in _HEADER_FIELDS:
+            parsed.terms.append(QueryTerm(operator, value, negated))
+
+        elif operator == "is":
+            if value.lower() not in _IS_LABELS:
+                raise UnsupportedQueryError(f"지원하지 않는 is: 값: {value}")
+            label_id, present = _IS_LABELS[value.lower()]
+            parsed.terms.append(QueryTerm("label", label_id, negated != (not present)))
+
+        elif operator in ("label", "in"):
+            if operator == "in" and value.lower() == "anywhere":
+                parsed.include_spam_trash = not negated
+                continue
+            label_id = _resolve_label(value, labels)
+            if label_id in HIDDEN_LABELS and not negated:
+                parsed.include_spam_trash = True
+            parsed.terms.append(QueryTerm("label", label_id, negated))
+
+        elif operator == "has":
+            if value.lower() != "attachment":
+                raise UnsupportedQueryError(f"지원하지 않는 has: 값: {value}")
+            parsed.terms.append(QueryTerm("has", "attachment", negated))
+
+        elif operator in ("after", "before"):
+            parsed.terms.append(
+                QueryTerm(operator, str(_parse_date_ms(value)), negated)
+            )
+
+        else:
+            raise UnsupportedQueryError(f"지원하지 않는 연산자: {operator}:")
+
+    return parsed
+
+
+def _resolve_label(value: str, labels: Optional[list[dict]]) -> str:
+    """label:/in: 값을 라벨 ID로 변환."""
+    system = SYSTEM_LABELS.get(value.lower())
+    if system:
+        return system
+
+    normalized = _normalize_label_name(value)
+    for label in labels or []:
+        if label.get("id") == value or _normalize_label_name(label.get("name", "")) == normalized:
+            return label["id"]
+
+    # CATEGORY_SOCIAL 같은 시스템 라벨 ID
+    if value.isupper():
+        return value
+
+    raise UnsupportedQueryError(f"알 수 없는 라벨: {value}")
+
+
+def _normalize_label_name(name: str) -> str:
+    """Gmail 쿼리의 라벨 표기 정규화 (소문자, 공백/슬래시 → '-')."""
+    return re.sub(r"[\s/]+", "-", name.strip().lower())
+
+
+def _parse_date_ms(value: str) -> int:
+    """after:/before: 값을 epoch 밀리초로 변환 (날짜는 PST 자정 기준)."""
+    if value.isdigit():
+        return int(value) * 1000
+
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            date = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return int(date.replace(tzinfo=_GMAIL_TZ).timestamp() * 1000)
+
+    raise UnsupportedQueryError(f"지원하지 않는 날짜 형식: {value}")
+
+
+def _escape_like(value: str) -> str:
+    """LIKE 패턴 특수문자 이스케이프."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+if __name__ == "__main__":
+    # 테스트: Python 조건식과 SQL 조건절이 같은 메시지를 고르는지 확인
+    import tempfile
+    from pathlib import Path
+
+    from .search_index import SearchIndex
+
+    day = 24 * 3600 * 1000
+    jan2 = _parse_date_ms("2024/01/02")
+    assert jan2 == 1704182400000, jan2  # 2024-01-02 00:00 PST = 08:00 UTC
+    assert _parse_date_ms("1704182400") == jan2
+
+    labels = [{"id": "Label_1", "name": "Work/Projects"}]
+    messages = [
+        {
+            "id": "m1", "from": "Alice <alice@example.com>", "to": "me@example.com",
+            "subject": "Quarterly report", "body": "numbers attached",
+            "label_ids": ["INBOX", "UNREAD", "Label_1"], "attachments": [{"id": "a1"}],
+            "internal_date": jan2 + 3600 * 1000,
+        },
+        {
+            "id": "m2", "from": "bob@example.com", "to": "me@example.com",
+            "subject": "Reporting lunch", "body": "see you",
+            "label_ids": ["INBOX"], "attachments": [],
+            "internal_date": jan2 - day,
+        },
+        {
+            "id": "m3", "from": "alice@example.com", "to": "me@example.com",
+            "subject": "Buy now", "body": "quarterly report inside",
+            "label_ids": ["SPAM"], "attachments": [],
+            "internal_date": jan2 + day // 2,
+        },
+        {
+            "id": "m4", "from": "carol@example.com", "to": "alice@example.com",
+            "subject": "Old draft", "body": "report draft",
+            "label_ids": ["TRASH", "STARRED"], "attachments": [{"id": "a2"}],
+            "internal_date": jan2 - 2 * day,
+        },
+    ]
+
+    cases = {
+        "from:alice": ["m1"],
+        "-from:alice": ["m2"],
+        "is:unread": ["m1"],
+        "is:read": ["m2"],
+        "label:work-projects": ["m1"],
+        "label:Label_1": ["m1"],
+        "-label:work-projects": ["m2"],
+        "in:spam": ["m3"],
+        "from:alice in:anywhere": ["m1", "m3"],
+        "in:anywhere is:starred": ["m4"],
+        "has:attachment": ["m1"],
+        "has:attachment in:anywhere": ["m1", "m4"],
+        "after:2024/01/02": ["m1"],
+        "before:2024/01/02": ["m2"],
+        "after:2024/01/01 before:2024/01/03 in:anywhere": ["m1", "m2", "m3"],
+        "report": ["m1"],  # 단어 단위 일치 ("Reporting"은 아님)
+        "report in:anywhere -in:trash": ["m1", "m3"],
+        '"quarterly report"': ["m1"],
+        "subject:report": ["m1", "m2"],  # 헤더 연산자는 부분 일치
+        "lunch": ["m2"],
+        "lunch -reporting": [],
+    }
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        index = SearchIndex(Path(cache_dir))
+        index.index_messages("test", messages)
+
+        for query, expected in cases.items():
+            parsed = parse_query(query, labels)
+            in_python = sorted(m["id"] for m in messages if parsed.matches(m))
+            in_sql = sorted(
+                r["id"]
+                for r in index.search(accounts=["test"], limit=10, where=parsed.to_sql())
+            )
+            assert in_python == expected, f"{query}: python {in_python} != {expected}"
+            assert in_sql == expected, f"{query}: sql {in_sql} != {expected}"
+            print(f"{query:<50} {in_python}")
+
+        index.close()
+
+    for query in ("alice OR bob", "(from:alice)", "label:unknown", "is:snoozed", "older_than:1d"):
+        try:
+            parse_query(query, labels)
+        except UnsupportedQueryError as e:
+            print(f"{query:<50} unsupported ({e})")
+        else:
+            raise AssertionError(f"{query}: should be unsupported")
+
+    print("OK")
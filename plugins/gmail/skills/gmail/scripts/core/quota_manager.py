@@ -8,24 +8,53 @@ Quota Units (Gmail API Reference):
 - messages.send: 100 units
 - messages.modify: 5 units
 - messages.batchModify: 50 units
+- messages.batchDelete: 50 units
 - threads.list: 5 units
 - threads.get: 10 units
+- history.list: 2 units
 
 Rate Limits:
-- Per-user: 250 quota units per second
+- Per-user: 250 quota units per second (moving average, 짧은 버스트 허용)
 - Daily: 1,000,000,000 units (workspace), varies for consumer
+  (태평양 시간 자정에 초기화)
+
+초당 한도는 토큰 버킷으로 적용합니다 (고정 1초 창은 창 경계에서
+한도의 2배까지 허용하고, 폴링 대기로 최대 100ms를 낭비하던 문제가 있음).
+버킷 크기(burst)는 기본값이 가장 큰 단일 요청(100)이므로, 임의의 1초 구간에
+허용되는 단위는 최대 burst + rate_limit입니다.
+
+실제로 허용되는 속도는 계정 종류와 다른 클라이언트의 사용량에 따라
+달라지므로, 버킷이 채워지는 속도는 AIMD로 학습합니다: 429/rateLimitExceeded를
+받으면 절반으로 줄이고, 성공이 이어지면 1초마다 조금씩 rate_limit까지 늘립니다.
+응답에 재시도 시각(Retry-After 등)이 있으면 그때까지 해당 계정의 모든 요청을
+멈추므로, 다른 호출이 각자 같은 한도에 부딪히지 않습니다.
+
+요청은 우선순위(QuotaPriority)로 구분합니다: 사용자가 기다리는 조회/전송/라벨
+변경(interactive)은 대기 중인 bulk 배치보다 먼저 진행하고, bulk 작업에는
+rate의 일정 비율(bulk_share)을 최소 몫으로 보장해 멈추지 않게 합니다.
+
+asyncio 코드는 같은 버킷을 쓰는 wait_for_quota_async로 대기합니다.
 
 Reference:
     https://developers.google.com/workspace/gmail/api/reference/quota
 """
 
+import asyncio
+import atexit
+import logging
 import threading
 import time
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from enum import IntEnum
+from pathlib import Path
 from typing import Optional
 
+from .deadline import DeadlineExceeded, clamp
+from .quota_store import SharedQuotaStore, admit, next_quota_reset, quota_day
+
+logger = logging.getLogger(__name__)
+
 
 class QuotaUnit(IntEnum):
     """API 메서드별 할당량 단위."""
@@ -37,6 +66,7 @@ class QuotaUnit(IntEnum):
     MESSAGES_MODIFY = 5
     MESSAGES_BATCH_MODIFY = 50
     MESSAGES_DELETE = 10
+    MESSAGES_BATCH_DELETE = 50
     MESSAGES_TRASH = 5
     MESSAGES_UNTRASH = 5
 
@@ -63,18 +93,61 @@ class QuotaUnit(IntEnum):
     # Profile
     PROFILE_GET = 5
 
+    # History
+    HISTORY_LIST = 2
+
     # Attachments
     ATTACHMENTS_GET = 5
 
 
+class QuotaPriority(IntEnum):
+    """할당량 대기 우선순위."""
+
+    INTERACTIVE = 0  # 사용자가 결과를 기다리는 단건 요청 (조회, 전송, 라벨 변경)
+    BULK = 1  # 대량 배치 작업 (전체 읽음 처리, 인덱스 구축 등)
+
+
 @dataclass
 class QuotaUsage:
-    """사용자별 할당량 사용 현황."""
+    """사용자별 할당량 사용 현황.
+
+    초당 한도는 토큰 버킷으로 관리합니다. 토큰은 초당 rate_limit개씩
+    (소수 단위로) 채워지고 최대 burst개까지 쌓입니다. 예약된 요청 때문에
+    토큰이 음수가 될 수 있으며, 이때 다음 요청은 채워질 때까지 대기합니다.
+    """
 
-    units_used: int = 0
-    last_reset: datetime = field(default_factory=datetime.now)
+    tokens: float = 0.0
+    last_refill: float = field(default_factory=time.monotonic)
+    reserved: int = 0  # wait_for_quota로 예약했지만 아직 record_usage되지 않은 단위
     daily_units: int = 0
-    daily_reset: datetime = field(default_factory=datetime.now)
+    daily_day: str = field(default_factory=quota_day)  # 태평양 시간 기준 일자
+    rate: float = 0.0  # 학습된 초당 한도 (AIMD)
+    rate_changed: float = 0.0  # 마지막 rate 조정 시각 (증가/감소, monotonic)
+    rate_decreased: float = 0.0  # 마지막 rate 감소 시각 (monotonic)
+    bulk_credit: float = 0.0  # bulk 최소 몫 크레딧 (rate * bulk_share로 채워짐)
+    paused_until: float = 0.0  # 서버가 알려준 재시도 시각 (monotonic, 그때까지 대기)
+    ledger: dict[str, list[int]] = field(default_factory=dict)  # 메서드: [단위, 호출 수]
+
+    # 공유 모드: 공유 버킷에서 빌린 토큰의 반납 시각과 아직 반영하지 않은 사용 기록
+    lease_expires: float = 0.0
+    pending: dict[str, list[int]] = field(default_factory=dict)
+
+
+@dataclass
+class QuotaForecast:
+    """계획한 작업이 남은 일일 할당량 안에 들어가는지 예측한 결과."""
+
+    required: int  # 작업에 필요한 단위
+    used: int  # 오늘 사용한 단위
+    remaining: int  # 오늘 남은 단위
+    allowed: int  # 지금 진행해도 되는 단위 (나머지는 초기화 이후로 연기)
+    resets_at: datetime  # 다음 일일 할당량 초기화 시각
+    duration_seconds: float  # 학습된 초당 한도로 작업을 마치는 데 걸리는 최소 시간
+
+    @property
+    def fits(self) -> bool:
+        """작업 전체를 지금 진행할 수 있는지."""
+        return self.allowed >= self.required
 
 
 class QuotaManager:
@@ -83,6 +156,21 @@ class QuotaManager:
     Per-user rate limiting (250 units/second)과
     일일 할당량을 추적하고 관리합니다.
 
+    초당 한도는 토큰 버킷으로 적용합니다. wait_for_quota는 필요한 토큰을
+    즉시 예약하고, 토큰이 채워지는 정확한 시각까지 Condition에서 대기합니다
+    (폴링 없음, 예약 순서대로 진행). 이어지는 record_usage는 예약분을 먼저
+    차감하므로 같은 호출이 두 번 계산되지 않습니다.
+
+    state_dir를 지정하면 같은 디렉토리를 쓰는 모든 프로세스가 계정별 버킷을
+    공유합니다 (SharedQuotaStore). 이때 각 프로세스는 공유 버킷에서 토큰을
+    조금씩(lease) 빌려 메모리에서 소비하므로, 단일 프로세스에서는 대부분의
+    호출이 DB를 거치지 않습니다. 쓰지 않은 토큰은 LEASE_SECONDS 뒤 반납합니다.
+
+    BULK 우선순위 요청은 토큰이 실제로 있을 때만 진행하므로 INTERACTIVE
+    요청의 예약 뒤에 줄을 서지 않습니다. 대신 rate * bulk_share 속도로 쌓이는
+    크레딧으로는 예약할 수 있어, INTERACTIVE 요청이 한도를 채워도 bulk 작업은
+    최소 몫만큼 계속 진행됩니다.
+
     Usage:
         quota = QuotaManager()
 
@@ -90,38 +178,84 @@ class QuotaManager:
         if quota.can_execute("user@gmail.com", QuotaUnit.MESSAGES_LIST):
             # API 호출
             result = api.list_messages()
-            quota.record_usage("user@gmail.com", QuotaUnit.MESSAGES_LIST)
+            quota.record_usage("user@gmail.com", QuotaUnit.MESSAGES_LIST, "messages.list")
 
         # 또는 자동 대기
         quota.wait_for_quota("user@gmail.com", QuotaUnit.MESSAGES_GET)
         result = api.get_message(id)
-        quota.record_usage("user@gmail.com", QuotaUnit.MESSAGES_GET)
+        quota.record_usage("user@gmail.com", QuotaUnit.MESSAGES_GET, "messages.get")
+
+        # 대량 작업은 BULK 우선순위로 (단건 요청에 양보)
+        quota.wait_for_quota(
+            "user@gmail.com", QuotaUnit.MESSAGES_BATCH_MODIFY, priority=QuotaPriority.BULK
+        )
+
+        # 대량 작업 전 일일 할당량 확인
+        forecast = quota.forecast("user@gmail.com", 20 * QuotaUnit.MESSAGES_BATCH_MODIFY)
+        if not forecast.fits:
+            ...  # forecast.allowed 만큼만 진행하고 나머지는 forecast.resets_at 이후로
     """
 
     # Gmail API limits
     USER_RATE_LIMIT = 250  # units per second
+    DEFAULT_BURST = int(max(QuotaUnit))  # 버킷 크기: 가장 큰 단일 요청 (messages.send)
     DAILY_LIMIT = 1_000_000_000  # units per day (workspace)
     CONSUMER_DAILY_LIMIT = 1_000_000  # Conservative estimate for consumer accounts
 
+    LEASE_SECONDS = 1.0  # 공유 모드에서 빌린 토큰을 보유하는 시간
+
+    # AIMD: 속도 제한 오류 시 곱셈 감소, 성공이 이어지면 덧셈 증가
+    AIMD_DECREASE = 0.5  # 감소 시 곱할 값
+    AIMD_INCREASE = 0.05  # 증가 시 더할 값 (rate_limit 대비 비율)
+    AIMD_INTERVAL = 1.0  # 감소 사이, 마지막 조정 후 증가까지의 최소 간격 (초)
+    AIMD_MIN_FRACTION = 0.1  # 하한 (rate_limit 대비 비율)
+
+    BULK_MIN_SHARE = 0.2  # bulk 요청에 보장하는 최소 몫 (rate 대비 비율)
+
     def __init__(
         self,
         rate_limit: int = USER_RATE_LIMIT,
         daily_limit: Optional[int] = None,
         is_workspace: bool = True,
+        burst: Optional[int] = None,
+        state_dir: Optional[Path] = None,
+        lease: Optional[int] = None,
+        bulk_share: float = BULK_MIN_SHARE,
     ):
         """
         Args:
             rate_limit: 초당 최대 할당량 (기본값: 250)
             daily_limit: 일일 최대 할당량 (None이면 자동 설정)
             is_workspace: Workspace 계정 여부
+            burst: 한 번에 사용할 수 있는 최대 단위 (버킷 크기, 기본값: DEFAULT_BURST와
+                rate_limit 중 작은 값)
+            state_dir: 프로세스 간 공유 상태 디렉토리 (None이면 프로세스 내에서만 관리)
+            lease: 공유 모드에서 한 번에 추가로 빌리는 단위 (기본값: rate_limit의 10%)
+            bulk_share: bulk 요청에 보장하는 최소 몫 (rate 대비 비율, 0이면 보장 없음)
         """
         self.rate_limit = rate_limit
+        self.burst = burst or min(self.DEFAULT_BURST, rate_limit)
         self.daily_limit = (
             daily_limit
             or (self.DAILY_LIMIT if is_workspace else self.CONSUMER_DAILY_LIMIT)
         )
+        self.lease = lease if lease is not None else max(1, rate_limit // 10)
+        self.bulk_share = bulk_share
         self._usage: dict[str, QuotaUsage] = {}
         self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+        self._store: Optional[SharedQuotaStore] = None
+        if state_dir is not None:
+            self._store = SharedQuotaStore(Path(state_dir), bulk_share=bulk_share)
+            self._store.prune()
+            # 종료 시 빌린 토큰 반납 및 일일 사용량 반영
+            atexit.register(self.close)
+
+    @property
+    def is_shared(self) -> bool:
+        """프로세스 간 공유 모드 여부."""
+        return self._store is not None
 
     def can_execute(self, user: str, units: int) -> bool:
         """API 호출 가능 여부 확인.
@@ -134,56 +268,270 @@ class QuotaManager:
             실행 가능하면 True
         """
         with self._lock:
-            self._reset_if_needed(user)
-            usage = self._get_or_create_usage(user)
-            return usage.units_used + units <= self.rate_limit
+            usage = self._refill(user)
+            if self._store is not None:
+                shared = self._store.get(user, self.rate_limit, self.burst)
+                return usage.tokens + shared["tokens"] >= units
+            return usage.tokens >= units
 
-    def record_usage(self, user: str, units: int) -> None:
+    def record_usage(
+        self,
+        user: str,
+        units: int,
+        method: str = "other",
+        calls: int = 1,
+        succeeded: bool = True,
+    ) -> None:
         """사용량 기록.
 
+        wait_for_quota로 예약한 단위는 이미 토큰에서 차감되었으므로
+        예약을 초과하는 부분만 추가로 차감합니다.
+
+        실패한 호출도 할당량은 쓰므로 succeeded=False로 기록합니다. 이때는
+        단위만 차감하고 학습된 rate는 늘리지 않습니다 (AIMD 성공으로 보지 않음).
+
         Args:
             user: 사용자 식별자
             units: 사용한 할당량 단위
+            method: API 메서드 이름 (예: "messages.get") - 일일 사용 기록용
+            calls: 호출 수 (배치 요청은 하위 요청 수)
+            succeeded: 호출 성공 여부 (False면 rate를 회복하지 않음)
         """
         with self._lock:
-            self._reset_if_needed(user)
-            usage = self._get_or_create_usage(user)
-            usage.units_used += units
+            usage = self._refill(user)
+            covered = min(usage.reserved, units)
+            usage.reserved -= covered
+            usage.tokens -= units - covered
             usage.daily_units += units
+            _add_to_ledger(usage.ledger, method, units, calls)
+            if self._store is not None:
+                _add_to_ledger(usage.pending, method, units, calls)
+
+            if succeeded:
+                # 성공한 호출: 학습된 rate를 조금씩 회복
+                self._adjust_rate(user, usage, increase=True)
+
+    def release(self, user: str, units: int) -> None:
+        """wait_for_quota로 예약했지만 보내지 않은 요청의 단위 반납.
+
+        회로 차단기가 열려 있는 등 호출하지 않고 포기한 경우 record_usage 대신 호출합니다.
+
+        Args:
+            user: 사용자 식별자
+            units: 반납할 할당량 단위
+        """
+        with self._condition:
+            usage = self._refill(user)
+            returned = min(usage.reserved, units)
+            usage.reserved -= returned
+            usage.tokens += returned
+            if self._store is None:
+                usage.tokens = min(self.burst * usage.rate / self.rate_limit, usage.tokens)
+            self._condition.notify_all()
+
+    def report_rate_limited(self, user: str, retry_after: Optional[float] = None) -> float:
+        """속도 제한 응답(429, rateLimitExceeded 등)을 받았음을 알림.
+
+        학습된 초당 한도를 곱셈 감소시킵니다. 같은 폭주에서 여러 번
+        보고되어도 AIMD_INTERVAL 안에서는 한 번만 줄어듭니다 (간격은 이전
+        감소 기준이므로 직전에 성공한 호출이 있어도 감소함).
+
+        서버가 재시도 시각을 알려줬으면 그때까지 이 계정의 모든 wait_for_quota가
+        대기합니다 (공유 모드에서는 다른 프로세스 포함).
+
+        Args:
+            user: 사용자 식별자
+            retry_after: 서버가 알려준 재시도까지의 시간 (초, retry_handler.get_retry_after)
+
+        Returns:
+            조정 후 초당 한도
+        """
+        with self._lock:
+            usage = self._refill(user)
+            self._adjust_rate(user, usage, increase=False)
+            if retry_after:
+                usage.paused_until = max(usage.paused_until, time.monotonic() + retry_after)
+                if self._store is not None:
+                    self._store.pause(user, retry_after, self.rate_limit, self.burst)
+                logger.info(f"Quota paused for {user}: {retry_after:.1f}s (server hint)")
+            return usage.rate
+
+    def get_rate(self, user: str) -> float:
+        """현재 학습된 초당 한도.
+
+        Args:
+            user: 사용자 식별자
+
+        Returns:
+            초당 단위
+        """
+        with self._lock:
+            usage = self._refill(user)
+            if self._store is not None:
+                usage.rate = self._store.get(user, self.rate_limit, self.burst)["rate"]
+            return usage.rate
+
+    def get_pause(self, user: str) -> float:
+        """서버가 알려준 재시도 시각(Retry-After)까지 남은 시간.
+
+        Args:
+            user: 사용자 식별자
+
+        Returns:
+            일시 중지가 끝날 때까지 남은 시간 (초, 중지 중이 아니면 0)
+        """
+        with self._lock:
+            usage = self._refill(user)
+            paused = max(0.0, usage.paused_until - time.monotonic())
+            if self._store is not None:
+                shared = self._store.get(user, self.rate_limit, self.burst)
+                paused = max(paused, shared["paused_for"])
+            return paused
 
     def wait_for_quota(
         self,
         user: str,
         units: int,
         timeout: float = 30.0,
+        priority: QuotaPriority = QuotaPriority.INTERACTIVE,
     ) -> bool:
         """할당량 확보까지 대기.
 
+        필요한 토큰을 예약한 뒤 토큰이 채워지는 시각까지 대기합니다.
+        대기 시간이 timeout을 넘을 것이 확실하면 예약하지 않고 즉시 실패합니다.
+
+        BULK 요청은 토큰(또는 최소 몫 크레딧)이 생길 때까지 예약 없이 기다렸다가
+        진행하므로, 그 사이에 들어온 INTERACTIVE 요청이 먼저 처리됩니다.
+
+        현재 deadline(core.deadline)이 있으면 timeout은 남은 시간으로 제한됩니다.
+
         Args:
             user: 사용자 식별자
             units: 필요한 할당량 단위
             timeout: 최대 대기 시간 (초)
+            priority: 요청 우선순위
 
         Returns:
             할당량 확보 성공 여부
 
         Raises:
-            TimeoutError: 타임아웃 시
+            TimeoutError: 타임아웃 시 (또는 units가 버킷 크기를 넘는 경우)
+            DeadlineExceeded: deadline 안에 할당량을 확보할 수 없는 경우
         """
-        start = time.time()
+        limit = clamp(timeout, "quota wait")
+        with self._condition:
+            self._check_burst(user, units)
+
+            bulk = priority == QuotaPriority.BULK
+            deadline = time.monotonic() + limit
+            while True:
+                result = self._try_acquire(user, units, deadline - time.monotonic(), bulk)
+                if result is None:
+                    raise self._wait_error(user, units, timeout, limit)
+                admitted, wait = result
+                if admitted:
+                    break
+                # 일시 중지가 끝나거나 (bulk) 토큰이 다시 생길 시각에 재시도
+                self._condition.wait(wait)
+
+            usage = self._usage[user]
+            deadline = time.monotonic() + wait
+            while True:
+                remaining = deadline - time.monotonic()
+                # reset_user로 버킷이 교체되면 예약도 사라지므로 대기 중단
+                if remaining <= 0 or self._usage.get(user) is not usage:
+                    break
+                self._condition.wait(remaining)
 
-        while not self.can_execute(user, units):
-            if time.time() - start > timeout:
-                raise TimeoutError(
-                    f"할당량 확보 타임아웃 ({timeout}초). "
-                    f"사용자: {user}, 필요 단위: {units}"
-                )
-            time.sleep(0.1)
-            with self._lock:
-                self._reset_if_needed(user)
+        return True
 
+    async def wait_for_quota_async(
+        self,
+        user: str,
+        units: int,
+        timeout: float = 30.0,
+        priority: QuotaPriority = QuotaPriority.INTERACTIVE,
+    ) -> bool:
+        """wait_for_quota의 asyncio 버전.
+
+        예약 규칙은 같고, 대기만 asyncio.sleep으로 하여 이벤트 루프를 막지
+        않습니다. 같은 QuotaManager를 쓰는 스레드/프로세스와 버킷을 공유합니다.
+        공유 모드의 예약(SQLite 트랜잭션)은 스레드에서 실행합니다.
+
+        Args:
+            user: 사용자 식별자
+            units: 필요한 할당량 단위
+            timeout: 최대 대기 시간 (초)
+            priority: 요청 우선순위
+
+        Returns:
+            할당량 확보 성공 여부
+
+        Raises:
+            TimeoutError: 타임아웃 시 (또는 units가 버킷 크기를 넘는 경우)
+            DeadlineExceeded: deadline 안에 할당량을 확보할 수 없는 경우
+        """
+        limit = clamp(timeout, "quota wait")
+        self._check_burst(user, units)
+
+        bulk = priority == QuotaPriority.BULK
+        deadline = time.monotonic() + limit
+        while True:
+            result = await self._try_acquire_async(
+                user, units, deadline - time.monotonic(), bulk
+            )
+            if result is None:
+                raise self._wait_error(user, units, timeout, limit)
+            admitted, wait = result
+            if admitted:
+                break
+            await asyncio.sleep(wait)
+
+        # 예약한 토큰이 채워질 때까지 대기
+        await asyncio.sleep(wait)
         return True
 
+    async def _try_acquire_async(
+        self,
+        user: str,
+        units: int,
+        max_wait: float,
+        bulk: bool = False,
+    ) -> Optional[tuple[bool, float]]:
+        """이벤트 루프를 막지 않는 _try_acquire.
+
+        공유 모드는 SQLite 트랜잭션이라 다른 프로세스와 경합하면 busy_timeout까지
+        기다릴 수 있으므로 스레드에서 실행합니다. 메모리 모드는 잠금 안에서
+        계산만 하므로 바로 실행합니다.
+        """
+
+        def acquire() -> Optional[tuple[bool, float]]:
+            with self._condition:
+                return self._try_acquire(user, units, max_wait, bulk)
+
+        if self._store is None:
+            return acquire()
+        return await asyncio.to_thread(acquire)
+
+    def _check_burst(self, user: str, units: int) -> None:
+        """버킷 크기를 넘는 요청은 기다려도 처리할 수 없으므로 즉시 실패."""
+        if units > self.burst:
+            raise TimeoutError(
+                f"요청 단위({units})가 최대 버스트({self.burst})를 초과합니다. "
+                f"사용자: {user}"
+            )
+
+    def _wait_error(self, user: str, units: int, timeout: float, limit: float) -> TimeoutError:
+        """할당량 대기 실패 예외 (deadline 때문에 줄어든 대기면 DeadlineExceeded)."""
+        if limit < timeout:
+            return DeadlineExceeded(
+                f"할당량 확보 전 deadline 초과. 사용자: {user}, 필요 단위: {units}"
+            )
+        return TimeoutError(
+            f"할당량 확보 타임아웃 ({timeout}초). "
+            f"사용자: {user}, 필요 단위: {units}"
+        )
+
     def get_usage(self, user: str) -> dict:
         """사용자 할당량 현황 조회.
 
@@ -194,20 +542,98 @@ class QuotaManager:
             현재 사용량 정보
         """
         with self._lock:
-            self._reset_if_needed(user)
-            usage = self._get_or_create_usage(user)
+            usage = self._refill(user)
+            available = max(0, int(usage.tokens))
+            if self._store is not None:
+                self._flush(user, usage)
+                shared = self._store.get(user, self.rate_limit, self.burst)
+                available = max(0, int(shared["tokens"] + max(0.0, usage.tokens)))
+                usage.daily_units = shared["daily_units"]
+                usage.rate = shared["rate"]
             return {
                 "user": user,
-                "units_used": usage.units_used,
+                "units_used": self.burst - available,
                 "rate_limit": self.rate_limit,
-                "rate_available": self.rate_limit - usage.units_used,
+                "learned_rate": round(usage.rate, 1),
+                "rate_available": available,
+                "burst": self.burst,
+                "shared": self._store is not None,
                 "daily_units": usage.daily_units,
                 "daily_limit": self.daily_limit,
                 "daily_available": self.daily_limit - usage.daily_units,
+                "daily_resets_at": next_quota_reset().isoformat(),
+            }
+
+    def get_ledger(self, user: str, day: Optional[str] = None) -> dict[str, dict]:
+        """메서드별 일일 사용 기록.
+
+        Args:
+            user: 사용자 식별자
+            day: 일자 (YYYY-MM-DD, 태평양 시간 기준, 기본값: 오늘)
+                 공유 모드가 아니면 오늘 기록만 있음
+
+        Returns:
+            {메서드: {"units": 단위, "calls": 호출 수}}
+        """
+        with self._lock:
+            usage = self._refill(user)
+            if self._store is not None:
+                self._flush(user, usage)
+                return self._store.get_ledger(user, day)
+
+            if day not in (None, usage.daily_day):
+                return {}
+            return {
+                method: {"units": units, "calls": calls}
+                for method, (units, calls) in sorted(
+                    usage.ledger.items(), key=lambda item: -item[1][0]
+                )
             }
 
+    def forecast(self, user: str, units: int) -> QuotaForecast:
+        """계획한 작업이 남은 일일 할당량 안에 들어가는지 예측.
+
+        학습된 초당 한도(AIMD, get_rate)로 진행해도 작업이 초기화 시각을
+        넘기면, 초기화 이후 부분은 새 할당량으로 계산합니다.
+
+        Args:
+            user: 사용자 식별자
+            units: 작업에 필요한 전체 단위
+
+        Returns:
+            QuotaForecast
+        """
+        with self._lock:
+            usage = self._refill(user)
+            used = usage.daily_units
+            if self._store is not None:
+                self._flush(user, usage)
+                shared = self._store.get(user, self.rate_limit, self.burst)
+                used = shared["daily_units"]
+                usage.rate = shared["rate"]
+            rate = usage.rate
+
+        now = datetime.now(timezone.utc)
+        resets_at = next_quota_reset(now)
+        remaining = max(0, self.daily_limit - used)
+
+        # 초기화 전에 (학습된 속도로) 쓸 수 있는 단위 + 초기화 이후 새 할당량
+        before_reset = int((resets_at - now).total_seconds() * rate)
+        allowed = min(units, remaining)
+        if units > before_reset and remaining >= before_reset:
+            allowed = min(units, before_reset + self.daily_limit)
+
+        return QuotaForecast(
+            required=units,
+            used=used,
+            remaining=remaining,
+            allowed=allowed,
+            resets_at=resets_at,
+            duration_seconds=units / rate,
+        )
+
     def get_remaining_rate(self, user: str) -> int:
-        """현재 초에 남은 rate limit.
+        """지금 즉시 사용할 수 있는 할당량.
 
         Args:
             user: 사용자 식별자
@@ -216,9 +642,11 @@ class QuotaManager:
             남은 할당량 단위 수
         """
         with self._lock:
-            self._reset_if_needed(user)
-            usage = self._get_or_create_usage(user)
-            return max(0, self.rate_limit - usage.units_used)
+            usage = self._refill(user)
+            if self._store is not None:
+                shared = self._store.get(user, self.rate_limit, self.burst)
+                return max(0, int(shared["tokens"] + max(0.0, usage.tokens)))
+            return max(0, int(usage.tokens))
 
     def is_daily_limit_reached(self, user: str) -> bool:
         """일일 할당량 도달 여부.
@@ -230,7 +658,13 @@ class QuotaManager:
             일일 한도 도달 시 True
         """
         with self._lock:
-            usage = self._get_or_create_usage(user)
+            usage = self._refill(user)
+            if self._store is not None:
+                self._flush(user, usage)
+                return (
+                    self._store.get(user, self.rate_limit, self.burst)["daily_units"]
+                    >= self.daily_limit
+                )
             return usage.daily_units >= self.daily_limit
 
     def reset_user(self, user: str) -> None:
@@ -239,59 +673,257 @@ class QuotaManager:
         Args:
             user: 사용자 식별자
         """
-        with self._lock:
+        with self._condition:
             if user in self._usage:
                 del self._usage[user]
+            if self._store is not None:
+                self._store.reset(user)
+            self._condition.notify_all()
 
-    def _get_or_create_usage(self, user: str) -> QuotaUsage:
-        """사용자 usage 객체 반환 (없으면 생성)."""
-        if user not in self._usage:
-            self._usage[user] = QuotaUsage()
-        return self._usage[user]
+    def close(self) -> None:
+        """공유 모드: 빌린 토큰을 반납하고 일일 사용량 반영 후 연결 정리."""
+        with self._lock:
+            if self._store is None:
+                return
+            try:
+                for user, usage in self._usage.items():
+                    self._flush(user, usage, return_lease=True)
+            finally:
+                self._store.close()
+                self._store = None
+        atexit.unregister(self.close)
+
+    def _try_acquire(
+        self,
+        user: str,
+        units: int,
+        max_wait: float,
+        bulk: bool = False,
+    ) -> Optional[tuple[bool, float]]:
+        """토큰 예약 시도 (잠금 보유 상태에서 호출).
 
-    def _reset_if_needed(self, user: str) -> None:
-        """초당/일일 리셋 확인 및 수행."""
-        if user not in self._usage:
-            return
+        Returns:
+            (예약 여부, 대기 시간) - 예약했으면 토큰이 채워질 때까지 기다려야
+            하는 시간, 일시 중지 중이거나 bulk 요청이 아직 진행할 수 없으면
+            다시 시도할 때까지의 시간.
+            max_wait 안에 가능성이 없으면 None
+        """
+        usage = self._refill(user)
+
+        # 서버가 알려준 재시도 시각까지는 우선순위와 관계없이 대기
+        paused = usage.paused_until - time.monotonic()
+        if paused > 0:
+            return None if paused > max_wait else (False, paused)
+
+        if self._store is not None:
+            return self._try_acquire_shared(user, usage, units, max_wait, bulk)
+
+        capacity = self.burst * usage.rate / self.rate_limit
+        result = admit(
+            usage.tokens,
+            usage.bulk_credit,
+            units,
+            usage.rate,
+            capacity,
+            self.bulk_share,
+            bulk,
+            max_wait,
+        )
+        if result is None:
+            return None
 
-        usage = self._usage[user]
-        now = datetime.now()
+        admitted, wait, usage.tokens, usage.bulk_credit = result
+        if admitted:
+            usage.reserved += units
+        return admitted, wait
 
-        # 초당 리셋
-        if now - usage.last_reset > timedelta(seconds=1):
-            usage.units_used = 0
-            usage.last_reset = now
+    def _try_acquire_shared(
+        self,
+        user: str,
+        usage: QuotaUsage,
+        units: int,
+        max_wait: float,
+        bulk: bool = False,
+    ) -> Optional[tuple[bool, float]]:
+        """공유 모드 예약: 빌린 토큰으로 충분하면 메모리에서, 아니면 공유 버킷에서."""
+        now = time.monotonic()
+        if now < usage.lease_expires and usage.tokens >= units:
+            usage.tokens -= units
+            usage.reserved += units
+            return True, 0.0
+
+        # 만료된 토큰은 반납하고 부족분(+ 여유가 있으면 다음 호출분)을 빌림
+        returned = max(0.0, usage.tokens) if now >= usage.lease_expires else 0.0
+        local = usage.tokens - returned
+        granted = self._store.acquire(
+            user,
+            units - local,
+            self.rate_limit,
+            self.burst,
+            max_wait,
+            extra=self.lease,
+            returned=returned,
+            ledger=usage.pending,
+            bulk=bulk,
+        )
+        if granted is None:
+            return None
+
+        wait, taken, usage.rate = granted
+        if not taken:
+            # 일시 중지 또는 bulk 요청 보류: 공유 버킷에 아무것도 반영되지 않았으므로 상태 유지
+            return False, wait
+
+        usage.tokens = local + taken - units
+        usage.reserved += units
+        usage.pending = {}
+        usage.lease_expires = now + wait + self.LEASE_SECONDS
+        return True, wait
+
+    def _flush(self, user: str, usage: QuotaUsage, return_lease: bool = False) -> None:
+        """공유 모드: 보류 중인 사용 기록(및 빌린 토큰)을 공유 버킷에 반영."""
+        returned = 0.0
+        if return_lease or time.monotonic() >= usage.lease_expires:
+            # 음수(예약 없이 기록된 초과 사용량)는 공유 버킷에서 차감
+            returned = usage.tokens
+            usage.tokens = 0.0
+
+        self._store.release(
+            user,
+            returned,
+            self.rate_limit,
+            self.burst,
+            ledger=usage.pending,
+        )
+        usage.pending = {}
+
+    def _adjust_rate(self, user: str, usage: QuotaUsage, increase: bool) -> None:
+        """학습된 rate 조정 (락 보유 상태에서 호출).
 
-        # 일일 리셋 (자정 기준)
-        if now.date() > usage.daily_reset.date():
+        감소는 이전 감소와만 AIMD_INTERVAL 간격을 두므로(같은 폭주의 429는 한 번만
+        반영) 직전의 성공 기록이 감소를 막지 않습니다. 증가는 마지막 조정(감소
+        포함) 후 AIMD_INTERVAL이 지나야 합니다.
+        """
+        now = time.monotonic()
+        if increase:
+            if now - usage.rate_changed < self.AIMD_INTERVAL or usage.rate >= self.rate_limit:
+                return
+        elif now - usage.rate_decreased < self.AIMD_INTERVAL:
+            return
+
+        factor = 1.0 if increase else self.AIMD_DECREASE
+        step = self.rate_limit * self.AIMD_INCREASE if increase else 0.0
+        min_rate = self.rate_limit * self.AIMD_MIN_FRACTION
+        previous = usage.rate
+        usage.rate_changed = now
+        if not increase:
+            usage.rate_decreased = now
+
+        if self._store is not None:
+            usage.rate = self._store.adjust_rate(
+                user,
+                self.rate_limit,
+                self.burst,
+                factor=factor,
+                step=step,
+                min_rate=min_rate,
+                interval=self.AIMD_INTERVAL,
+            )
+            if not increase:
+                # 빌린 토큰도 더 이상 쓰지 않음
+                usage.tokens = min(usage.tokens, 0.0)
+        else:
+            usage.rate = min(float(self.rate_limit), max(min_rate, usage.rate * factor + step))
+            if not increase:
+                usage.tokens = min(usage.tokens, 0.0)
+
+        if usage.rate != previous:
+            logger.info(
+                f"Quota rate for {user}: {previous:.1f} -> {usage.rate:.1f} units/s"
+            )
+
+    def _refill(self, user: str) -> QuotaUsage:
+        """경과 시간만큼 토큰을 채우고 usage 반환 (없으면 가득 찬 버킷 생성).
+
+        공유 모드에서는 로컬 토큰이 빌린 토큰이므로 채우지 않습니다.
+        """
+        now = time.monotonic()
+        usage = self._usage.get(user)
+        if usage is None:
+            tokens = 0.0 if self._store is not None else float(self.burst)
+            usage = self._usage[user] = QuotaUsage(
+                tokens=tokens,
+                last_refill=now,
+                rate=float(self.rate_limit),
+                bulk_credit=self.burst * self.bulk_share,
+            )
+        elif self._store is None:
+            # 학습된 rate가 낮으면 버킷 크기도 같은 비율로 줄임
+            capacity = self.burst * usage.rate / self.rate_limit
+            elapsed = now - usage.last_refill
+            usage.tokens = min(capacity, usage.tokens + elapsed * usage.rate)
+            usage.bulk_credit = min(
+                capacity * self.bulk_share,
+                usage.bulk_credit + elapsed * usage.rate * self.bulk_share,
+            )
+            usage.last_refill = now
+
+        # 일일 리셋 (태평양 시간 자정 기준)
+        today = quota_day()
+        if usage.daily_day != today:
             usage.daily_units = 0
-            usage.daily_reset = now
+            usage.daily_day = today
+            usage.ledger = {}
+
+        return usage
+
+
+def _add_to_ledger(ledger: dict[str, list[int]], method: str, units: int, calls: int) -> None:
+    """사용 기록에 호출 추가."""
+    entry = ledger.setdefault(method, [0, 0])
+    entry[0] += units
+    entry[1] += calls
 
 
 # 싱글톤 인스턴스
 _default_manager: Optional[QuotaManager] = None
+_shared_managers: dict[Path, QuotaManager] = {}
+_managers_lock = threading.Lock()
 
 
 def get_quota_manager(
     rate_limit: int = QuotaManager.USER_RATE_LIMIT,
     is_workspace: bool = True,
+    state_dir: Optional[Path] = None,
 ) -> QuotaManager:
     """기본 QuotaManager 인스턴스 반환.
 
     Args:
         rate_limit: 초당 최대 할당량
         is_workspace: Workspace 계정 여부
+        state_dir: 프로세스 간 공유 상태 디렉토리 (지정 시 디렉토리별 인스턴스)
 
     Returns:
         QuotaManager 싱글톤 인스턴스
     """
     global _default_manager
-    if _default_manager is None:
-        _default_manager = QuotaManager(
-            rate_limit=rate_limit,
-            is_workspace=is_workspace,
-        )
-    return _default_manager
+    with _managers_lock:
+        if state_dir is not None:
+            key = Path(state_dir).resolve()
+            if key not in _shared_managers:
+                _shared_managers[key] = QuotaManager(
+                    rate_limit=rate_limit,
+                    is_workspace=is_workspace,
+                    state_dir=key,
+                )
+            return _shared_managers[key]
+
+        if _default_manager is None:
+            _default_manager = QuotaManager(
+                rate_limit=rate_limit,
+                is_workspace=is_workspace,
+            )
+        return _default_manager
 
 
 if __name__ == "__main__":
@@ -302,17 +934,35 @@ if __name__ == "__main__":
     print(f"Initial usage: {manager.get_usage(user)}")
 
     # 사용량 기록
-    manager.record_usage(user, QuotaUnit.MESSAGES_LIST)
+    manager.record_usage(user, QuotaUnit.MESSAGES_LIST, "messages.list")
     print(f"After list: {manager.get_usage(user)}")
 
-    manager.record_usage(user, QuotaUnit.MESSAGES_GET)
+    manager.record_usage(user, QuotaUnit.MESSAGES_GET, "messages.get")
     print(f"After get: {manager.get_usage(user)}")
 
     # 실행 가능 여부
-    print(f"Can execute 250? {manager.can_execute(user, 250)}")
+    print(f"Can execute {manager.burst}? {manager.can_execute(user, manager.burst)}")
     print(f"Remaining rate: {manager.get_remaining_rate(user)}")
 
-    # 대기 테스트
+    # 대기 테스트 (부족한 토큰이 채워지는 시간만큼만 대기)
     print("Waiting for quota...")
-    time.sleep(1.1)  # 1초 후 리셋됨
-    print(f"After 1s: {manager.get_usage(user)}")
+    start = time.monotonic()
+    manager.wait_for_quota(user, manager.burst)
+    manager.record_usage(user, manager.burst, "messages.get")
+    print(f"Waited {time.monotonic() - start:.3f}s: {manager.get_usage(user)}")
+
+    # AIMD: 성공 직후의 429도 rate를 낮춰야 함 (메모리/공유 모드)
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        for label, aimd in (("memory", QuotaManager()), ("shared", QuotaManager(state_dir=Path(state_dir)))):
+            aimd.report_rate_limited(user)
+            time.sleep(QuotaManager.AIMD_INTERVAL)
+            aimd.record_usage(user, QuotaUnit.MESSAGES_GET, "messages.get")
+            before = aimd.get_rate(user)
+            after = aimd.report_rate_limited(user)
+            assert after < before, f"{label}: 429 after success ignored ({before} -> {after})"
+            aimd.record_usage(user, QuotaUnit.MESSAGES_GET, "messages.get")
+            assert aimd.get_rate(user) == after, f"{label}: increase right after decrease"
+            print(f"AIMD ({label}): {before:.1f} -> {after:.1f} on 429 right after success")
+            aimd.close()
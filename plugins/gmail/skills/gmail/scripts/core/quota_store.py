@@ -0,0 +1,536 @@
+"""Shared Quota Store.
+
+같은 계정을 사용하는 여러 프로세스(동시에 실행된 CLI 등)가 공유하는
+계정별 토큰 버킷.
+
+상태 디렉토리의 SQLite 파일(quota.sqlite3)에 계정별 (토큰, 갱신 시각,
+일일 사용량)과 일자/메서드별 사용 기록(ledger)을 저장하고, 모든 변경은
+BEGIN IMMEDIATE 트랜잭션 한 번으로 처리합니다. 프로세스마다 시계 기준이
+다르므로 시각은 time.time()을 씁니다.
+
+일일 할당량은 태평양 시간 자정에 초기화되므로 일자도 같은 기준을 씁니다.
+
+학습된 초당 한도(AIMD)도 계정별로 함께 저장하므로, 한 프로세스가 받은
+429가 모든 프로세스의 속도를 낮춥니다. rate가 NULL이면 설정된 한도를 씁니다.
+
+우선순위 (admit 참고):
+- interactive: 토큰을 미리 예약하고(음수 허용) 채워질 때까지 대기
+- bulk: 토큰이 실제로 있을 때만 진행하므로 interactive 요청 뒤에 줄을 서지
+  않게 함. 대신 최소 몫(bulk_share)만큼 채워지는 별도 크레딧으로는 예약할 수
+  있어 interactive 요청이 계속 들어와도 bulk 작업이 멈추지 않음
+
+서버가 재시도 시각을 알려주면(Retry-After) paused_until까지 모든 프로세스의
+요청을 멈춥니다 (pause).
+
+QuotaManager는 이 저장소에서 토큰을 조금씩 미리 빌려(lease) 프로세스
+메모리에서 소비하므로, 단일 프로세스에서는 대부분의 호출이 DB를
+거치지 않습니다.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except (ImportError, KeyError):
+    # tzdata가 없는 환경: PST 고정 오프셋
+    _QUOTA_TZ = timezone(timedelta(hours=-8))
+
+
+class SharedQuotaStore:
+    """프로세스 간 공유 토큰 버킷 저장소.
+
+    Usage:
+        store = SharedQuotaStore(Path(".cache/gmail"))
+
+        # 5단위 확보 (최대 1초 대기 허용), 여유가 있으면 20단위 추가 대여
+        granted = store.acquire("work", 5, rate_limit=250, burst=250,
+                                max_wait=1.0, extra=20)
+        if granted is not None:
+            wait, units, rate = granted
+
+        # 메서드별 사용 기록 반영 및 조회
+        store.release("work", 0, 250, 250, ledger={"messages.get": [5, 1]})
+        store.get_ledger("work")
+    """
+
+    DB_FILENAME = "quota.sqlite3"
+
+    def __init__(self, state_dir: Path, busy_timeout: float = 30.0, bulk_share: float = 0.0):
+        """
+        Args:
+            state_dir: 상태 디렉토리 (DB 파일이 생성될 위치)
+            busy_timeout: 다른 연결이 잠금을 보유한 경우 최대 대기 시간 (초)
+            bulk_share: bulk 요청에 보장하는 최소 몫 (rate 대비 비율)
+        """
+        self.bulk_share = bulk_share
+        self.db_path = Path(state_dir) / self.DB_FILENAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_buckets (
+                    user TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    daily_units INTEGER NOT NULL DEFAULT 0,
+                    daily_date TEXT NOT NULL,
+                    rate REAL,
+                    rate_changed_at REAL,
+                    rate_decreased_at REAL,
+                    bulk_credit REAL,
+                    paused_until REAL
+                ) WITHOUT ROWID
+                """
+            )
+            # 학습된 rate 열이 없는 이전 DB 갱신
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(quota_buckets)")
+            }
+            if "rate" not in columns:
+                self._conn.execute("ALTER TABLE quota_buckets ADD COLUMN rate REAL")
+                self._conn.execute("ALTER TABLE quota_buckets ADD COLUMN rate_changed_at REAL")
+            if "bulk_credit" not in columns:
+                self._conn.execute("ALTER TABLE quota_buckets ADD COLUMN bulk_credit REAL")
+            if "paused_until" not in columns:
+                self._conn.execute("ALTER TABLE quota_buckets ADD COLUMN paused_until REAL")
+            if "rate_decreased_at" not in columns:
+                self._conn.execute("ALTER TABLE quota_buckets ADD COLUMN rate_decreased_at REAL")
+
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_ledger (
+                    user TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    units INTEGER NOT NULL,
+                    calls INTEGER NOT NULL,
+                    PRIMARY KEY (user, day, method)
+                ) WITHOUT ROWID
+                """
+            )
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def acquire(
+        self,
+        user: str,
+        units: float,
+        rate_limit: float,
+        burst: float,
+        max_wait: float,
+        extra: int = 0,
+        returned: float = 0.0,
+        ledger: Optional[dict[str, list[int]]] = None,
+        bulk: bool = False,
+    ) -> Optional[tuple[float, float, float]]:
+        """토큰 예약 (트랜잭션 1회).
+
+        Args:
+            user: 사용자 식별자
+            units: 필요한 단위
+            rate_limit: 초당 최대 한도 (학습된 rate가 없을 때 채워지는 속도)
+            burst: 버킷 크기 (학습된 rate가 낮으면 같은 비율로 줄어듦)
+            max_wait: 허용 가능한 최대 대기 시간 (초)
+            extra: 지금 바로 여유가 있을 때 추가로 빌릴 단위
+            returned: 사용하지 않아 반납하는 단위
+            ledger: 함께 반영할 사용 기록 ({메서드: [단위, 호출 수]})
+            bulk: bulk 우선순위 요청 여부
+
+        Returns:
+            (대기 시간(초), 받은 단위, 학습된 rate) - max_wait보다 오래
+            기다려야 하면 None. 일시 중지 중이거나 bulk 요청이 지금 진행할 수
+            없으면 받은 단위가 0이고 대기 시간은 다시 시도할 시각
+            (두 경우 모두 아무것도 반영하지 않음)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, daily, rate, credit = self._load(user, rate_limit, burst)
+                paused = self._pause_remaining(user)
+                if paused > 0:
+                    self._conn.execute("ROLLBACK")
+                    return None if paused > max_wait else (paused, 0.0, rate)
+
+                capacity = burst * rate / rate_limit
+                tokens = min(capacity, tokens + returned)
+
+                admitted = admit(
+                    tokens, credit, units, rate, capacity, self.bulk_share, bulk, max_wait
+                )
+                if admitted is None or not admitted[0]:
+                    self._conn.execute("ROLLBACK")
+                    return None if admitted is None else (admitted[1], 0.0, rate)
+
+                _, wait, tokens, credit = admitted
+                bonus = min(float(extra), max(0.0, tokens))
+                granted = units + bonus
+                self._save(
+                    user, tokens - bonus, daily + self._record(user, ledger), credit
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return wait, granted, rate
+
+    def release(
+        self,
+        user: str,
+        units: float,
+        rate_limit: float,
+        burst: float,
+        ledger: Optional[dict[str, list[int]]] = None,
+    ) -> None:
+        """빌린 토큰 반납 및 사용 기록 반영.
+
+        Args:
+            user: 사용자 식별자
+            units: 반납할 단위 (음수면 추가 차감)
+            rate_limit: 초당 최대 한도
+            burst: 버킷 크기
+            ledger: 반영할 사용 기록 ({메서드: [단위, 호출 수]})
+        """
+        if not units and not ledger:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, daily, rate, credit = self._load(user, rate_limit, burst)
+                self._save(
+                    user,
+                    min(burst * rate / rate_limit, tokens + units),
+                    daily + self._record(user, ledger),
+                    credit,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def adjust_rate(
+        self,
+        user: str,
+        rate_limit: float,
+        burst: float,
+        factor: float = 1.0,
+        step: float = 0.0,
+        min_rate: float = 1.0,
+        interval: float = 1.0,
+    ) -> float:
+        """학습된 초당 한도 조정 (AIMD).
+
+        감소는 마지막 감소 후 interval이 지나지 않았으면 바꾸지 않으므로, 여러
+        프로세스가 같은 429 폭주를 동시에 보고해도 한 번만 줄어듭니다. 증가는
+        마지막 조정(감소 포함) 후 interval이 지나야 하며, 감소를 막지 않습니다.
+
+        Args:
+            user: 사용자 식별자
+            rate_limit: 초당 최대 한도 (상한)
+            burst: 버킷 크기
+            factor: 곱할 값 (감소 시 < 1)
+            step: 더할 값 (증가 시 > 0)
+            min_rate: 하한
+            interval: 감소 사이, 마지막 조정 후 증가까지의 최소 간격 (초)
+
+        Returns:
+            조정 후 rate
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, daily, rate, credit = self._load(user, rate_limit, burst)
+                row = self._conn.execute(
+                    "SELECT rate_changed_at, rate_decreased_at FROM quota_buckets "
+                    "WHERE user = ?",
+                    (user,),
+                ).fetchone()
+                decrease = factor < 1.0
+                # 감소는 이전 감소와만, 증가는 마지막 조정과 간격 비교
+                last = row[1 if decrease else 0] if row else None
+
+                now = time.time()
+                new_rate = min(float(rate_limit), max(float(min_rate), rate * factor + step))
+                if now - (last or 0.0) < interval or new_rate == rate:
+                    self._conn.execute("ROLLBACK")
+                    return rate
+
+                if decrease:
+                    # 감소 시 쌓인 토큰도 버려 대기 중인 요청이 바로 느려지도록
+                    tokens = min(tokens, 0.0)
+                self._save(
+                    user,
+                    tokens,
+                    daily,
+                    credit,
+                    rate=new_rate,
+                    rate_changed_at=now,
+                    rate_decreased_at=now if decrease else None,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return new_rate
+
+    def pause(self, user: str, seconds: float, rate_limit: float, burst: float) -> None:
+        """서버가 알려준 재시도 시각까지 모든 프로세스의 요청 중지.
+
+        이미 더 늦은 시각까지 중지되어 있으면 그대로 둡니다.
+
+        Args:
+            user: 사용자 식별자
+            seconds: 중지할 시간 (초)
+            rate_limit: 초당 최대 한도
+            burst: 버킷 크기
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, daily, rate, credit = self._load(user, rate_limit, burst)
+                self._save(user, tokens, daily, credit)
+                self._conn.execute(
+                    "UPDATE quota_buckets "
+                    "SET paused_until = MAX(COALESCE(paused_until, 0), ?) WHERE user = ?",
+                    (time.time() + seconds, user),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reset(self, user: str) -> None:
+        """사용자 버킷과 오늘 사용 기록 삭제."""
+        with self._lock:
+            self._conn.execute("DELETE FROM quota_buckets WHERE user = ?", (user,))
+            self._conn.execute(
+                "DELETE FROM quota_ledger WHERE user = ? AND day = ?",
+                (user, quota_day()),
+            )
+
+    def prune(self, keep_days: int = 30) -> None:
+        """오래된 사용 기록 삭제.
+
+        Args:
+            keep_days: 보관할 일수
+        """
+        cutoff = (date.fromisoformat(quota_day()) - timedelta(days=keep_days)).isoformat()
+        with self._lock:
+            self._conn.execute("DELETE FROM quota_ledger WHERE day < ?", (cutoff,))
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def get(self, user: str, rate_limit: float, burst: float) -> dict:
+        """현재 버킷 상태 조회 (채움 반영, 저장하지 않음).
+
+        Returns:
+            {"tokens": 현재 토큰, "daily_units": 오늘 사용량, "rate": 학습된 rate,
+             "bulk_credit": bulk 크레딧, "paused_for": 일시 중지가 끝날 때까지 남은 시간(초)}
+        """
+        with self._lock:
+            tokens, daily, rate, credit = self._load(user, rate_limit, burst)
+            paused = self._pause_remaining(user)
+        return {
+            "tokens": tokens,
+            "daily_units": daily,
+            "rate": rate,
+            "bulk_credit": credit,
+            "paused_for": paused,
+        }
+
+    def get_ledger(self, user: str, day: Optional[str] = None) -> dict[str, dict]:
+        """일자의 메서드별 사용 기록.
+
+        Args:
+            user: 사용자 식별자
+            day: 일자 (YYYY-MM-DD, 태평양 시간 기준, 기본값: 오늘)
+
+        Returns:
+            {메서드: {"units": 단위, "calls": 호출 수}}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT method, units, calls FROM quota_ledger "
+                "WHERE user = ? AND day = ? ORDER BY units DESC",
+                (user, day or quota_day()),
+            ).fetchall()
+        return {method: {"units": units, "calls": calls} for method, units, calls in rows}
+
+    def close(self) -> None:
+        """연결 정리."""
+        with self._lock:
+            self._conn.close()
+
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
+
+    def _load(
+        self,
+        user: str,
+        rate_limit: float,
+        burst: float,
+    ) -> tuple[float, int, float, float]:
+        """토큰, 오늘 사용량, 학습된 rate, bulk 크레딧 조회 (채움 반영, 락 보유 상태에서 호출)."""
+        row = self._conn.execute(
+            "SELECT tokens, updated_at, daily_units, daily_date, rate, bulk_credit "
+            "FROM quota_buckets WHERE user = ?",
+            (user,),
+        ).fetchone()
+        if row is None:
+            return float(burst), 0, float(rate_limit), float(burst) * self.bulk_share
+
+        tokens, updated_at, daily, daily_date, rate, credit = row
+        rate = min(float(rate_limit), rate) if rate is not None else float(rate_limit)
+        capacity = burst * rate / rate_limit
+        # 시계가 뒤로 가도 토큰이 줄지 않도록 경과 시간은 0 이상
+        elapsed = max(0.0, time.time() - updated_at)
+        tokens = min(capacity, tokens + elapsed * rate)
+        credit = capacity * self.bulk_share if credit is None else credit
+        credit = min(capacity * self.bulk_share, credit + elapsed * rate * self.bulk_share)
+        return tokens, (daily if daily_date == quota_day() else 0), rate, credit
+
+    def _record(self, user: str, ledger: Optional[dict[str, list[int]]]) -> int:
+        """트랜잭션 안에서 사용 기록 반영 후 합계 단위 반환."""
+        if not ledger:
+            return 0
+
+        day = quota_day()
+        self._conn.executemany(
+            "INSERT INTO quota_ledger (user, day, method, units, calls) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (user, day, method) DO UPDATE SET "
+            "units = units + excluded.units, calls = calls + excluded.calls",
+            [(user, day, method, units, calls) for method, (units, calls) in ledger.items()],
+        )
+        return sum(units for units, _ in ledger.values())
+
+    def _pause_remaining(self, user: str) -> float:
+        """일시 중지가 끝날 때까지 남은 시간 (초, 락 보유 상태에서 호출)."""
+        row = self._conn.execute(
+            "SELECT paused_until FROM quota_buckets WHERE user = ?", (user,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return 0.0
+        return max(0.0, row[0] - time.time())
+
+    def _save(
+        self,
+        user: str,
+        tokens: float,
+        daily_units: int,
+        bulk_credit: float,
+        rate: Optional[float] = None,
+        rate_changed_at: Optional[float] = None,
+        rate_decreased_at: Optional[float] = None,
+    ) -> None:
+        """버킷 저장 (rate와 조정 시각을 지정하지 않으면 기존 값 유지)."""
+        self._conn.execute(
+            "INSERT INTO quota_buckets "
+            "(user, tokens, updated_at, daily_units, daily_date, bulk_credit, "
+            "rate, rate_changed_at, rate_decreased_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user) DO UPDATE SET "
+            "tokens = excluded.tokens, updated_at = excluded.updated_at, "
+            "daily_units = excluded.daily_units, daily_date = excluded.daily_date, "
+            "bulk_credit = excluded.bulk_credit, "
+            "rate = COALESCE(excluded.rate, rate), "
+            "rate_changed_at = COALESCE(excluded.rate_changed_at, rate_changed_at), "
+            "rate_decreased_at = COALESCE(excluded.rate_decreased_at, rate_decreased_at)",
+            (
+                user,
+                tokens,
+                time.time(),
+                daily_units,
+                quota_day(),
+                bulk_credit,
+                rate,
+                rate_changed_at,
+                rate_decreased_at,
+            ),
+        )
+
+
+def admit(
+    tokens: float,
+    credit: float,
+    units: float,
+    rate: float,
+    capacity: float,
+    bulk_share: float,
+    bulk: bool,
+    max_wait: float,
+) -> Optional[tuple[bool, float, float, float]]:
+    """우선순위를 반영한 토큰 버킷 진입 판정 (메모리/공유 버킷 공통).
+
+    - interactive: 항상 예약 (토큰이 음수가 되면 채워질 때까지 대기)
+    - bulk: 토큰이 충분하면 즉시 진행. 부족하면 최소 몫 크레딧이 있을 때만
+      interactive처럼 예약하고, 둘 다 없으면 진입하지 않음
+
+    Args:
+        tokens: 현재 토큰 (음수면 예약된 요청이 대기 중)
+        credit: bulk 최소 몫 크레딧
+        units: 필요한 단위
+        rate: 초당 채워지는 단위
+        capacity: 버킷 크기
+        bulk_share: bulk 최소 몫 (rate 대비 비율)
+        bulk: bulk 요청 여부
+        max_wait: 허용 가능한 최대 대기 시간 (초)
+
+    Returns:
+        (진입 여부, 대기 시간, 새 토큰, 새 크레딧) - 진입하지 않으면 대기 시간은
+        다시 시도할 시각. max_wait 안에 가능성이 없으면 None
+    """
+    wait = max(0.0, (units - tokens) / rate)
+
+    if bulk and tokens < units:
+        credit_cap = capacity * bulk_share
+        needed = min(units, credit_cap)
+        if credit_cap <= 0 or credit < needed:
+            # 토큰이 채워지거나 크레딧이 쌓일 때 다시 시도
+            if credit_cap > 0:
+                wait = min(wait, (needed - credit) / (rate * bulk_share))
+            return None if wait > max_wait else (False, wait, tokens, credit)
+        credit -= units
+
+    if wait > max_wait:
+        return None
+    return True, wait, tokens - units, credit
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """일일 할당량 기준 일자 (태평양 시간, YYYY-MM-DD)."""
+    return (now or datetime.now(timezone.utc)).astimezone(_QUOTA_TZ).date().isoformat()
+
+
+def next_quota_reset(now: Optional[datetime] = None) -> datetime:
+    """다음 일일 할당량 초기화 시각 (태평양 시간 자정)."""
+    local = (now or datetime.now(timezone.utc)).astimezone(_QUOTA_TZ)
+    midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time())
+    return midnight.replace(tzinfo=_QUOTA_TZ)
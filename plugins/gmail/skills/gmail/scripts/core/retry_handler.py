@@ -9,6 +9,21 @@ Retry-able Errors:
 - 503: Service Unavailable
 - 504: Gateway Timeout
 
+- 403: rateLimitExceeded, userRateLimitExceeded (사유가 속도 제한인 경우만)
+
+서버가 재시도 시각을 알려주면 (Retry-After 헤더, error.details의 RetryInfo,
+"Retry after <시각>" 메시지) 지수 백오프 대신 그 시각에 맞춰 재시도합니다.
+알려준 시각이 max_delay보다 멀면 기다리지 않고 즉시 실패합니다.
+
+계정별 RetryBudget/CircuitBreaker를 넘기면 예산을 넘는 재시도는 하지 않고,
+회로가 열려 있으면 호출하지 않고 CircuitOpenError로 즉시 실패합니다.
+
+deadline 블록(core.deadline) 안에서는 다음 재시도까지의 대기가 남은 시간을
+넘으면 기다리지 않고 마지막 오류로 실패합니다.
+
+코루틴 함수에는 같은 규칙으로 asyncio.sleep을 쓰는 async_exponential_backoff를
+사용합니다.
+
 Non-retry-able Errors:
 - 400: Bad Request
 - 401: Unauthorized
@@ -19,15 +34,23 @@ Reference:
     https://developers.google.com/workspace/gmail/api/guides/handle-errors
 """
 
+import asyncio
+import json
 import logging
 import random
+import re
 import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
-from typing import Callable, Optional, TypeVar, Any
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 from googleapiclient.errors import HttpError
 
+from .circuit_breaker import CircuitBreaker, RetryBudget
+from .deadline import remaining
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -35,6 +58,18 @@ T = TypeVar("T")
 # 재시도 가능한 HTTP 상태 코드
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
+# 속도 제한을 뜻하는 403 오류 사유
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+# 속도를 낮춰야 하는 상태 코드 (429: 속도 제한, 503: 과부하)
+RATE_LIMIT_STATUS_CODES = {429, 503}
+
+# 서버가 알려준 재시도 시각보다 일찍 재시도하지 않도록 더하는 지터 (비율)
+RETRY_AFTER_JITTER = 0.1
+
+# 오류 메시지의 재시도 시각 (예: "User-rate limit exceeded. Retry after 2024-01-01T00:00:00.000Z")
+_RETRY_AFTER_MESSAGE = re.compile(r"Retry after (\d{4}-\d{2}-\d{2}T[\d:.]+Z)")
+
 
 @dataclass
 class RetryConfig:
@@ -53,6 +88,7 @@ def calculate_delay(
     max_delay: float = 60.0,
     exponential_base: float = 2.0,
     jitter: bool = True,
+    retry_after: Optional[float] = None,
 ) -> float:
     """지수 백오프 지연 시간 계산.
 
@@ -62,10 +98,17 @@ def calculate_delay(
         max_delay: 최대 지연 시간 (초)
         exponential_base: 지수 배수
         jitter: 무작위 지터 추가 여부
+        retry_after: 서버가 알려준 대기 시간 (초, 있으면 지수 백오프 대신 사용)
 
     Returns:
         계산된 지연 시간 (초)
     """
+    if retry_after is not None:
+        # 서버 힌트보다 일찍 재시도하지 않도록 지터는 더하기만 함
+        if jitter:
+            return retry_after * (1 + RETRY_AFTER_JITTER * random.random())
+        return retry_after
+
     delay = min(base_delay * (exponential_base**attempt), max_delay)
 
     if jitter:
@@ -75,6 +118,97 @@ def calculate_delay(
     return delay
 
 
+def get_error_reason(error: Exception) -> Optional[str]:
+    """HttpError 응답 본문의 오류 사유 (예: "rateLimitExceeded").
+
+    errors[].reason이 없으면 error.details의 ErrorInfo.reason을 사용합니다.
+
+    Args:
+        error: 발생한 예외
+
+    Returns:
+        첫 번째 오류 사유 또는 None
+    """
+    body = _error_body(error)
+    try:
+        return body["errors"][0]["reason"]
+    except (KeyError, IndexError, TypeError):
+        pass
+
+    for detail in _error_details(body):
+        if detail.get("@type", "").endswith("google.rpc.ErrorInfo") and detail.get("reason"):
+            return detail["reason"]
+    return None
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """서버가 알려준 재시도까지의 대기 시간.
+
+    확인 순서:
+    1. Retry-After 헤더 (초 또는 HTTP 날짜)
+    2. error.details의 google.rpc.RetryInfo retryDelay (예: "30s")
+    3. 오류 메시지의 "Retry after <ISO 시각>"
+
+    Args:
+        error: 발생한 예외
+
+    Returns:
+        대기 시간 (초, 0 이상) 또는 힌트가 없으면 None
+    """
+    if not isinstance(error, HttpError):
+        return None
+
+    header = error.resp.get("retry-after") if hasattr(error.resp, "get") else None
+    if header:
+        header = str(header).strip()
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            pass
+        try:
+            return _seconds_until(parsedate_to_datetime(header))
+        except (TypeError, ValueError):
+            pass
+
+    body = _error_body(error)
+    for detail in _error_details(body):
+        if detail.get("@type", "").endswith("google.rpc.RetryInfo"):
+            delay = detail.get("retryDelay")
+            if isinstance(delay, dict):
+                # protobuf Duration 형식 {"seconds": .., "nanos": ..}
+                return max(0.0, float(delay.get("seconds", 0)) + delay.get("nanos", 0) / 1e9)
+            if isinstance(delay, str) and delay.endswith("s"):
+                try:
+                    return max(0.0, float(delay[:-1]))
+                except ValueError:
+                    pass
+
+    message = body.get("message", "") if isinstance(body, dict) else ""
+    match = _RETRY_AFTER_MESSAGE.search(message if isinstance(message, str) else "")
+    if match:
+        try:
+            return _seconds_until(datetime.fromisoformat(match.group(1).replace("Z", "+00:00")))
+        except ValueError:
+            pass
+    return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """속도를 낮춰야 하는 오류인지 확인 (429, 503, 403 rateLimitExceeded).
+
+    Args:
+        error: 발생한 예외
+
+    Returns:
+        속도 제한/과부하 오류면 True
+    """
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status in RATE_LIMIT_STATUS_CODES:
+        return True
+    return error.resp.status == 403 and get_error_reason(error) in RATE_LIMIT_REASONS
+
+
 def is_retryable_error(error: Exception) -> bool:
     """재시도 가능한 오류인지 확인.
 
@@ -85,10 +219,42 @@ def is_retryable_error(error: Exception) -> bool:
         재시도 가능하면 True
     """
     if isinstance(error, HttpError):
-        return error.resp.status in RETRYABLE_STATUS_CODES
+        if error.resp.status in RETRYABLE_STATUS_CODES:
+            return True
+        return error.resp.status == 403 and get_error_reason(error) in RATE_LIMIT_REASONS
     return False
 
 
+def _error_body(error: Exception) -> dict:
+    """HttpError 응답 본문의 "error" 객체 (파싱할 수 없으면 빈 dict)."""
+    if not isinstance(error, HttpError):
+        return {}
+
+    try:
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        body = json.loads(content)["error"]
+    except (ValueError, KeyError, TypeError):
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _error_details(body: dict) -> list[dict]:
+    """"error" 객체의 details 목록 (google.rpc 상세 정보)."""
+    details = body.get("details")
+    if not isinstance(details, list):
+        return []
+    return [detail for detail in details if isinstance(detail, dict)]
+
+
+def _seconds_until(moment: datetime) -> float:
+    """지정 시각까지 남은 시간 (초, 0 이상)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
 def exponential_backoff(
     max_retries: int = 5,
     base_delay: float = 1.0,
@@ -96,6 +262,9 @@ def exponential_backoff(
     exponential_base: float = 2.0,
     jitter: bool = True,
     on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    on_rate_limited: Optional[Callable[[Exception, Optional[float]], None]] = None,
+    budget: Optional[RetryBudget] = None,
+    breaker: Optional[CircuitBreaker] = None,
 ) -> Callable:
     """지수 백오프 데코레이터.
 
@@ -109,6 +278,11 @@ def exponential_backoff(
         exponential_base: 지수 배수
         jitter: 무작위 지터 추가 여부
         on_retry: 재시도 시 호출될 콜백 (attempt, error, delay)
+                  (delay는 서버 힌트를 반영한 실제 대기 시간)
+        on_rate_limited: 속도 제한 응답마다 호출될 콜백 (error, retry_after)
+                  (재시도하지 않고 포기하는 경우에도 호출되어 서버 힌트를 전달)
+        budget: 재시도 예산 (초과하면 재시도하지 않고 실패)
+        breaker: 회로 차단기 (열려 있으면 호출하지 않고 CircuitOpenError)
 
     Returns:
         데코레이터 함수
@@ -128,53 +302,39 @@ def exponential_backoff(
         def list_messages(service, query):
             ...
     """
+    policy = _RetryPolicy(
+        max_retries,
+        base_delay,
+        max_delay,
+        exponential_base,
+        jitter,
+        on_retry,
+        on_rate_limited,
+        budget,
+        breaker,
+    )
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            last_exception: Optional[Exception] = None
-
             for attempt in range(max_retries + 1):
+                policy.before_call()
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except HttpError as e:
-                    last_exception = e
-
-                    if not is_retryable_error(e):
-                        # 재시도 불가능한 오류는 즉시 발생
+                    delay = policy.on_error(func.__name__, attempt, e)
+                    if delay is None:
                         raise
-
-                    if attempt == max_retries:
-                        # 최대 재시도 횟수 도달
-                        logger.error(
-                            f"최대 재시도 횟수({max_retries}) 도달. "
-                            f"함수: {func.__name__}, 오류: {e}"
-                        )
-                        raise
-
-                    delay = calculate_delay(
-                        attempt,
-                        base_delay,
-                        max_delay,
-                        exponential_base,
-                        jitter,
-                    )
-
-                    if on_retry:
-                        on_retry(attempt, e, delay)
-
-                    logger.warning(
-                        f"재시도 {attempt + 1}/{max_retries}: "
-                        f"HTTP {e.resp.status}, {delay:.1f}초 대기"
-                    )
                     time.sleep(delay)
                 except Exception as e:
-                    # HttpError가 아닌 예외는 그대로 발생
+                    # HttpError가 아닌 예외는 그대로 발생 (연결 오류는 장애로 기록)
+                    policy.on_other_error(e)
                     raise
+                else:
+                    policy.on_success()
+                    return result
 
             # 이 코드에 도달하면 안 됨
-            if last_exception:
-                raise last_exception
             raise RuntimeError("Unexpected state in retry logic")
 
         return wrapper
@@ -182,6 +342,156 @@ def exponential_backoff(
     return decorator
 
 
+def async_exponential_backoff(
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    exponential_base: float = 2.0,
+    jitter: bool = True,
+    on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    on_rate_limited: Optional[Callable[[Exception, Optional[float]], None]] = None,
+    budget: Optional[RetryBudget] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Callable:
+    """코루틴 함수용 exponential_backoff.
+
+    재시도 규칙(서버 힌트, 예산, 회로 차단기, deadline)은 동일하고,
+    대기만 asyncio.sleep으로 하여 이벤트 루프를 막지 않습니다.
+
+    Usage:
+        @async_exponential_backoff(max_retries=5)
+        async def get_message(http, message_id):
+            return await http.request("GET", f"messages/{message_id}")
+    """
+    policy = _RetryPolicy(
+        max_retries,
+        base_delay,
+        max_delay,
+        exponential_base,
+        jitter,
+        on_retry,
+        on_rate_limited,
+        budget,
+        breaker,
+    )
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            for attempt in range(max_retries + 1):
+                policy.before_call()
+                try:
+                    result = await func(*args, **kwargs)
+                except HttpError as e:
+                    delay = policy.on_error(func.__name__, attempt, e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    policy.on_other_error(e)
+                    raise
+                else:
+                    policy.on_success()
+                    return result
+
+            raise RuntimeError("Unexpected state in retry logic")
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass
+class _RetryPolicy:
+    """exponential_backoff/async_exponential_backoff가 공유하는 재시도 판단."""
+
+    max_retries: int
+    base_delay: float
+    max_delay: float
+    exponential_base: float
+    jitter: bool
+    on_retry: Optional[Callable[[int, Exception, float], None]]
+    on_rate_limited: Optional[Callable[[Exception, Optional[float]], None]]
+    budget: Optional[RetryBudget]
+    breaker: Optional[CircuitBreaker]
+
+    def before_call(self) -> None:
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def on_success(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+        if self.budget is not None:
+            self.budget.record_success()
+
+    def on_other_error(self, error: Exception) -> None:
+        if self.breaker is not None:
+            self.breaker.record_error(error)
+
+    def on_error(self, name: str, attempt: int, e: HttpError) -> Optional[float]:
+        """HttpError 처리: 재시도까지 대기할 시간 (재시도하지 않으면 None)."""
+        if self.breaker is not None:
+            self.breaker.record_error(e)
+
+        if self.on_rate_limited and is_rate_limit_error(e):
+            # 재시도 여부와 관계없이 알림 (포기하는 경우에도 서버 힌트 전달)
+            self.on_rate_limited(e, get_retry_after(e))
+
+        if not is_retryable_error(e):
+            # 재시도 불가능한 오류는 즉시 발생
+            return None
+
+        if attempt == self.max_retries:
+            # 최대 재시도 횟수 도달
+            logger.error(
+                f"최대 재시도 횟수({self.max_retries}) 도달. "
+                f"함수: {name}, 오류: {e}"
+            )
+            return None
+
+        retry_after = get_retry_after(e)
+        if retry_after is not None and retry_after > self.max_delay:
+            # 서버가 알려준 시각까지 기다릴 수 없음 - 재시도해도 실패
+            logger.error(
+                f"서버 재시도 힌트({retry_after:.1f}초)가 최대 지연"
+                f"({self.max_delay}초)을 초과. 함수: {name}, 오류: {e}"
+            )
+            return None
+
+        if self.budget is not None and not self.budget.try_retry():
+            # 최근 성공 대비 재시도가 너무 많음 (장애 가능성)
+            logger.error(f"재시도 예산 소진. 함수: {name}, 오류: {e}")
+            return None
+
+        delay = calculate_delay(
+            attempt,
+            self.base_delay,
+            self.max_delay,
+            self.exponential_base,
+            self.jitter,
+            retry_after,
+        )
+
+        left = remaining()
+        if left is not None and delay >= left:
+            # 재시도 전에 deadline이 지남
+            logger.error(
+                f"deadline까지 {max(left, 0.0):.1f}초 남아 재시도하지 않음. "
+                f"함수: {name}, 오류: {e}"
+            )
+            return None
+
+        if self.on_retry:
+            self.on_retry(attempt, e, delay)
+
+        logger.warning(
+            f"재시도 {attempt + 1}/{self.max_retries}: "
+            f"HTTP {e.resp.status}, {delay:.1f}초 대기"
+        )
+        return delay
+
+
 class RetryableOperation:
     """재시도 가능한 작업을 위한 컨텍스트 매니저.
 
@@ -213,7 +523,18 @@ class RetryableOperation:
         max_delay: float = 60.0,
         exponential_base: float = 2.0,
         jitter: bool = True,
+        on_retry: Optional[Callable[[int, Exception, float], None]] = None,
     ):
+        """
+        Args:
+            max_retries: 최대 재시도 횟수
+            base_delay: 기본 지연 시간 (초)
+            max_delay: 최대 지연 시간 (초)
+            exponential_base: 지수 배수
+            jitter: 무작위 지터 추가 여부
+            on_retry: 재시도 시 호출될 콜백 (attempt, error, delay)
+        """
+        self.on_retry = on_retry
         self.config = RetryConfig(
             max_retries=max_retries,
             base_delay=base_delay,
@@ -256,6 +577,11 @@ class RetryableOperation:
         if not is_retryable_error(error):
             raise error
 
+        retry_after = get_retry_after(error)
+        if retry_after is not None and retry_after > self.config.max_delay:
+            # 서버가 알려준 시각까지 기다릴 수 없음 (재시도하지 않으므로 on_retry도 없음)
+            raise error
+
         if self.attempt >= self.config.max_retries:
             raise error
 
@@ -265,8 +591,17 @@ class RetryableOperation:
             self.config.max_delay,
             self.config.exponential_base,
             self.config.jitter,
+            retry_after,
         )
 
+        left = remaining()
+        if left is not None and delay >= left:
+            # 재시도 전에 deadline이 지남
+            raise error
+
+        if self.on_retry:
+            self.on_retry(self.attempt, error, delay)
+
         logger.warning(
             f"재시도 {self.attempt + 1}/{self.config.max_retries}: "
             f"{type(error).__name__}, {delay:.1f}초 대기"
@@ -308,6 +643,7 @@ def retry_api_call(
     func: Callable[..., T],
     *args,
     max_retries: int = 5,
+    on_retry: Optional[Callable[[int, Exception, float], None]] = None,
     **kwargs,
 ) -> T:
     """단순 재시도 헬퍼 함수.
@@ -318,6 +654,7 @@ def retry_api_call(
         func: 실행할 함수
         *args: 함수 인자
         max_retries: 최대 재시도 횟수
+        on_retry: 재시도 시 호출될 콜백 (attempt, error, delay)
         **kwargs: 함수 키워드 인자
 
     Returns:
@@ -331,7 +668,7 @@ def retry_api_call(
             max_retries=3
         )
     """
-    return RetryableOperation(max_retries=max_retries).execute(
+    return RetryableOperation(max_retries=max_retries, on_retry=on_retry).execute(
         func, *args, **kwargs
     )
 
@@ -0,0 +1,533 @@
+"""Local Full-Text Search Index.
+
+캐시된 Gmail 메시지에 대한 로컬 전문 검색 인덱스 (SQLite FTS5).
+
+GmailClient가 메시지를 조회하거나 동기화할 때 함께 색인하므로,
+이미 받아 둔 메일은 API 호출 없이 여러 계정에 걸쳐 검색할 수 있습니다.
+
+색인 필드:
+- subject, from, to, snippet, body, labels, internal_date
+- has_attachment (full 형식으로 색인된 경우만, metadata는 알 수 없음)
+
+완전성:
+- 계정의 전체 메시지를 색인하고 증분 동기화로 유지 중이면 "완전"으로 표시
+- 완전한 인덱스는 지원되는 쿼리(query_parser)에 API 대신 응답 가능
+
+Reference:
+    https://www.sqlite.org/fts5.html
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+_SQL_CHUNK_SIZE = 500
+
+
+class SearchIndex:
+    """SQLite FTS5 기반 로컬 메시지 검색 인덱스.
+
+    Usage:
+        index = SearchIndex(Path(".cache/gmail"))
+
+        # 파싱된 메시지 색인 (GmailClient._parse_message 형식)
+        index.index_messages("work", [message1, message2])
+
+        # 검색 (최신순)
+        results = index.search("invoice march", accounts=["work"])
+    """
+
+    DB_FILENAME = "search.sqlite3"
+
+    def __init__(self, cache_dir: Path, busy_timeout: float = 30.0):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 (인덱스 파일이 생성될 위치)
+            busy_timeout: 다른 연결이 잠금을 보유한 경우 최대 대기 시간 (초)
+
+        Raises:
+            sqlite3.OperationalError: SQLite에 FTS5 확장이 없는 경우
+        """
+        self.db_path = Path(cache_dir) / self.DB_FILENAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS indexed_messages (
+                    account TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    thread_id TEXT NOT NULL DEFAULT '',
+                    subject TEXT NOT NULL DEFAULT '',
+                    from_addr TEXT NOT NULL DEFAULT '',
+                    to_addr TEXT NOT NULL DEFAULT '',
+                    snippet TEXT NOT NULL DEFAULT '',
+                    body TEXT NOT NULL DEFAULT '',
+                    labels TEXT NOT NULL DEFAULT '',
+                    date TEXT NOT NULL DEFAULT '',
+                    internal_date INTEGER NOT NULL DEFAULT 0,
+                    has_attachment INTEGER,
+                    UNIQUE (account, id)
+                );
+
+                CREATE TABLE IF NOT EXISTS index_coverage (
+                    account TEXT PRIMARY KEY,
+                    complete INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_indexed_messages_date
+                ON indexed_messages (account, internal_date DESC);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+                    subject, from_addr, to_addr, snippet, body, labels,
+                    content = 'indexed_messages',
+                    content_rowid = 'rowid',
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS trg_indexed_messages_insert
+                AFTER INSERT ON indexed_messages
+                BEGIN
+                    INSERT INTO messages_fts
+                        (rowid, subject, from_addr, to_addr, snippet, body, labels)
+                    VALUES
+                        (new.rowid, new.subject, new.from_addr, new.to_addr,
+                         new.snippet, new.body, new.labels);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_indexed_messages_delete
+                AFTER DELETE ON indexed_messages
+                BEGIN
+                    INSERT INTO messages_fts
+                        (messages_fts, rowid, subject, from_addr, to_addr,
+                         snippet, body, labels)
+                    VALUES
+                        ('delete', old.rowid, old.subject, old.from_addr,
+                         old.to_addr, old.snippet, old.body, old.labels);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_indexed_messages_update
+                AFTER UPDATE ON indexed_messages
+                BEGIN
+                    INSERT INTO messages_fts
+                        (messages_fts, rowid, subject, from_addr, to_addr,
+                         snippet, body, labels)
+                    VALUES
+                        ('delete', old.rowid, old.subject, old.from_addr,
+                         old.to_addr, old.snippet, old.body, old.labels);
+                    INSERT INTO messages_fts
+                        (rowid, subject, from_addr, to_addr, snippet, body, labels)
+                    VALUES
+                        (new.rowid, new.subject, new.from_addr, new.to_addr,
+                         new.snippet, new.body, new.labels);
+                END;
+                """
+            )
+
+            # has_attachment 열이 없는 이전 인덱스 갱신
+            columns = {
+                row[1]
+                for row in self._conn.execute("PRAGMA table_info(indexed_messages)")
+            }
+            if "has_attachment" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE indexed_messages ADD COLUMN has_attachment INTEGER"
+                )
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def index_messages(
+        self,
+        account: str,
+        messages: Iterable[dict],
+        format: str = "full",
+    ) -> None:
+        """파싱된 메시지 색인 (있으면 갱신).
+
+        metadata 형식은 이미 색인된 본문과 첨부파일 정보를 지우지 않습니다.
+
+        Args:
+            account: 계정 이름
+            messages: GmailClient._parse_message 형식의 메시지 목록
+            format: 메시지 형식 ("full" 또는 "metadata")
+        """
+        full = format == "full"
+        rows = [
+            (
+                account,
+                msg["id"],
+                msg.get("thread_id", ""),
+                msg.get("subject", ""),
+                msg.get("from", ""),
+                ", ".join(filter(None, (msg.get("to", ""), msg.get("cc", "")))),
+                msg.get("snippet", ""),
+                msg.get("body", ""),
+                " ".join(msg.get("label_ids", [])),
+                msg.get("date", ""),
+                int(msg.get("internal_date") or 0),
+                int(bool(msg.get("attachments"))) if full else None,
+            )
+            for msg in messages
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._write(
+                """
+                INSERT INTO indexed_messages
+                    (account, id, thread_id, subject, from_addr, to_addr,
+                     snippet, body, labels, date, internal_date, has_attachment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account, id) DO UPDATE SET
+                    thread_id = excluded.thread_id,
+                    subject = excluded.subject,
+                    from_addr = excluded.from_addr,
+                    to_addr = excluded.to_addr,
+                    snippet = excluded.snippet,
+                    body = CASE WHEN excluded.body != ''
+                        THEN excluded.body ELSE indexed_messages.body END,
+                    labels = excluded.labels,
+                    date = excluded.date,
+                    internal_date = excluded.internal_date,
+                    has_attachment = COALESCE(
+                        excluded.has_attachment, indexed_messages.has_attachment)
+                """,
+                rows,
+            )
+
+    def update_labels(self, account: str, labels_by_id: dict[str, list[str]]) -> None:
+        """색인된 메시지의 라벨 갱신 (색인되지 않은 메시지는 무시).
+
+        Args:
+            account: 계정 이름
+            labels_by_id: {메시지 ID: 라벨 ID 목록}
+        """
+        if not labels_by_id:
+            return
+
+        with self._lock:
+            self._write(
+                "UPDATE indexed_messages SET labels = ? WHERE account = ? AND id = ?",
+                [
+                    (" ".join(label_ids), account, message_id)
+                    for message_id, label_ids in labels_by_id.items()
+                ],
+            )
+
+    def modify_labels(
+        self,
+        account: str,
+        message_ids: Iterable[str],
+        add_labels: Iterable[str] = (),
+        remove_labels: Iterable[str] = (),
+    ) -> None:
+        """색인된 메시지에 라벨 추가/제거 적용 (색인되지 않은 메시지는 무시).
+
+        Args:
+            account: 계정 이름
+            message_ids: 메시지 ID 목록
+            add_labels: 추가할 라벨 ID
+            remove_labels: 제거할 라벨 ID
+        """
+        message_ids = list(message_ids)
+        add_labels = list(add_labels)
+        remove_labels = set(remove_labels)
+        if not message_ids or not (add_labels or remove_labels):
+            return
+
+        with self._lock:
+            current = {}
+            for i in range(0, len(message_ids), _SQL_CHUNK_SIZE):
+                chunk = message_ids[i : i + _SQL_CHUNK_SIZE]
+                rows = self._conn.execute(
+                    "SELECT id, labels FROM indexed_messages "
+                    f"WHERE account = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (account, *chunk),
+                ).fetchall()
+                current.update(rows)
+
+            updated = {}
+            for message_id, labels in current.items():
+                label_ids = [l for l in labels.split() if l not in remove_labels]
+                label_ids += [l for l in add_labels if l not in label_ids]
+                updated[message_id] = label_ids
+
+            self.update_labels(account, updated)
+
+    def remove(self, account: str, message_ids: Iterable[str]) -> None:
+        """메시지 색인 삭제."""
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+
+        with self._lock:
+            self._write(
+                "DELETE FROM indexed_messages WHERE account = ? AND id = ?",
+                [(account, message_id) for message_id in message_ids],
+            )
+
+    def remove_account(self, account: str) -> None:
+        """계정의 색인 전체 삭제."""
+        with self._lock:
+            self._write(
+                "DELETE FROM indexed_messages WHERE account = ?",
+                [(account,)],
+            )
+            self._write(
+                "DELETE FROM index_coverage WHERE account = ?",
+                [(account,)],
+            )
+
+    def set_complete(self, account: str, complete: bool) -> None:
+        """계정 인덱스의 완전성 표시.
+
+        Args:
+            account: 계정 이름
+            complete: 전체 메시지가 색인되어 있으면 True
+        """
+        with self._lock:
+            self._write(
+                "INSERT INTO index_coverage (account, complete, updated_at) "
+                "VALUES (?, ?, ?) "
+                "ON CONFLICT (account) DO UPDATE SET "
+                "complete = excluded.complete, updated_at = excluded.updated_at",
+                [(account, int(complete), time.time())],
+            )
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def search(
+        self,
+        text: str = "",
+        accounts: Optional[list[str]] = None,
+        limit: int = 50,
+        where: Optional[tuple[str, list]] = None,
+    ) -> list[dict]:
+        """전문 검색 (최신순).
+
+        검색어의 각 단어는 접두어 일치로 AND 결합됩니다.
+        검색어가 비어 있으면 최신 메시지를 반환합니다.
+
+        Args:
+            text: 검색어
+            accounts: 검색할 계정 목록 (None이면 전체)
+            limit: 최대 결과 수
+            where: 추가 조건 (조건절, 바인딩 값) - ParsedQuery.to_sql() 결과
+
+        Returns:
+            메시지 요약 목록 (account, id, thread_id, subject, from, to,
+            snippet, date, label_ids, internal_date)
+        """
+        sql, params = self._search_sql(text, accounts, where)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"{sql} ORDER BY m.internal_date DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+
+        return [self._row_to_dict(row) for row in rows]
+
+    def count(self, account: Optional[str] = None) -> int:
+        """색인된 메시지 수."""
+        with self._lock:
+            if account is None:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM indexed_messages"
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM indexed_messages WHERE account = ?",
+                    (account,),
+                ).fetchone()
+        return row[0]
+
+    def is_complete(self, account: str) -> bool:
+        """계정의 전체 메시지가 색인되어 있는지 확인."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT complete FROM index_coverage WHERE account = ?",
+                (account,),
+            ).fetchone()
+        return bool(row and row[0])
+
+    def has_metadata_only(self, account: str) -> bool:
+        """metadata로만 색인된 (본문과 첨부파일 여부를 모르는) 메시지가 있는지 확인."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM indexed_messages "
+                "WHERE account = ? AND has_attachment IS NULL LIMIT 1",
+                (account,),
+            ).fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        """연결 정리."""
+        with self._lock:
+            self._conn.close()
+
+    # =========================================================================
+    # Internal Methods
+    # =========================================================================
+
+    _SELECT = (
+        "SELECT m.account, m.id, m.thread_id, m.subject, m.from_addr, m.to_addr, "
+        "m.snippet, m.date, m.labels, m.internal_date FROM indexed_messages m"
+    )
+
+    def _search_sql(
+        self,
+        text: str,
+        accounts: Optional[list[str]],
+        where: Optional[tuple[str, list]] = None,
+    ) -> tuple[str, list]:
+        """검색 SQL과 바인딩 값 생성."""
+        conditions = []
+        params: list = []
+
+        match = self._fts_query(text)
+        if match:
+            conditions.append(
+                "m.rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)"
+            )
+            params.append(match)
+
+        if accounts:
+            conditions.append(f"m.account IN ({','.join('?' * len(accounts))})")
+            params.extend(accounts)
+
+        if where:
+            conditions.append(f"({where[0]})")
+            params.extend(where[1])
+
+        sql = self._SELECT
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """자유 텍스트를 FTS5 쿼리로 변환 (단어별 접두어 일치, AND)."""
+        terms = []
+        for token in text.split():
+            token = token.replace('"', '""')
+            terms.append(f'"{token}"*')
+        return " ".join(terms)
+
+    @staticmethod
+    def _row_to_dict(row: tuple) -> dict:
+        account, msg_id, thread_id, subject, from_addr, to_addr, snippet, date, labels, internal_date = row
+        return {
+            "account": account,
+            "id": msg_id,
+            "thread_id": thread_id,
+            "subject": subject,
+            "from": from_addr,
+            "to": to_addr,
+            "snippet": snippet,
+            "date": date,
+            "label_ids": labels.split() if labels else [],
+            "internal_date": str(internal_date),
+        }
+
+    def _write(self, sql: str, rows: list[tuple]) -> None:
+        """쓰기 트랜잭션 실행 (락 보유 상태에서 호출)."""
+        for i in range(0, len(rows), _SQL_CHUNK_SIZE):
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(sql, rows[i : i + _SQL_CHUNK_SIZE])
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+
+if __name__ == "__main__":
+    # 테스트
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        index = SearchIndex(Path(cache_dir))
+
+        index.index_messages(
+            "work",
+            [
+                {
+                    "id": "m1", "thread_id": "t1", "subject": "March invoice",
+                    "from": "billing@example.com", "to": "me@example.com",
+                    "body": "Invoice for March attached", "label_ids": ["INBOX", "UNREAD"],
+                    "attachments": [{"id": "a1"}], "internal_date": 2000,
+                },
+                {
+                    "id": "m2", "thread_id": "t2", "subject": "Lunch",
+                    "from": "bob@example.com", "to": "me@example.com",
+                    "body": "invoices later", "label_ids": ["INBOX"],
+                    "attachments": [], "internal_date": 1000,
+                },
+            ],
+        )
+        index.index_messages(
+            "home",
+            [{"id": "h1", "subject": "Invoice paid", "label_ids": ["INBOX"], "internal_date": 3000}],
+            format="metadata",
+        )
+
+        # 검색어는 접두어 일치, 최신순
+        hits = [(r["account"], r["id"]) for r in index.search("invoice")]
+        assert hits == [("home", "h1"), ("work", "m1"), ("work", "m2")], hits
+        print(f"search 'invoice': {hits}")
+
+        hits = [r["id"] for r in index.search("invoice march", accounts=["work"])]
+        assert hits == ["m1"], hits
+
+        # 조건절 (ParsedQuery.to_sql 형식)
+        unread = ("instr(' ' || m.labels || ' ', ?) > 0", [" UNREAD "])
+        assert [r["id"] for r in index.search(where=unread)] == ["m1"]
+
+        # metadata 재색인은 본문/첨부파일 정보를 지우지 않음
+        index.index_messages(
+            "work", [{"id": "m1", "subject": "March invoice", "label_ids": ["INBOX"]}],
+            format="metadata",
+        )
+        assert [r["id"] for r in index.search("attached")] == ["m1"]
+        assert not index.has_metadata_only("work")
+        assert index.has_metadata_only("home")
+
+        # 라벨 갱신과 삭제
+        index.modify_labels("work", ["m1", "m2"], add_labels=["STARRED"], remove_labels=["INBOX"])
+        labels = {r["id"]: r["label_ids"] for r in index.search(accounts=["work"])}
+        assert labels == {"m1": ["STARRED"], "m2": ["STARRED"]}, labels
+
+        index.remove("work", ["m2"])
+        assert index.count("work") == 1 and index.count() == 2
+
+        # 완전성 표시
+        assert not index.is_complete("work")
+        index.set_complete("work", True)
+        assert index.is_complete("work")
+        index.remove_account("work")
+        assert not index.is_complete("work") and index.count("work") == 0
+
+        index.close()
+
+    print("OK")
@@ -9,21 +9,27 @@ Features:
     - Exponential Backoff for Error Handling (P0)
     - Batch Processing for Bulk Operations (P1)
     - Local Caching for API Optimization (P1)
+    - History API Incremental Sync for Cache Freshness
 
 Environment Variables:
     GMAIL_SKILL_PATH: Skill 루트 경로 (기본값: 이 파일의 부모의 부모)
-    GMAIL_TIMEOUT: API 요청 타임아웃 초 (기본값: 30)
+    GMAIL_TIMEOUT: API 요청별 소켓 타임아웃 초 (기본값: 30)
     GMAIL_CACHE_DIR: 캐시 디렉토리 (기본값: .cache/gmail)
     GMAIL_ENABLE_CACHE: 캐시 활성화 여부 (기본값: true)
     GMAIL_ENABLE_QUOTA: 할당량 관리 활성화 여부 (기본값: true)
+    GMAIL_ENABLE_SYNC: History API 증분 동기화 활성화 여부 (기본값: true)
+    GMAIL_SHARED_QUOTA: 같은 호스트의 프로세스 간 할당량 공유 여부 (기본값: true)
+    GMAIL_BATCH_WORKERS: 동시에 실행할 배치 요청 수 (기본값: 4)
 """
 
 import base64
+import itertools
 import json
 import logging
 import mimetypes
 import os
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timezone
 from email import encoders
 from email.mime.audio import MIMEAudio
 from email.mime.base import MIMEBase
@@ -31,32 +37,66 @@ from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import google.auth
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 # Core modules for enhanced functionality
 try:
     from .core import (
         QuotaManager,
         QuotaUnit,
+        QuotaPriority,
+        get_quota_manager,
         exponential_backoff,
+        get_retry_budget,
+        get_circuit_breaker,
+        DeadlineHttp,
+        deadline as request_deadline,
+        check as request_check,
+        remaining as request_remaining,
+        CircuitOpenError,
+        prefetch,
         RetryConfig,
         EmailCache,
         BatchProcessor,
+        BatchResult,
+        HistorySync,
+        SearchIndex,
+        QueryTerm,
+        UnsupportedQueryError,
+        parse_query,
     )
 except ImportError:
     # Fallback for direct script execution
     from core import (
         QuotaManager,
         QuotaUnit,
+        QuotaPriority,
+        get_quota_manager,
         exponential_backoff,
+        get_retry_budget,
+        get_circuit_breaker,
+        DeadlineHttp,
+        deadline as request_deadline,
+        check as request_check,
+        remaining as request_remaining,
+        CircuitOpenError,
+        prefetch,
         RetryConfig,
         EmailCache,
         BatchProcessor,
+        BatchResult,
+        HistorySync,
+        SearchIndex,
+        QueryTerm,
+        UnsupportedQueryError,
+        parse_query,
     )
 
 logger = logging.getLogger(__name__)
@@ -64,6 +104,9 @@ logger = logging.getLogger(__name__)
 DEFAULT_TIMEOUT = int(os.environ.get("GMAIL_TIMEOUT", "30"))
 ENABLE_CACHE = os.environ.get("GMAIL_ENABLE_CACHE", "true").lower() == "true"
 ENABLE_QUOTA = os.environ.get("GMAIL_ENABLE_QUOTA", "true").lower() == "true"
+ENABLE_SYNC = os.environ.get("GMAIL_ENABLE_SYNC", "true").lower() == "true"
+SHARED_QUOTA = os.environ.get("GMAIL_SHARED_QUOTA", "true").lower() == "true"
+BATCH_WORKERS = int(os.environ.get("GMAIL_BATCH_WORKERS", "4"))
 
 
 class GmailClient:
@@ -73,6 +116,9 @@ class GmailClient:
         - Rate limiting & quota management
         - Exponential backoff for error handling
         - Local caching for API optimization
+        - History API incremental sync (keeps the cache fresh)
+        - Local full-text search over fetched messages (SQLite FTS5)
+        - Local answers for common list queries once the index is complete
         - Batch processing support
     """
 
@@ -82,6 +128,9 @@ class GmailClient:
         "https://www.googleapis.com/auth/gmail.labels",  # 라벨 관리
     ]
 
+    INDEX_PAGE_SIZE = 500  # build_local_index가 한 번에 조회/색인하는 메시지 수
+    SYNC_DEADLINE_SHARE = 0.5  # deadline이 있을 때 조회 전 동기화에 쓰는 남은 시간 비율
+
     def __init__(
         self,
         account_name: str,
@@ -89,19 +138,22 @@ class GmailClient:
         timeout: int = DEFAULT_TIMEOUT,
         enable_cache: bool = ENABLE_CACHE,
         enable_quota: bool = ENABLE_QUOTA,
+        enable_sync: bool = ENABLE_SYNC,
     ):
         """
         Args:
             account_name: 계정 식별자 (예: 'work', 'personal')
             base_path: skill 루트 경로
-            timeout: API 요청 타임아웃 (초)
+            timeout: API 요청별 소켓 타임아웃 (초) - 호출 전체의 상한은 deadline()
             enable_cache: 캐시 활성화 여부
             enable_quota: 할당량 관리 활성화 여부
+            enable_sync: History API 증분 동기화 활성화 여부 (캐시 필요)
         """
         self.account_name = account_name
         self.timeout = timeout
         self.enable_cache = enable_cache
         self.enable_quota = enable_quota
+        self.enable_sync = enable_sync and enable_cache
 
         if base_path:
             self.base_path = base_path
@@ -117,23 +169,57 @@ class GmailClient:
         self._cache: Optional[EmailCache] = None
         self._quota_manager: Optional[QuotaManager] = None
         self._batch_processor: Optional[BatchProcessor] = None
+        self._history_sync: Optional[HistorySync] = None
+        self._search_index: Optional[SearchIndex] = None
+
+        cache_dir = os.environ.get("GMAIL_CACHE_DIR") or str(
+            self.base_path / ".cache" / "gmail"
+        )
 
         if enable_cache:
-            cache_dir = os.environ.get("GMAIL_CACHE_DIR") or str(
-                self.base_path / ".cache" / "gmail"
-            )
             self._cache = EmailCache(cache_dir=cache_dir)
+            try:
+                self._search_index = SearchIndex(Path(cache_dir))
+            except sqlite3.OperationalError as e:
+                # FTS5가 없는 SQLite 빌드 - 로컬 검색 없이 계속 진행
+                logger.warning(f"Local search index unavailable: {e}")
 
         if enable_quota:
-            self._quota_manager = QuotaManager()
+            if SHARED_QUOTA:
+                # 같은 캐시 디렉토리를 쓰는 모든 프로세스가 계정별 할당량을 공유
+                self._quota_manager = get_quota_manager(state_dir=Path(cache_dir))
+            else:
+                self._quota_manager = QuotaManager()
 
     @property
     def service(self):
         """Lazy-load Gmail service."""
         if self._service is None:
-            self._service = build("gmail", "v1", credentials=self.creds)
+            self._service = build("gmail", "v1", http=self._authorized_http())
         return self._service
 
+    def _authorized_http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """요청마다 timeout(과 현재 deadline)을 소켓에 적용하는 인증된 HTTP."""
+        return google_auth_httplib2.AuthorizedHttp(
+            self.creds, http=DeadlineHttp(timeout=self.timeout)
+        )
+
+    def deadline(self, seconds: Optional[float]):
+        """블록 안의 모든 호출에 전체 시간 상한 적용.
+
+        소켓 타임아웃, 할당량 대기, 재시도 대기가 모두 남은 시간 안으로
+        제한되고, 시간이 다 되면 DeadlineExceeded가 발생합니다.
+        배치 작업은 예외 대신 남은 ID를 result.deferred로 돌려줍니다.
+
+        Args:
+            seconds: 허용할 시간 (초, None이면 제한 없음)
+
+        Usage:
+            with client.deadline(10):
+                client.list_messages(query="is:unread")
+        """
+        return request_deadline(seconds)
+
     @property
     def cache(self) -> Optional[EmailCache]:
         """Get cache manager instance."""
@@ -144,6 +230,11 @@ class GmailClient:
         """Get quota manager instance."""
         return self._quota_manager
 
+    @property
+    def search_index(self) -> Optional[SearchIndex]:
+        """Get local search index instance."""
+        return self._search_index
+
     @property
     def batch_processor(self) -> BatchProcessor:
         """Get batch processor instance (lazy-loaded)."""
@@ -152,18 +243,209 @@ class GmailClient:
                 service=self.service,
                 quota_manager=self._quota_manager,
                 user=self.account_name,
+                workers=BATCH_WORKERS,
+                http_factory=self._authorized_http,
             )
         return self._batch_processor
 
-    def _record_quota(self, units: int) -> None:
+    @property
+    def history_sync(self) -> Optional[HistorySync]:
+        """Get history sync engine (lazy-loaded, requires cache)."""
+        if self._history_sync is None and self._cache:
+            self._history_sync = HistorySync(
+                service=self.service,
+                cache=self._cache,
+                quota_manager=self._quota_manager,
+                user=self.account_name,
+                search_index=self._search_index,
+            )
+        return self._history_sync
+
+    def sync(self, force: bool = False) -> dict:
+        """History API로 로컬 캐시 증분 동기화.
+
+        Args:
+            force: 최소 간격과 무관하게 동기화
+
+        Returns:
+            동기화 결과 딕셔너리
+        """
+        if not self.history_sync:
+            return {"status": "disabled", "message": "Caching is disabled"}
+
+        result = self.history_sync.sync(force=force)
+        self._index_added_messages(result.get("added_ids", []))
+        return result
+
+    def build_local_index(self, format: str = "metadata") -> dict:
+        """계정의 전체 메시지를 로컬 검색 인덱스에 색인.
+
+        완료되면 인덱스가 "완전"으로 표시되고, 이후 증분 동기화가 새 메시지를
+        함께 색인하므로 지원되는 쿼리는 list_messages가 API 없이 응답합니다.
+        metadata 형식은 has:attachment를 판단할 수 없어 해당 쿼리는 API로 조회합니다.
+
+        목록 페이지 단위로 조회하며 색인하므로(iter_message_ids, 다음 페이지는
+        미리 조회) 메일함 크기와 관계없이 메모리에는 페이지 몇 개만 남습니다.
+        색인하는 동안에는 인덱스가 불완전으로 표시되어 쿼리는 API로 조회합니다.
+
+        Args:
+            format: 색인할 메시지 형식 ("metadata" 또는 "full")
+
+        Returns:
+            결과 딕셔너리 (status, indexed, failed, deferred, history_id)
+        """
+        if not (self._search_index and self.history_sync):
+            return {"status": "disabled", "message": "Local search index is disabled"}
+
+        # 기준점을 먼저 잡아 색인 중 발생한 변경분은 다음 동기화가 반영
+        baseline = self.history_sync.reset()
+        self._search_index.set_complete(self.account_name, False)
+
+        ids = (
+            msg["id"]
+            for msg in self.iter_message_ids(
+                include_spam_trash=True, page_size=self.INDEX_PAGE_SIZE
+            )
+        )
+        batches = self._fetch_batches(ids, format, self.INDEX_PAGE_SIZE)
+        indexed = failed = deferred = 0
+        stopped = False
+        try:
+            for batch, _ in batches:
+                indexed += batch.succeeded
+                failed += batch.failed
+                deferred += len(batch.deferred)
+                if batch.deferred:
+                    # 회로 차단 또는 deadline 초과 - 나머지는 조회하지 않음
+                    stopped = True
+                    break
+        except (CircuitOpenError, TimeoutError) as e:
+            # 목록 조회 중 중단 (회로 차단, deadline 또는 할당량 일시 중지)
+            logger.warning(f"{e}; stopped indexing after {indexed + failed} messages")
+            stopped = True
+        finally:
+            batches.close()
+
+        # 회로 차단/deadline으로 조회하지 못한 메시지가 있어도 불완전
+        complete = failed == 0 and not stopped
+        self._search_index.set_complete(self.account_name, complete)
+
+        return {
+            "status": "complete" if complete else "partial",
+            "indexed": indexed,
+            "failed": failed,
+            "deferred": deferred,
+            "history_id": baseline["history_id"],
+        }
+
+    def _index_added_messages(self, message_ids: list[str]) -> None:
+        """동기화로 추가된 메시지를 색인하여 인덱스 완전성 유지."""
+        if not (
+            message_ids
+            and self._search_index
+            and self._search_index.is_complete(self.account_name)
+        ):
+            return
+
+        batch = self.batch_get_messages(message_ids, format="metadata")
+        if batch.failed or batch.deferred:
+            logger.warning(
+                f"Failed to index {batch.failed + len(batch.deferred)} new messages, "
+                "local query answers disabled until the index is rebuilt"
+            )
+            self._search_index.set_complete(self.account_name, False)
+
+    def _sync_if_due(self) -> None:
+        """캐시 조회 전 필요 시 증분 동기화 (실패해도 TTL 캐시로 계속 진행).
+
+        deadline 안에서는 남은 시간의 SYNC_DEADLINE_SHARE만 동기화에 쓰고,
+        시간이 모자라면 동기화를 포기하고 캐시로 응답합니다 (나머지 시간은
+        캐시에 없을 때의 API 조회에 남김).
+        """
+        if not self.enable_sync:
+            return
+
+        left = request_remaining()
+        try:
+            with request_deadline(None if left is None else left * self.SYNC_DEADLINE_SHARE):
+                self.sync()
+        except (HttpError, CircuitOpenError, TimeoutError, ConnectionError) as e:
+            # DeadlineExceeded는 TimeoutError의 하위 클래스
+            logger.warning(f"History sync failed, falling back to TTL cache: {e}")
+
+    def _index_messages(self, messages: list[dict], format: str = "full") -> None:
+        """파싱된 메시지를 로컬 검색 인덱스에 반영."""
+        if self._search_index:
+            self._search_index.index_messages(self.account_name, messages, format)
+
+    def _apply_label_delta(
+        self,
+        message_ids: list[str],
+        add_labels: Optional[list[str]] = None,
+        remove_labels: Optional[list[str]] = None,
+        responses: Optional[list[dict]] = None,
+    ) -> None:
+        """추가/제거한 라벨로 캐시와 로컬 인덱스를 제자리 갱신.
+
+        Args:
+            message_ids: 수정된 메시지 ID 목록
+            add_labels: 추가한 라벨 ID
+            remove_labels: 제거한 라벨 ID
+            responses: labelIds가 포함된 API 응답 (해당 메시지는 응답의 라벨로 확정)
+        """
+        confirmed = {
+            r["id"]: r["labelIds"] for r in responses or [] if "labelIds" in r
+        }
+
+        if self._cache:
+            self._cache.apply_label_delta(
+                self.account_name, message_ids, add_labels or [], remove_labels or []
+            )
+            for message_id, label_ids in confirmed.items():
+                self._cache.update_message_labels(
+                    self.account_name, message_id, label_ids
+                )
+        if self._search_index:
+            self._search_index.modify_labels(
+                self.account_name, message_ids, add_labels or [], remove_labels or []
+            )
+            self._search_index.update_labels(self.account_name, confirmed)
+
+    def _apply_deletions(self, message_ids: list[str]) -> None:
+        """영구 삭제된 메시지를 캐시, 목록, 로컬 인덱스에서 제거."""
+        if self._cache:
+            self._cache.apply_message_changes(self.account_name, [], message_ids)
+        if self._search_index:
+            self._search_index.remove(self.account_name, message_ids)
+
+    def _record_quota(self, units: int, method: str) -> None:
         """Record quota usage if quota management is enabled."""
         if self._quota_manager:
-            self._quota_manager.record_usage(self.account_name, units)
+            self._quota_manager.record_usage(self.account_name, units, method)
 
-    def _wait_for_quota(self, units: int) -> None:
+    def _wait_for_quota(
+        self, units: int, priority: QuotaPriority = QuotaPriority.INTERACTIVE
+    ) -> None:
         """Wait for quota availability if quota management is enabled."""
         if self._quota_manager:
-            self._quota_manager.wait_for_quota(self.account_name, units)
+            self._quota_manager.wait_for_quota(self.account_name, units, priority=priority)
+
+    def _backoff(self, max_retries: int = 5):
+        """exponential_backoff + 속도 제한 응답을 할당량 관리자에 알림 (AIMD).
+
+        계정별 재시도 예산과 회로 차단기를 BatchProcessor와 공유합니다.
+        """
+        return exponential_backoff(
+            max_retries=max_retries,
+            on_rate_limited=self._on_rate_limited,
+            budget=get_retry_budget(self.account_name),
+            breaker=get_circuit_breaker(self.account_name),
+        )
+
+    def _on_rate_limited(self, error: Exception, retry_after: Optional[float]) -> None:
+        """429/rateLimitExceeded 응답마다 호출: 학습된 rate를 낮추고 서버 힌트만큼 중지."""
+        if self._quota_manager:
+            self._quota_manager.report_rate_limited(self.account_name, retry_after)
 
     def _load_credentials(self):
         """저장된 refresh token으로 credentials 로드 및 갱신."""
@@ -223,17 +505,36 @@ class GmailClient:
         Returns:
             메시지 목록 (id, threadId 포함)
         """
+        messages = []
+        page_token = None
+
         # Check cache first
         if use_cache and self._cache:
-            cached = self._cache.get_list(self.account_name, query, label_ids)
-            if cached is not None:
-                logger.debug(f"Cache hit for list query: {query}")
-                return cached[:max_results]
+            self._sync_if_due()
 
-        messages = []
-        page_token = None
+            local = self._list_local(query, max_results, label_ids, include_spam_trash)
+            if local is not None:
+                logger.debug(f"Local index answered list query: {query}")
+                return local
 
-        @exponential_backoff(max_retries=5)
+            cached = self._cache.get_list_page(self.account_name, query, label_ids)
+            if cached is not None:
+                if (
+                    len(cached["messages"]) >= max_results
+                    or not cached["next_page_token"]
+                ):
+                    logger.debug(f"Cache hit for list query: {query}")
+                    return cached["messages"][:max_results]
+
+                # 캐시된 페이지 이후부터 부족한 만큼만 조회
+                logger.debug(f"Partial cache hit for list query: {query}")
+                messages = list(cached["messages"])
+                page_token = cached["next_page_token"]
+
+        cached_count = len(messages)
+        seen = {m["id"] for m in messages}
+
+        @self._backoff()
         def _list_page(**kwargs):
             return self.service.users().messages().list(**kwargs).execute()
 
@@ -253,13 +554,23 @@ class GmailClient:
             # Wait for quota before API call
             self._wait_for_quota(QuotaUnit.MESSAGES_LIST)
 
-            result = _list_page(**kwargs)
+            try:
+                result = _list_page(**kwargs)
+            except HttpError as e:
+                if not (cached_count and e.resp.status == 400):
+                    raise
+                # 저장된 페이지 토큰이 만료됨 - 처음부터 다시 조회
+                logger.debug(f"Stale page token for list query: {query}")
+                messages, page_token, cached_count, seen = [], None, 0, set()
+                continue
 
             # Record quota usage
-            self._record_quota(QuotaUnit.MESSAGES_LIST)
+            self._record_quota(QuotaUnit.MESSAGES_LIST, "messages.list")
 
             for msg in result.get("messages", []):
-                messages.append(msg)
+                if msg["id"] not in seen:
+                    seen.add(msg["id"])
+                    messages.append(msg)
 
             page_token = result.get("nextPageToken")
             if not page_token:
@@ -267,9 +578,200 @@ class GmailClient:
 
         # Cache the results
         if use_cache and self._cache and messages:
-            self._cache.set_list(self.account_name, query, messages, label_ids)
+            if cached_count:
+                self._cache.extend_list(
+                    self.account_name,
+                    query,
+                    messages[cached_count:],
+                    label_ids,
+                    next_page_token=page_token,
+                )
+            else:
+                self._cache.set_list(
+                    self.account_name,
+                    query,
+                    messages,
+                    label_ids,
+                    next_page_token=page_token,
+                )
 
-        return messages
+        return messages[:max_results]
+
+    def _list_local(
+        self,
+        query: str,
+        max_results: int,
+        label_ids: Optional[list[str]],
+        include_spam_trash: bool,
+    ) -> Optional[list[dict]]:
+        """완전한 로컬 인덱스로 목록 쿼리에 응답 (응답할 수 없으면 None).
+
+        동기화가 최신이고, 인덱스가 완전하고, 쿼리가 지원되는 연산자로만
+        이루어진 경우에만 응답합니다.
+        """
+        index = self._search_index
+        if not (
+            index
+            and self._cache.is_synced(self.account_name)
+            and index.is_complete(self.account_name)
+        ):
+            return None
+
+        try:
+            parsed = parse_query(query, self._cache.get_labels(self.account_name))
+        except UnsupportedQueryError as e:
+            logger.debug(f"Query not answerable locally: {e}")
+            return None
+
+        if parsed.needs_body and index.has_metadata_only(self.account_name):
+            # metadata로만 색인된 메시지는 본문/첨부파일 조건을 평가할 수 없음
+            return None
+
+        for label_id in label_ids or []:
+            parsed.terms.append(QueryTerm("label", label_id))
+            if label_id in ("SPAM", "TRASH"):
+                include_spam_trash = True
+
+        results = index.search(
+            accounts=[self.account_name],
+            limit=max_results,
+            where=parsed.to_sql(include_spam_trash),
+        )
+        return [{"id": r["id"], "threadId": r["thread_id"]} for r in results]
+
+    def iter_message_ids(
+        self,
+        query: str = "",
+        label_ids: Optional[list[str]] = None,
+        include_spam_trash: bool = False,
+        max_results: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[dict]:
+        """메시지 목록을 페이지 단위로 조회하며 하나씩 반환.
+
+        list_messages와 달리 전체 목록을 만들지 않고, 호출자가 현재 페이지를
+        처리하는 동안 다음 페이지를 백그라운드에서 미리 조회합니다 (BULK 우선순위).
+        목록 캐시는 사용하지 않습니다.
+
+        Args:
+            query: Gmail 검색 쿼리
+            label_ids: 필터할 라벨 ID 목록
+            include_spam_trash: 스팸/휴지통 포함 여부
+            max_results: 최대 결과 수 (None이면 전부)
+            page_size: 페이지당 결과 수 (최대 500)
+
+        Yields:
+            메시지 (id, threadId 포함)
+        """
+
+        def _pages():
+            # 미리 조회하는 스레드 전용 연결 (httplib2.Http는 스레드 안전하지 않음)
+            http = self._authorized_http()
+
+            @self._backoff()
+            def _list_page(**kwargs):
+                return self.service.users().messages().list(**kwargs).execute(http=http)
+
+            page_token = None
+            fetched = 0
+            while max_results is None or fetched < max_results:
+                kwargs = {
+                    "userId": "me",
+                    "maxResults": min(page_size, 500),
+                    "includeSpamTrash": include_spam_trash,
+                }
+                if max_results is not None:
+                    kwargs["maxResults"] = min(kwargs["maxResults"], max_results - fetched)
+                if query:
+                    kwargs["q"] = query
+                if label_ids:
+                    kwargs["labelIds"] = label_ids
+                if page_token:
+                    kwargs["pageToken"] = page_token
+
+                self._wait_for_quota(QuotaUnit.MESSAGES_LIST, QuotaPriority.BULK)
+                result = _list_page(**kwargs)
+                self._record_quota(QuotaUnit.MESSAGES_LIST, "messages.list")
+
+                page = result.get("messages", [])
+                fetched += len(page)
+                yield page
+
+                page_token = result.get("nextPageToken")
+                if not page_token:
+                    break
+
+        yielded = 0
+        for page in prefetch(_pages()):
+            for msg in page:
+                if max_results is not None and yielded >= max_results:
+                    return
+                yielded += 1
+                yield msg
+
+    def iter_messages(
+        self,
+        query: str = "",
+        format: str = "metadata",
+        label_ids: Optional[list[str]] = None,
+        include_spam_trash: bool = False,
+        max_results: Optional[int] = None,
+        batch_size: int = 100,
+    ) -> Iterator[dict]:
+        """검색 결과 메시지를 배치로 조회하며 하나씩 반환.
+
+        iter_message_ids의 ID를 batch_size개씩 batch_get_messages로 조회하고,
+        호출자가 현재 배치를 처리하는 동안 다음 배치를 미리 조회합니다.
+        메모리에는 배치 몇 개만 남으므로 결과 크기와 관계없이 일정합니다.
+        조회 사이에 삭제된 메시지(404 등)는 건너뜁니다.
+
+        Args:
+            query: Gmail 검색 쿼리
+            format: 응답 형식 (minimal, full, raw, metadata)
+            label_ids: 필터할 라벨 ID 목록
+            include_spam_trash: 스팸/휴지통 포함 여부
+            max_results: 최대 결과 수 (None이면 전부)
+            batch_size: 한 번에 조회할 메시지 수
+
+        Yields:
+            파싱된 메시지 (format이 full/metadata인 경우, 아니면 API 응답)
+
+        Raises:
+            DeadlineExceeded: deadline 안에 모두 조회하지 못한 경우
+            CircuitOpenError: Gmail 장애로 회로가 열리거나 할당량이 일시 중지되어 중단된 경우
+        """
+        ids = (
+            msg["id"]
+            for msg in self.iter_message_ids(query, label_ids, include_spam_trash, max_results)
+        )
+        for result, parsed in self._fetch_batches(ids, format, batch_size):
+            for error in result.errors:
+                logger.warning(f"Skipping message {error['message_id']}: {error['error']}")
+            yield from parsed if format in ("full", "metadata") else result.results
+
+            if result.deferred:
+                request_check("iter_messages")
+                retry_in = (result.resume_after - datetime.now(timezone.utc)).total_seconds()
+                raise CircuitOpenError(self.account_name, max(0.0, retry_in))
+
+    def _fetch_batches(
+        self, ids: Iterator[str], format: str, batch_size: int
+    ) -> Iterator[tuple[BatchResult, list[dict]]]:
+        """ID를 batch_size개씩 조회해 캐시/인덱스에 반영 (다음 배치는 미리 조회).
+
+        Yields:
+            (BatchResult, 파싱된 메시지) - 배치마다
+        """
+
+        def _batches():
+            while True:
+                chunk = list(itertools.islice(ids, batch_size))
+                if not chunk:
+                    return
+                result = self.batch_processor.batch_get_messages(chunk, format)
+                yield result, self._store_fetched(result.results, format)
+
+        return prefetch(_batches())
 
     def get_message(
         self,
@@ -289,16 +791,27 @@ class GmailClient:
         """
         # Check cache first (only for full/metadata formats)
         if use_cache and self._cache and format in ("full", "metadata"):
+            self._sync_if_due()
+            metadata_only = format == "metadata"
             cached = self._cache.get_message(
                 self.account_name,
                 message_id,
-                metadata_only=(format == "metadata"),
+                metadata_only=metadata_only,
             )
             if cached is not None:
                 logger.debug(f"Cache hit for message: {message_id}")
                 return cached
 
-        @exponential_backoff(max_retries=5)
+            # 본문은 유효하고 라벨만 만료된 경우 라벨만 다시 조회
+            if self._cache.get_message_body(
+                self.account_name, message_id, metadata_only=metadata_only
+            ) is not None:
+                refreshed = self._refresh_message_labels(message_id)
+                if refreshed is not None:
+                    logger.debug(f"Cache label refresh for message: {message_id}")
+                    return refreshed
+
+        @self._backoff()
         def _get_message():
             return (
                 self.service.users()
@@ -313,16 +826,73 @@ class GmailClient:
         result = _get_message()
 
         # Record quota usage
-        self._record_quota(QuotaUnit.MESSAGES_GET)
+        self._record_quota(QuotaUnit.MESSAGES_GET, "messages.get")
 
         parsed = self._parse_message(result)
 
         # Cache the result
         if use_cache and self._cache and format in ("full", "metadata"):
-            self._cache.set_message(self.account_name, message_id, parsed)
+            self._cache.set_message(
+                self.account_name, message_id, parsed, format=format
+            )
+        if format in ("full", "metadata"):
+            self._index_messages([parsed], format)
 
         return parsed
 
+    def search_local(
+        self,
+        query: str = "",
+        max_results: int = 20,
+        accounts: Optional[list[str]] = None,
+    ) -> list[dict]:
+        """로컬 검색 인덱스에서 메시지 검색 (API 호출 없음).
+
+        이전에 조회/동기화된 메시지만 검색됩니다. 검색어의 각 단어는
+        제목, 주소, 스니펫, 본문, 라벨에서 접두어 일치로 AND 검색합니다.
+
+        Args:
+            query: 검색어
+            max_results: 최대 결과 수
+            accounts: 검색할 계정 목록 (기본: 현재 계정, []이면 전체 계정)
+
+        Returns:
+            메시지 요약 목록 (최신순, account 필드 포함)
+        """
+        if not self._search_index:
+            return []
+
+        if accounts is None:
+            accounts = [self.account_name]
+        return self._search_index.search(
+            query, accounts=accounts or None, limit=max_results
+        )
+
+    def _refresh_message_labels(self, message_id: str) -> Optional[dict]:
+        """minimal 형식으로 라벨만 다시 받아 캐시된 메시지 갱신."""
+
+        @self._backoff()
+        def _get_labels():
+            return (
+                self.service.users()
+                .messages()
+                .get(userId="me", id=message_id, format="minimal")
+                .execute()
+            )
+
+        self._wait_for_quota(QuotaUnit.MESSAGES_GET)
+        result = _get_labels()
+        self._record_quota(QuotaUnit.MESSAGES_GET, "messages.get")
+
+        label_ids = result.get("labelIds", [])
+        if self._search_index:
+            self._search_index.update_labels(
+                self.account_name, {message_id: label_ids}
+            )
+        return self._cache.update_message_labels(
+            self.account_name, message_id, label_ids
+        )
+
     def _parse_message(self, msg: dict) -> dict:
         """API 응답을 파싱하여 읽기 쉬운 형식으로 변환."""
         headers = {}
@@ -437,31 +1007,11 @@ class GmailClient:
         Returns:
             발송된 메시지 정보
         """
-        if attachments:
-            message = MIMEMultipart()
-            message.attach(MIMEText(body, "html" if html else "plain", "utf-8"))
-            for filepath in attachments:
-                self._attach_file(message, filepath)
-        else:
-            message = MIMEText(body, "html" if html else "plain", "utf-8")
-
-        message["to"] = to
-        message["subject"] = subject
-        if cc:
-            message["cc"] = cc
-        if bcc:
-            message["bcc"] = bcc
-        if reply_to_message_id:
-            message["In-Reply-To"] = reply_to_message_id
-            message["References"] = reply_to_message_id
-
-        raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
-
-        body_data = {"raw": raw}
-        if thread_id:
-            body_data["threadId"] = thread_id
+        body_data = self._build_send_body(
+            to, subject, body, cc, bcc, html, attachments, reply_to_message_id, thread_id
+        )
 
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _send():
             return (
                 self.service.users().messages().send(userId="me", body=body_data).execute()
@@ -473,7 +1023,7 @@ class GmailClient:
         result = _send()
 
         # Record quota usage
-        self._record_quota(QuotaUnit.MESSAGES_SEND)
+        self._record_quota(QuotaUnit.MESSAGES_SEND, "messages.send")
 
         # Invalidate list cache after sending
         if self._cache:
@@ -486,6 +1036,44 @@ class GmailClient:
             "status": "sent",
         }
 
+    def _build_send_body(
+        self,
+        to: str,
+        subject: str,
+        body: str,
+        cc: Optional[str] = None,
+        bcc: Optional[str] = None,
+        html: bool = False,
+        attachments: Optional[list[str]] = None,
+        reply_to_message_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+    ) -> dict:
+        """messages.send 요청 본문 생성 (인자는 send_message와 동일)."""
+        if attachments:
+            message = MIMEMultipart()
+            message.attach(MIMEText(body, "html" if html else "plain", "utf-8"))
+            for filepath in attachments:
+                self._attach_file(message, filepath)
+        else:
+            message = MIMEText(body, "html" if html else "plain", "utf-8")
+
+        message["to"] = to
+        message["subject"] = subject
+        if cc:
+            message["cc"] = cc
+        if bcc:
+            message["bcc"] = bcc
+        if reply_to_message_id:
+            message["In-Reply-To"] = reply_to_message_id
+            message["References"] = reply_to_message_id
+
+        raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+
+        body_data = {"raw": raw}
+        if thread_id:
+            body_data["threadId"] = thread_id
+        return body_data
+
     def _attach_file(self, message: MIMEMultipart, filepath: str) -> None:
         """파일을 메시지에 첨부."""
         path = Path(filepath)
@@ -537,7 +1125,7 @@ class GmailClient:
         if remove_label_ids:
             body["removeLabelIds"] = remove_label_ids
 
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _modify():
             return (
                 self.service.users()
@@ -552,11 +1140,12 @@ class GmailClient:
         result = _modify()
 
         # Record quota usage
-        self._record_quota(QuotaUnit.MESSAGES_MODIFY)
+        self._record_quota(QuotaUnit.MESSAGES_MODIFY, "messages.modify")
 
-        # Invalidate cache for this message
-        if self._cache:
-            self._cache.invalidate_message(self.account_name, message_id)
+        # 캐시 제자리 갱신 (본문 재조회 불필요)
+        self._apply_label_delta(
+            [message_id], add_label_ids, remove_label_ids, responses=[result]
+        )
 
         return {
             "id": result["id"],
@@ -587,7 +1176,7 @@ class GmailClient:
 
     def trash_message(self, message_id: str) -> dict:
         """휴지통으로 이동."""
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _trash():
             return (
                 self.service.users()
@@ -598,12 +1187,9 @@ class GmailClient:
 
         self._wait_for_quota(QuotaUnit.MESSAGES_TRASH)
         result = _trash()
-        self._record_quota(QuotaUnit.MESSAGES_TRASH)
+        self._record_quota(QuotaUnit.MESSAGES_TRASH, "messages.trash")
 
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate_message(self.account_name, message_id)
-            self._cache.invalidate_lists(self.account_name)
+        self._apply_label_delta([message_id], ["TRASH"], responses=[result])
 
         return {
             "id": result["id"],
@@ -612,7 +1198,7 @@ class GmailClient:
 
     def untrash_message(self, message_id: str) -> dict:
         """휴지통에서 복원."""
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _untrash():
             return (
                 self.service.users()
@@ -623,12 +1209,11 @@ class GmailClient:
 
         self._wait_for_quota(QuotaUnit.MESSAGES_UNTRASH)
         result = _untrash()
-        self._record_quota(QuotaUnit.MESSAGES_UNTRASH)
+        self._record_quota(QuotaUnit.MESSAGES_UNTRASH, "messages.untrash")
 
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate_message(self.account_name, message_id)
-            self._cache.invalidate_lists(self.account_name)
+        self._apply_label_delta(
+            [message_id], remove_labels=["TRASH"], responses=[result]
+        )
 
         return {
             "id": result["id"],
@@ -637,18 +1222,15 @@ class GmailClient:
 
     def delete_message(self, message_id: str) -> dict:
         """메시지 영구 삭제 (복구 불가)."""
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _delete():
             self.service.users().messages().delete(userId="me", id=message_id).execute()
 
         self._wait_for_quota(QuotaUnit.MESSAGES_DELETE)
         _delete()
-        self._record_quota(QuotaUnit.MESSAGES_DELETE)
+        self._record_quota(QuotaUnit.MESSAGES_DELETE, "messages.delete")
 
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate_message(self.account_name, message_id)
-            self._cache.invalidate_lists(self.account_name)
+        self._apply_deletions([message_id])
 
         return {
             "id": message_id,
@@ -742,13 +1324,13 @@ class GmailClient:
                 logger.debug("Cache hit for labels")
                 return cached
 
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _list_labels():
             return self.service.users().labels().list(userId="me").execute()
 
         self._wait_for_quota(QuotaUnit.LABELS_LIST)
         result = _list_labels()
-        self._record_quota(QuotaUnit.LABELS_LIST)
+        self._record_quota(QuotaUnit.LABELS_LIST, "labels.list")
 
         labels = []
         for label in result.get("labels", []):
@@ -972,13 +1554,13 @@ class GmailClient:
 
     def get_profile(self) -> dict:
         """계정 프로필 조회."""
-        @exponential_backoff(max_retries=5)
+        @self._backoff()
         def _get_profile():
             return self.service.users().getProfile(userId="me").execute()
 
         self._wait_for_quota(QuotaUnit.PROFILE_GET)
         result = _get_profile()
-        self._record_quota(QuotaUnit.PROFILE_GET)
+        self._record_quota(QuotaUnit.PROFILE_GET, "getProfile")
 
         return {
             "email": result["emailAddress"],
@@ -1005,7 +1587,28 @@ class GmailClient:
         Returns:
             BatchResult 객체 (total, succeeded, failed, results, errors)
         """
-        return self.batch_processor.batch_get_messages(message_ids, format)
+        result = self.batch_processor.batch_get_messages(message_ids, format)
+        self._store_fetched(result.results, format)
+        return result
+
+    def _store_fetched(self, messages: list[dict], format: str) -> list[dict]:
+        """받아 온 메시지를 파싱해 캐시와 로컬 검색 인덱스에 반영.
+
+        Returns:
+            파싱된 메시지 목록 (full/metadata가 아니면 빈 목록)
+        """
+        if format not in ("full", "metadata") or not messages:
+            return []
+
+        parsed = [self._parse_message(msg) for msg in messages]
+        if self._cache:
+            self._cache.set_messages(
+                self.account_name,
+                {msg["id"]: msg for msg in parsed},
+                format=format,
+            )
+        self._index_messages(parsed, format)
+        return parsed
 
     def batch_modify_labels(
         self,
@@ -1027,11 +1630,10 @@ class GmailClient:
             message_ids, add_labels, remove_labels
         )
 
-        # Invalidate cache for modified messages
-        if self._cache:
-            for msg_id in message_ids:
-                self._cache.invalidate_message(self.account_name, msg_id)
-            self._cache.invalidate_lists(self.account_name)
+        # batchModify는 빈 응답이므로 추가/제거한 라벨로 캐시 갱신
+        self._apply_label_delta(
+            [r["id"] for r in result.results], add_labels, remove_labels
+        )
 
         return result
 
@@ -1046,11 +1648,7 @@ class GmailClient:
         """
         result = self.batch_processor.batch_trash_messages(message_ids)
 
-        # Invalidate cache
-        if self._cache:
-            for msg_id in message_ids:
-                self._cache.invalidate_message(self.account_name, msg_id)
-            self._cache.invalidate_lists(self.account_name)
+        self._apply_label_delta([r["id"] for r in result.results], ["TRASH"])
 
         return result
 
@@ -1067,11 +1665,7 @@ class GmailClient:
         """
         result = self.batch_processor.batch_delete_messages(message_ids)
 
-        # Invalidate cache
-        if self._cache:
-            for msg_id in message_ids:
-                self._cache.invalidate_message(self.account_name, msg_id)
-            self._cache.invalidate_lists(self.account_name)
+        self._apply_deletions([r["id"] for r in result.results])
 
         return result
 
@@ -1082,20 +1676,22 @@ class GmailClient:
     ) -> dict:
         """조건에 맞는 메시지 전체 읽음 처리.
 
+        목록을 페이지 단위로 조회하면서 바로 수정합니다 (전체 목록을 먼저
+        모으지 않음). 일일 할당량이 부족하면 들어가는 만큼만 처리합니다.
+
         Args:
             query: 검색 쿼리 (기본: 읽지 않음)
             max_messages: 최대 처리 메시지 수
 
         Returns:
-            BatchResult 객체
+            BatchResult 객체 (미처리 ID는 deferred, 재시도 시각은 resume_after)
         """
-        result = self.batch_processor.mark_all_as_read(query, max_messages)
-
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate_lists(self.account_name)
-
-        return result
+        # 페이지마다 캐시 갱신 (중간에 중단되어도 수정한 만큼은 반영)
+        return self.batch_processor.mark_all_as_read(
+            query,
+            max_messages,
+            on_modified=lambda ids: self._apply_label_delta(ids, remove_labels=["UNREAD"]),
+        )
 
     def archive_all(
         self,
@@ -1104,20 +1700,22 @@ class GmailClient:
     ) -> dict:
         """조건에 맞는 메시지 전체 보관처리.
 
+        목록을 페이지 단위로 조회하면서 바로 수정합니다 (전체 목록을 먼저
+        모으지 않음). 일일 할당량이 부족하면 들어가는 만큼만 처리합니다.
+
         Args:
             query: 검색 쿼리
             max_messages: 최대 처리 메시지 수
 
         Returns:
-            BatchResult 객체
+            BatchResult 객체 (미처리 ID는 deferred, 재시도 시각은 resume_after)
         """
-        result = self.batch_processor.archive_all(query, max_messages)
-
-        # Invalidate cache
-        if self._cache:
-            self._cache.invalidate_lists(self.account_name)
-
-        return result
+        # 페이지마다 캐시 갱신 (중간에 중단되어도 수정한 만큼은 반영)
+        return self.batch_processor.archive_all(
+            query,
+            max_messages,
+            on_modified=lambda ids: self._apply_label_delta(ids, remove_labels=["INBOX"]),
+        )
 
     # =========================================================================
     # Cache & Quota Management
@@ -1127,10 +1725,12 @@ class GmailClient:
         """현재 할당량 사용 현황 조회.
 
         Returns:
-            할당량 사용 현황 딕셔너리
+            할당량 사용 현황 딕셔너리 (methods: 오늘 메서드별 사용 기록)
         """
         if self._quota_manager:
-            return self._quota_manager.get_usage(self.account_name)
+            status = self._quota_manager.get_usage(self.account_name)
+            status["methods"] = self._quota_manager.get_ledger(self.account_name)
+            return status
         return {"message": "Quota management is disabled"}
 
     def get_cache_stats(self) -> dict:
@@ -1144,9 +1744,11 @@ class GmailClient:
         return {"message": "Caching is disabled"}
 
     def clear_cache(self) -> None:
-        """이 계정의 캐시 전체 삭제."""
+        """이 계정의 캐시 전체 삭제 (로컬 검색 인덱스 포함)."""
         if self._cache:
             self._cache.invalidate_account(self.account_name)
+            if self._search_index:
+                self._search_index.remove_account(self.account_name)
             logger.info(f"Cache cleared for account: {self.account_name}")
 
 
@@ -1171,7 +1773,10 @@ class ADCGmailClient:
     @property
     def service(self):
         if self._service is None:
-            self._service = build("gmail", "v1", credentials=self.creds)
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.creds, http=DeadlineHttp(timeout=self.timeout)
+            )
+            self._service = build("gmail", "v1", http=http)
         return self._service
 
     def list_messages(
@@ -15,6 +15,13 @@ Usage:
 
     # ADC 사용
     uv run python list_messages.py --adc --query "is:unread"
+
+    # 로컬 검색 인덱스 (API 호출 없음, 이전에 조회한 메시지 대상)
+    uv run python list_messages.py --account work --local --query "invoice march"
+    uv run python list_messages.py --local --all-accounts --query "invoice"
+
+    # 전체 메시지 색인 (이후 지원되는 쿼리는 API 대신 로컬 인덱스가 응답)
+    uv run python list_messages.py --account work --build-index
 """
 
 import argparse
@@ -37,6 +44,19 @@ def format_message_summary(client: GmailClient, msg_id: str) -> dict:
     }
 
 
+def format_local_result(msg: dict) -> dict:
+    """로컬 검색 결과 요약 정보."""
+    return {
+        "account": msg["account"],
+        "id": msg["id"],
+        "from": msg["from"],
+        "subject": msg["subject"],
+        "date": msg["date"],
+        "snippet": msg["snippet"][:100] + "..." if len(msg["snippet"]) > 100 else msg["snippet"],
+        "labels": msg["label_ids"],
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="Gmail 메시지 목록 조회")
     parser.add_argument("--account", "-a", help="계정 식별자")
@@ -47,6 +67,10 @@ def main():
     parser.add_argument("--include-spam-trash", action="store_true", help="스팸/휴지통 포함")
     parser.add_argument("--full", "-f", action="store_true", help="전체 메시지 정보 조회")
     parser.add_argument("--json", action="store_true", help="JSON 형식 출력")
+    parser.add_argument("--local", action="store_true", help="로컬 검색 인덱스에서 검색 (API 호출 없음)")
+    parser.add_argument("--all-accounts", action="store_true", help="--local 검색 시 모든 계정 대상")
+    parser.add_argument("--build-index", action="store_true", help="전체 메시지를 로컬 인덱스에 색인")
+    parser.add_argument("--index-format", choices=["metadata", "full"], default="metadata", help="--build-index 색인 형식 (full은 has:attachment 지원)")
 
     args = parser.parse_args()
     base_path = Path(__file__).parent.parent
@@ -63,6 +87,50 @@ def main():
         account = args.account or accounts[0]
         client = GmailClient(account, base_path)
 
+    if args.build_index:
+        if not hasattr(client, "build_local_index"):
+            print("❌ --build-index는 ADC 모드에서 지원되지 않습니다.")
+            return
+
+        result = client.build_local_index(format=args.index_format)
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif result["status"] == "disabled":
+            print(f"❌ {result['message']}")
+        else:
+            print(f"🗂️  {result['indexed']}개 메시지 색인 ({result['status']})")
+            if result["failed"]:
+                print(f"   실패: {result['failed']}개 - 다시 실행하면 완전한 인덱스가 됩니다")
+            if result["deferred"]:
+                print(f"   미처리: {result['deferred']}개 (Gmail 장애 또는 시간 초과) - 나중에 다시 실행하세요")
+        return
+
+    if args.local:
+        if not hasattr(client, "search_local"):
+            print("❌ --local은 ADC 모드에서 지원되지 않습니다.")
+            return
+
+        results = client.search_local(
+            query=args.query,
+            max_results=args.max,
+            accounts=[] if args.all_accounts else None,
+        )
+        summaries = [format_local_result(msg) for msg in results]
+
+        if args.json:
+            print(json.dumps(summaries, ensure_ascii=False, indent=2))
+        else:
+            print(f"🔎 {len(summaries)}개 메시지 (로컬 인덱스)")
+            print()
+            for summary in summaries:
+                unread = "📩" if "UNREAD" in summary["labels"] else "📧"
+                print(f"{unread} {summary['subject']}")
+                print(f"   From: {summary['from']}")
+                print(f"   Date: {summary['date']}  [{summary['account']}]")
+                print(f"   {summary['snippet']}")
+                print()
+        return
+
     label_ids = args.labels.split(",") if args.labels else None
 
     messages = client.list_messages(